@@ -3,26 +3,44 @@
 Wood-ARK: ARK ETF 持仓监控工具
 
 主程序入口，负责命令行参数解析和流程编排。
+
+各模式用到的模块在模式函数内导入：健康检查（--test-webhook）和定时探测
+（--check-missed）不导入 pandas、numpy、matplotlib，启动时间远低于 1 秒。
+用 --import-report 查看各模式的导入耗时。
 """
 
 import argparse
 import sys
+import time
 import logging
+import functools
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from src.utils import load_config, setup_logging, cleanup_old_logs
-from src.fetcher import DataFetcher
-from src.analyzer import Analyzer
-from src.reporter import ReportGenerator
-from src.image_generator import ImageGenerator
-from src.notifier import WeChatNotifier
-from src.scheduler import Scheduler
-from src.summary_analyzer import SummaryAnalyzer
-from src.summary_notifier import SummaryNotifier
+
+if TYPE_CHECKING:
+    from src.cassette import Cassette
+    from src.retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
 
+# 各模式导入的模块（--import-report 据此测量导入耗时，修改模式函数的导入时同步更新）
+MODE_IMPORTS = {
+    'test-webhook': ['src.notifier', 'src.http_client'],
+    'check-missed': ['src.scheduler'],
+    'rebuild-manifest': ['src.manifest'],
+    'daily': [
+        'src.fetcher', 'src.holdings_client', 'src.repository', 'src.manifest', 'src.analyzer', 'src.history',
+        'src.reporter', 'src.notifier', 'src.http_client', 'src.http_cache', 'src.cassette',
+        'src.retry', 'src.result_cache', 'src.render_service', 'src.scheduler',
+        'src.summary_analyzer', 'src.summary_notifier'
+    ],
+    'render': ['src.image_generator'],
+}
+
+
 def test_webhook_mode(config) -> int:
     """
     测试 Webhook 连接模式
@@ -32,10 +50,14 @@ def test_webhook_mode(config) -> int:
     """
     logger.info("=== 测试 Webhook 连接 ===")
     
+    from src.notifier import WeChatNotifier
+    from src.http_client import get_timeout
+    
     notifier = WeChatNotifier(
         webhook_url=config.notification.webhook_url,
         max_retries=config.retry.max_retries,
-        retry_delays=config.retry.retry_delays
+        retry_delays=config.retry.retry_delays,
+        timeout=get_timeout(config.http)
     )
     
     if notifier.test_connection():
@@ -57,6 +79,8 @@ def check_missed_mode(config) -> int:
     """
     logger.info("=== 检查缺失数据 ===")
     
+    from src.scheduler import Scheduler
+    
     scheduler = Scheduler(
         data_dir=config.data.data_dir,
         enable_schedule=False
@@ -80,11 +104,50 @@ def check_missed_mode(config) -> int:
     return 0
 
 
+def _in_order(results: dict, keys: list) -> dict:
+    """按给定顺序重排字典"""
+    return {key: results[key] for key in keys if key in results}
+
+
+def _cached(result_cache, stage: str, key: str, compute):
+    """读取阶段结果缓存，未命中（或未启用缓存）时计算并保存"""
+    if result_cache is None:
+        return compute()
+    
+    value = result_cache.get(stage, key)
+    if value is None:
+        value = compute()
+        result_cache.put(stage, key, value)
+    return value
+
+
+def _render_image(result_cache, renderer, name: str, stage: str, key: str, image_path, method: str, arguments) -> None:
+    """将缓存的图片复制到 image_path，未命中（或未启用缓存）时提交绘图任务（arguments() 返回参数），完成后保存副本"""
+    if result_cache is not None and result_cache.get_file(stage, key, str(image_path)):
+        renderer.ready(name, str(image_path))
+        return
+    
+    on_done = None
+    if result_cache is not None:
+        on_done = lambda path: result_cache.put_file(stage, key, path)
+    renderer.submit(name, method, on_done=on_done, **arguments())
+
+
+def _rendered_image(renderer, name: str):
+    """等待绘图任务完成，返回图片路径（失败时记录警告并返回 None）"""
+    try:
+        return renderer.result(name)
+    except Exception as e:
+        logger.warning(f"{name} 图片生成失败: {e}", exc_info=True)
+        return None
+
+
 def run_daily_task(
     config,
     target_date: str = None,
     etf_filter: str = None,
-    force: bool = False
+    force: bool = False,
+    cassette: 'Cassette' = None
 ) -> int:
     """
     执行每日任务
@@ -94,12 +157,30 @@ def run_daily_task(
         target_date: 目标日期（可选）
         etf_filter: 只处理指定 ETF（可选）
         force: 是否强制执行
+        cassette: HTTP 磁带（可选，录制或回放所有 HTTP 请求）
     
     Returns:
         退出码（0 成功，1 失败）
     """
     logger.info("=== 开始每日任务 ===")
     
+    # 每日任务的模块（pandas、numpy 只在此模式下导入；matplotlib 在需要绘图时才导入）
+    from src.fetcher import DataFetcher
+    from src.repository import HoldingsRepository
+    from src.manifest import HoldingsManifest
+    from src.analyzer import Analyzer
+    from src.history import HoldingsHistory
+    from src.reporter import ReportGenerator
+    from src.notifier import WeChatNotifier
+    from src.http_client import create_http_session, get_timeout
+    from src.http_cache import ResponseCache
+    from src.retry import RetryPolicy
+    from src.result_cache import ResultCache, fingerprint
+    from src.render_service import RenderService, STYLE_VERSION
+    from src.scheduler import Scheduler
+    from src.summary_analyzer import SummaryAnalyzer
+    from src.summary_notifier import SummaryNotifier
+    
     # 初始化各模块
     scheduler = Scheduler(
         data_dir=config.data.data_dir,
@@ -120,20 +201,32 @@ def run_daily_task(
     
     logger.info(f"目标日期: {target_date}, 对比日期: {comparison_date}")
     
-    # 初始化组件
-    fetcher = DataFetcher(config=config)
+    # 初始化组件（所有阶段共享同一个持仓仓库，每天的持仓只解析一次）
+    repository = HoldingsRepository.from_config(config)
+    
+    # 数据下载和推送共用一个连接池（复用 TCP/TLS 连接）
+    http_session = create_http_session(config.http, cassette=cassette)
+    
+    # 数据下载和推送共用一个重试策略（同一份熔断状态；运行预算只限制数据下载）
+    retry_policy = RetryPolicy.from_config(config.retry)
+    
+    fetcher = DataFetcher(
+        config=config,
+        repository=repository,
+        session=http_session,
+        response_cache=ResponseCache.from_config(config),
+        retry_policy=retry_policy
+    )
     
     # 0. 自动下载历史数据（首次运行或数据不足时）
     if config.data.auto_download_history:
         logger.info("[0/6] 检查并下载历史数据...")
         for etf in config.data.etfs:
             # 检查是否有足够的历史数据（至少 5 天）
-            holdings_dir = Path(config.data.data_dir) / "holdings" / etf
-            if holdings_dir.exists():
-                existing_files = list(holdings_dir.glob("*.csv"))
-                if len(existing_files) >= 5:
-                    logger.debug(f"{etf} 已有 {len(existing_files)} 天数据，跳过下载")
-                    continue
+            existing_days = len(HoldingsManifest(config.data.data_dir, etf).dates())
+            if existing_days >= 5:
+                logger.debug(f"{etf} 已有 {existing_days} 天数据，跳过下载")
+                continue
             
             logger.info(f"下载 {etf} 历史数据...")
             fetcher.download_historical_data(etf, days=config.data.history_days)
@@ -147,14 +240,20 @@ def run_daily_task(
     
     analyzer = Analyzer(threshold=config.analysis.change_threshold)
     
+    # 各阶段结果按输入内容哈希缓存，同一天重跑时输入不变的阶段直接复用
+    result_cache = ResultCache.from_config(config)
+    
     reporter = ReportGenerator(data_dir=config.data.data_dir)
     
-    image_gen = ImageGenerator(data_dir=config.data.data_dir)
+    # 长图在进程池中并行绘制（图片全部命中缓存时不导入 matplotlib，也不启动工作进程）
+    renderer = RenderService.from_config(config, repository=repository)
     
     notifier = WeChatNotifier(
         webhook_url=config.notification.webhook_url,
-        max_retries=config.retry.max_retries,
-        retry_delays=config.retry.retry_delays
+        session=http_session,
+        timeout=get_timeout(config.http),
+        retry_policy=retry_policy.without_deadline(),
+        image_max_bytes=config.notification.image_max_bytes
     )
     
     # 处理每个 ETF
@@ -165,24 +264,38 @@ def run_daily_task(
     total_success = 0
     total_failed = 0
     
-    # 存储所有ETF的持仓数据（用于汇总报告）
-    all_current_holdings = {}  # {etf: [dict, ...]}
-    all_previous_holdings = {}  # {etf: [dict, ...]}
+    # 存储所有ETF的持仓数据（用于汇总报告，直接使用 DataFrame）
     all_current_dfs = {}  # {etf: DataFrame}
     all_previous_dfs = {}  # {etf: DataFrame}
     all_analysis_results = {}  # {etf: analysis_result}
-    all_etf_images = {}  # {etf: [image_paths]}
+    holdings_keys = {}  # {etf: 当日与对比日持仓的内容哈希}
+    
+    # 1. 并发获取所有 ETF 的当日数据，哪只先下载完就先处理哪只
+    #    （API 只返回最新持仓，对比日数据从本地历史读取）
+    logger.info(f"[1/5] 并发获取持仓数据（最多 {config.data.fetch_concurrency} 个并发请求）...")
+    fetch_results = fetcher.fetch_many(
+        etf_symbols,
+        [target_date],
+        max_workers=config.data.fetch_concurrency
+    )
     
-    for etf in etf_symbols:
+    for etf, fetched, fetch_error in fetch_results:
         try:
             logger.info(f"\n{'='*50}")
             logger.info(f"处理 {etf}")
             logger.info(f"{'='*50}")
             
-            # 1. 获取数据
-            logger.info(f"[1/5] 获取 {etf} 持仓数据...")
-            current_df = fetcher.fetch_holdings(etf, target_date)
-            previous_df = fetcher.fetch_holdings(etf, comparison_date)
+            if fetch_error is not None:
+                raise fetch_error
+            
+            current_df = fetched.get(target_date)
+            
+            # 对比日：本地最近一个早于目标日期的交易日；本地没有历史时才走网络
+            prev_date, previous_df = fetcher.load_comparison_holdings(etf, target_date)
+            if previous_df is None:
+                logger.warning(f"{etf} 本地没有 {target_date} 之前的数据，从网络获取对比数据")
+                prev_date = comparison_date
+                previous_df = fetcher.fetch_holdings(etf, comparison_date)
             
             if current_df is None or previous_df is None:
                 logger.error(f"❌ {etf} 数据获取失败，跳过")
@@ -192,52 +305,79 @@ def run_daily_task(
             # 保存到本地
             fetcher.save_to_csv(current_df, etf, target_date)
             
+            # 缓存键：持仓内容 + 相关配置；本地历史以清单中的文件哈希代表
+            file_hashes = {
+                date: entry.sha256
+                for date, entry in HoldingsManifest(config.data.data_dir, etf).entries.items()
+                if date <= target_date
+            }
+            threshold = config.analysis.change_threshold
+            holdings_keys[etf] = fingerprint(current_df, previous_df)
+            analysis_key = fingerprint(holdings_keys[etf], prev_date, target_date, threshold)
+            horizons_key = fingerprint(file_hashes, config.analysis.horizons, threshold)
+            
             # 2. 分析变化
             logger.info(f"[2/5] 分析持仓变化...")
-            analysis_result = analyzer.compare_holdings(
-                current_df, previous_df, comparison_date, target_date
+            analysis_result = _cached(
+                result_cache, 'analysis', analysis_key,
+                lambda: analyzer.compare_holdings(current_df, previous_df, prev_date, target_date)
+            )
+            
+            # 多周期对比（日/周/月/季）：本地历史只在需要时读取一次，趋势图也使用同一份
+            load_history = functools.cache(
+                lambda: HoldingsHistory.load(repository, etf, target_date)
+            )
+            horizon_results = _cached(
+                result_cache, 'horizons', horizons_key,
+                lambda: analyzer.compare_horizons(load_history(), config.analysis.horizons)
             )
             
             # 3. 生成报告
             logger.info(f"[3/5] 生成 Markdown 报告...")
             current_holdings = current_df.to_dict('records')
-            markdown = reporter.generate_markdown(
-                analysis_result, etf, current_holdings
+            markdown = _cached(
+                result_cache, 'markdown', fingerprint(etf, analysis_key, horizons_key),
+                lambda: reporter.generate_markdown(
+                    analysis_result, etf, current_holdings, horizons=horizon_results
+                )
             )
             
             # 保存报告
             report_path = reporter.save_report(markdown, etf, target_date)
             logger.info(f"报告已保存: {report_path}")
             
-            # 4. 生成可视化长图
+            # 4. 生成可视化长图（提交到绘图进程池，推送前再收集结果）
             logger.info(f"[4/5] 生成综合报告长图...")
-            image_paths = []
             
             try:
                 # 提取新增股票代码列表
                 added_tickers = [h.ticker for h in analysis_result['added']]
                 
                 # 生成单张长图（包含持仓表格、基金趋势、Top 10 趋势、新增股票趋势）
-                comprehensive_img = image_gen.generate_comprehensive_report_image(
-                    current_holdings, 
-                    current_df, 
-                    previous_df, 
-                    etf, 
-                    target_date,
-                    added_tickers=added_tickers
+                image_key = fingerprint(
+                    STYLE_VERSION, etf, target_date, holdings_keys[etf], added_tickers, file_hashes
+                )
+                _render_image(
+                    result_cache, renderer, etf, 'comprehensive', image_key,
+                    renderer.comprehensive_image_path(etf, target_date),
+                    'generate_comprehensive_report_image',
+                    lambda: dict(
+                        holdings=current_holdings,
+                        current_df=current_df,
+                        previous_df=previous_df,
+                        etf_symbol=etf,
+                        date=target_date,
+                        added_tickers=added_tickers,
+                        history=load_history()
+                    )
                 )
-                image_paths.append(comprehensive_img)
-                logger.info(f"综合报告长图已生成: {comprehensive_img}")
             except Exception as e:
                 logger.warning(f"图片生成失败: {e}", exc_info=True)
             
             # 保存数据用于后续合并推送
-            all_current_holdings[etf] = current_holdings
-            all_previous_holdings[etf] = previous_df.to_dict('records')
             all_current_dfs[etf] = current_df
             all_previous_dfs[etf] = previous_df
             all_analysis_results[etf] = analysis_result
-            all_etf_images[etf] = image_paths
             
             logger.info(f"✅ {etf} 处理完成")
             total_success += 1
@@ -251,8 +391,17 @@ def run_daily_task(
                 notifier.send_error_alert(str(e), etf)
     
     # 汇总结果
+    # 汇总分析按配置顺序遍历基金（并发获取时处理顺序不固定）
+    all_current_dfs = _in_order(all_current_dfs, etf_symbols)
+    all_previous_dfs = _in_order(all_previous_dfs, etf_symbols)
+    
     logger.info(f"\n{'='*50}")
     logger.info(f"数据处理完成: 成功 {total_success}, 失败 {total_failed}")
+    cache_stats = repository.stats()
+    logger.info(
+        f"持仓缓存: 命中 {cache_stats['hits']}, 未命中 {cache_stats['misses']}, "
+        f"缓存 {cache_stats['size']}/{cache_stats['max_entries']} 条"
+    )
     logger.info(f"{'='*50}")
     
     # ========== 分批推送（方案A：稳定性最高）==========
@@ -265,14 +414,27 @@ def run_daily_task(
             # === 步骤1：汇总分析 ===
             logger.info("[步骤 1/7] 生成汇总分析...")
             summary_analyzer = SummaryAnalyzer()
-            summary_result = summary_analyzer.analyze_all_etfs(
-                current_holdings=all_current_holdings,
-                previous_holdings=all_previous_holdings
+            summary_key = fingerprint([(etf, holdings_keys[etf]) for etf in all_current_dfs])
+            summary_result = _cached(
+                result_cache, 'summary', summary_key,
+                lambda: summary_analyzer.analyze_all_etfs(
+                    current_holdings=all_current_dfs,
+                    previous_holdings=all_previous_dfs
+                )
             )
             
             logger.info(f"✅ 汇总分析完成: {summary_result['statistics']['total_stocks']} 只股票, "
                        f"{summary_result['statistics']['overlapping_count']} 只跨基金重叠")
             
+            # 汇总长图立即提交，与各基金长图并行绘制
+            _render_image(
+                result_cache, renderer, 'SUMMARY', 'summary_image',
+                fingerprint(STYLE_VERSION, summary_key, target_date),
+                renderer.summary_image_path(target_date),
+                'generate_summary_report_image',
+                lambda: dict(summary_result=summary_result, date=target_date)
+            )
+            
             # === 步骤2：生成并发送超长文字 ===
             logger.info("[步骤 2/7] 生成并发送超长文字消息...")
             
@@ -306,14 +468,11 @@ def run_daily_task(
             else:
                 logger.error("❌ [2/7] 文字消息发送失败")
             
-            import time
             time.sleep(0.5)  # 避免发送过快
             
             # === 步骤3：生成并发送汇总长图 ===
             logger.info("[步骤 3/7] 生成并发送汇总长图...")
-            summary_image = image_gen.generate_summary_report_image(
-                summary_result, target_date
-            )
+            summary_image = renderer.result('SUMMARY')
             
             if notifier.send_image(summary_image):
                 logger.info("✅ [3/7] 汇总长图发送成功")
@@ -326,12 +485,12 @@ def run_daily_task(
             image_success_count = 1 if notifier.send_image(summary_image) else 0
             
             for idx, etf in enumerate(['ARKK', 'ARKW', 'ARKG', 'ARKQ', 'ARKF'], start=4):
-                if etf not in all_etf_images or not all_etf_images[etf]:
+                etf_image_path = _rendered_image(renderer, etf) if etf in renderer else None
+                if etf_image_path is None:
                     logger.warning(f"[{idx}/7] {etf} 没有图片，跳过")
                     continue
                 
                 logger.info(f"[步骤 {idx}/7] 发送 {etf} 长图...")
-                etf_image_path = all_etf_images[etf][0]
                 
                 if notifier.send_image(etf_image_path):
                     logger.info(f"✅ [{idx}/7] {etf} 长图发送成功")
@@ -359,9 +518,41 @@ def run_daily_task(
     else:
         logger.info("跳过推送（成功的基金数量不足）")
     
+    # 未推送的图片（推送跳过或失败时）也等待绘制完成，确保图片和缓存副本已保存
+    for name, _, error in renderer.as_completed():
+        if error is not None:
+            logger.warning(f"{name} 图片生成失败: {error}")
+    renderer.close()
+    
+    if result_cache is not None:
+        result_stats = result_cache.stats()
+        logger.info(f"结果缓存: 命中 {result_stats['hits']}, 未命中 {result_stats['misses']}")
+        result_cache.evict(
+            max_age_days=config.storage.result_cache_max_age_days,
+            max_bytes=config.storage.result_cache_max_mb * 1024 * 1024
+        )
+    
+    _log_retry_budget(retry_policy)
+    
     return 0 if total_failed == 0 else 1
 
 
+def _log_retry_budget(retry_policy: 'RetryPolicy') -> None:
+    """记录本次运行的预算使用情况和熔断的主机"""
+    remaining = retry_policy.remaining()
+    open_circuits = retry_policy.open_circuits()
+    
+    if remaining is None:
+        logger.info(f"运行耗时: {retry_policy.elapsed():.1f} 秒（未设置运行预算）")
+    elif remaining == 0:
+        logger.warning(f"⚠️ 运行预算已用完（{retry_policy.elapsed():.1f} 秒），之后的请求已跳过")
+    else:
+        logger.info(f"运行耗时: {retry_policy.elapsed():.1f} 秒，剩余预算 {remaining:.1f} 秒")
+    
+    if open_circuits:
+        logger.warning(f"⚠️ 以下主机处于熔断状态: {', '.join(open_circuits)}")
+
+
 def backfill_mode(config, days: int = 90) -> int:
     """
     ⚠️ 此功能已废弃
@@ -387,7 +578,10 @@ def backfill_mode_deprecated(config, days: int = 90) -> int:
     """
     logger.info(f"=== 补充历史数据（近 {days} 天）===")
     
-    fetcher = DataFetcher(config=config)
+    from src.fetcher import DataFetcher
+    from src.http_client import create_http_session
+    
+    fetcher = DataFetcher(config=config, session=create_http_session(config.http))
     etf_symbols = config.data.etfs
     
     total_success = 0
@@ -402,6 +596,99 @@ def backfill_mode_deprecated(config, days: int = 90) -> int:
     return 0
 
 
+def migrate_store_mode(config) -> int:
+    """
+    迁移现有 CSV 数据到存储后端（一次性）
+    
+    Returns:
+        退出码（0 成功，1 失败）
+    """
+    logger.info(f"=== 迁移 CSV 数据到存储后端（{config.storage.backend}）===")
+    
+    from src.fetcher import DataFetcher
+    
+    fetcher = DataFetcher(config=config)
+    
+    if fetcher.store is None:
+        print("❌ 未启用存储后端，请在 config.yaml 中设置 storage.backend 为 parquet、feather 或 sqlite")
+        return 1
+    
+    holdings_dir = Path(config.data.data_dir) / "holdings"
+    stats = fetcher.store.migrate_from_csv(str(holdings_dir))
+    
+    for etf, count in stats.items():
+        print(f"  {etf}: 新增 {count} 天")
+    
+    print(f"✅ 迁移完成: 共新增 {sum(stats.values())} 天数据")
+    return 0
+
+
+def rebuild_manifest_mode(config) -> int:
+    """
+    重建持仓清单（清单与实际文件不一致时使用）
+    
+    Returns:
+        退出码（0 成功，1 失败）
+    """
+    logger.info("=== 重建持仓清单 ===")
+    
+    from src.manifest import HoldingsManifest
+    
+    holdings_dir = Path(config.data.data_dir) / "holdings"
+    if not holdings_dir.exists():
+        print(f"❌ 数据目录不存在: {holdings_dir}")
+        return 1
+    
+    total_dates = 0
+    for etf_dir in sorted(holdings_dir.iterdir()):
+        if not etf_dir.is_dir():
+            continue
+        
+        manifest = HoldingsManifest(config.data.data_dir, etf_dir.name)
+        drift = manifest.verify()
+        count = manifest.rebuild()
+        total_dates += count
+        
+        print(
+            f"  {etf_dir.name}: {count} 天"
+            f"（缺失文件 {len(drift['missing_files'])}，"
+            f"未登记 {len(drift['untracked_files'])}，"
+            f"已变更 {len(drift['changed_files'])}）"
+        )
+    
+    print(f"✅ 清单重建完成: 共 {total_dates} 天")
+    return 0
+
+
+def import_report_mode(config) -> int:
+    """
+    导入耗时报告（每个模式在新进程中测量，不执行任务）
+    
+    Returns:
+        退出码（0 成功，1 失败）
+    """
+    logger.info("=== 导入耗时报告 ===")
+    
+    from src.import_report import measure_imports
+    
+    for mode, modules in MODE_IMPORTS.items():
+        try:
+            report = measure_imports(['main'] + modules)
+        except RuntimeError as e:
+            print(f"❌ {mode}: {e}")
+            return 1
+        
+        heavy = [name for name in ('pandas', 'numpy', 'matplotlib') if name in report]
+        print(
+            f"{mode}: 导入 {report.total_ms:.0f} ms，进程 {report.wall_ms:.0f} ms"
+            f"（{'导入 ' + ', '.join(heavy) if heavy else '未导入 pandas/numpy/matplotlib'}）"
+        )
+        for name, cumulative_ms in report.top(5):
+            print(f"  {cumulative_ms:8.1f} ms  {name}")
+    
+    return 0
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(
@@ -414,6 +701,12 @@ def main():
   python main.py --date 2025-01-15  # 指定日期
   python main.py --check-missed     # 检查缺失数据（仅查看，不补齐）
   python main.py --test-webhook     # 测试 Webhook
+  python main.py --migrate-store    # 迁移 CSV 数据到存储后端
+  python main.py --rebuild-manifest # 重建持仓清单
+  python main.py --import-report    # 各模式的导入耗时报告
+  python main.py --manual --record run.cassette.gz   # 录制本次运行的所有 HTTP 请求
+  python main.py --manual --replay run.cassette.gz   # 离线回放（按录制耗时等待）
+  python main.py --manual --replay run.cassette.gz --replay-latency 50  # 固定 50ms 延迟
         """
     )
     
@@ -460,6 +753,47 @@ def main():
         help='[已废弃] 补充历史数据的天数'
     )
     
+    parser.add_argument(
+        '--migrate-store',
+        action='store_true',
+        help='将现有 CSV 持仓数据迁移到存储后端（需配置 storage.backend）'
+    )
+    
+    parser.add_argument(
+        '--rebuild-manifest',
+        action='store_true',
+        help='根据本地持仓文件重建清单（清单与文件不一致时使用）'
+    )
+    
+    parser.add_argument(
+        '--import-report',
+        action='store_true',
+        help='报告各运行模式的模块导入耗时（类似 python -X importtime）'
+    )
+    
+    cassette_group = parser.add_mutually_exclusive_group()
+    
+    cassette_group.add_argument(
+        '--record',
+        type=str,
+        metavar='CASSETTE',
+        help='录制本次运行的所有 HTTP 请求到磁带文件'
+    )
+    
+    cassette_group.add_argument(
+        '--replay',
+        type=str,
+        metavar='CASSETTE',
+        help='从磁带文件回放 HTTP 响应（不访问网络）'
+    )
+    
+    parser.add_argument(
+        '--replay-latency',
+        type=float,
+        metavar='MS',
+        help='回放时每次请求的固定延迟（毫秒），默认使用录制时的耗时'
+    )
+    
     args = parser.parse_args()
     
     try:
@@ -491,14 +825,45 @@ def main():
         elif args.backfill:
             exit_code = backfill_mode(config, days=args.days)
         
+        elif args.migrate_store:
+            exit_code = migrate_store_mode(config)
+        
+        elif args.rebuild_manifest:
+            exit_code = rebuild_manifest_mode(config)
+        
+        elif args.import_report:
+            exit_code = import_report_mode(config)
+        
         else:
+            # 录制/回放时关闭响应缓存，保证每次运行发出相同的请求序列；
+            # 同时关闭结果缓存，回放耗时反映完整的分析和绘图流程
+            cassette = None
+            if args.record or args.replay:
+                from src.cassette import Cassette
+                cassette = Cassette(
+                    args.record or args.replay,
+                    mode='record' if args.record else 'replay',
+                    latency=args.replay_latency / 1000 if args.replay_latency is not None else None
+                )
+                config.http.response_cache = False
+                config.storage.result_cache = False
+            
             # 正常执行模式
-            exit_code = run_daily_task(
-                config=config,
-                target_date=args.date,
-                etf_filter=args.etf,
-                force=args.manual
-            )
+            start_time = time.perf_counter()
+            try:
+                exit_code = run_daily_task(
+                    config=config,
+                    target_date=args.date,
+                    etf_filter=args.etf,
+                    force=args.manual,
+                    cassette=cassette
+                )
+            finally:
+                if cassette is not None and cassette.mode == 'record':
+                    cassette.save()
+            
+            if cassette is not None:
+                logger.info(f"端到端耗时: {time.perf_counter() - start_time:.2f} 秒")
         
         logger.info(f"Wood-ARK 退出，退出码: {exit_code}")
         sys.exit(exit_code)
@@ -11,11 +11,14 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+import numpy as np
+
 # 添加项目根目录到 Python 路径
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.utils import load_config
+from src.manifest import HoldingsManifest
 
 
 def check_data_integrity(etf_symbol: str, days: int = 30):
@@ -33,8 +36,9 @@ def check_data_integrity(etf_symbol: str, days: int = 30):
         print(f"❌ {etf_symbol} 数据目录不存在: {data_dir}")
         return
     
-    # 获取现有文件
-    csv_files = sorted([f.stem for f in data_dir.glob('*.csv')])
+    # 获取现有文件（从清单读取）
+    manifest = HoldingsManifest(config.data.data_dir, etf_symbol)
+    csv_files = manifest.dates()
     
     print(f"\n{'='*60}")
     print(f"📊 {etf_symbol} 数据完整性检查")
@@ -52,22 +56,17 @@ def check_data_integrity(etf_symbol: str, days: int = 30):
     # 检查最近 N 天的缺失日期
     et_tz = ZoneInfo("America/New_York")
     today = datetime.now(et_tz).date()
+    start_date = today - timedelta(days=days - 1)
     
-    expected_dates = []
-    for i in range(days):
-        check_date = today - timedelta(days=i)
-        # 只检查工作日（周一到周五）
-        if check_date.weekday() < 5:
-            expected_dates.append(check_date.strftime('%Y-%m-%d'))
-    
-    expected_dates.reverse()
-    
-    # 找出缺失的日期
-    missing_dates = [d for d in expected_dates if d not in csv_files]
+    # 只检查工作日（周一到周五）
+    expected_count = int(np.busday_count(start_date, today + timedelta(days=1)))
+    missing_dates = manifest.missing_weekdays(
+        start_date.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d')
+    )
     
     print(f"\n检查范围: 最近 {days} 天（仅工作日）")
-    print(f"应有数据: {len(expected_dates)} 个交易日")
-    print(f"实际拥有: {len([d for d in expected_dates if d in csv_files])} 个")
+    print(f"应有数据: {expected_count} 个交易日")
+    print(f"实际拥有: {expected_count - len(missing_dates)} 个")
     
     if missing_dates:
         print(f"\n⚠️  缺失日期 ({len(missing_dates)} 个):")
@@ -88,9 +87,8 @@ def check_data_integrity(etf_symbol: str, days: int = 30):
     print(f"{'='*60}")
     
     file_sizes = []
-    for csv_file in sorted(data_dir.glob('*.csv'))[-10:]:  # 检查最近10个文件
-        size = csv_file.stat().st_size
-        file_sizes.append((csv_file.name, size))
+    for date in csv_files[-10:]:  # 检查最近10个文件
+        file_sizes.append((f"{date}.csv", manifest.get(date).size))
     
     if file_sizes:
         avg_size = sum(s for _, s in file_sizes) / len(file_sizes)
@@ -105,6 +103,15 @@ def check_data_integrity(etf_symbol: str, days: int = 30):
             print(f"{status} {filename}: {size:,} bytes")
         
         print(f"\n平均文件大小: {avg_size:,.0f} bytes")
+    
+    # 检查清单与实际文件是否一致
+    drift = manifest.verify()
+    if any(drift.values()):
+        print(f"\n⚠️  清单与实际文件不一致: "
+              f"缺失文件 {len(drift['missing_files'])} 个，"
+              f"未登记 {len(drift['untracked_files'])} 个，"
+              f"已变更 {len(drift['changed_files'])} 个")
+        print(f"💡 重建清单: python3 main.py --rebuild-manifest")
 
 
 def check_all_etfs(days: int = 30):
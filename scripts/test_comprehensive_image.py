@@ -5,12 +5,12 @@
 
 import sys
 from pathlib import Path
-import pandas as pd
 
 # 添加项目路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.image_generator import ImageGenerator
+from src.storage import read_holdings_csv
 
 
 def test_comprehensive_image():
@@ -30,8 +30,8 @@ def test_comprehensive_image():
         print(f"❌ 数据文件不存在")
         return
     
-    current_df = pd.read_csv(current_file)
-    previous_df = pd.read_csv(previous_file)
+    current_df = read_holdings_csv(current_file)
+    previous_df = read_holdings_csv(previous_file)
     
     # 转换为字典列表
     current_holdings = current_df.to_dict('records')
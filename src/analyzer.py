@@ -5,13 +5,25 @@ ARK ETF 持仓变化分析模块
 """
 
 import logging
-from typing import Dict, List, Tuple
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Tuple
 from dataclasses import dataclass
+import numpy as np
 import pandas as pd
 
+if TYPE_CHECKING:
+    from .history import HoldingsHistory
+
 logger = logging.getLogger(__name__)
 
 
+# 变化类型（也是 HoldingsDiff.changes 中的排列顺序）
+CHANGE_TYPES = ('added', 'removed', 'increased', 'decreased', 'unchanged')
+
+# 默认多周期对比（交易日数）：日、周、月、季
+DEFAULT_HORIZONS = (1, 5, 20, 60)
+
+
 # ==================== 数据类定义 ====================
 
 @dataclass
@@ -27,7 +39,12 @@ class ChangeAnalysis:
 
 
 class ChangedHolding:
-    """持仓变化记录"""
+    """持仓变化记录（__slots__，不为每条记录创建 __dict__）"""
+    
+    __slots__ = (
+        'ticker', 'company', 'prev_shares', 'curr_shares',
+        'prev_weight', 'curr_weight', 'change_type', 'weight_change'
+    )
     
     def __init__(
         self,
@@ -51,16 +68,149 @@ class ChangedHolding:
     
     def to_dict(self) -> dict:
         """转换为字典格式"""
-        return {
-            'ticker': self.ticker,
-            'company': self.company,
-            'prev_shares': self.prev_shares,
-            'curr_shares': self.curr_shares,
-            'prev_weight': self.prev_weight,
-            'curr_weight': self.curr_weight,
-            'change_type': self.change_type,
-            'weight_change': self.weight_change
-        }
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class HoldingsDiff(Mapping):
+    """
+    持仓对比结果
+    
+    列式保存所有持仓的变化（changes），同时保留原来的字典接口：
+    result['added'] 等列表在首次访问时才生成 ChangedHolding 对象，
+    只需要数量时使用 count()，不会生成对象。
+    """
+    
+    # 列表视图：键 → (变化类型, 是否只取显著变化)
+    LIST_VIEWS = {
+        'added': ('added', False),
+        'removed': ('removed', False),
+        'increased': ('increased', False),
+        'decreased': ('decreased', False),
+        'significant_increased': ('increased', True),
+        'significant_decreased': ('decreased', True),
+    }
+    
+    KEYS = ('prev_date', 'curr_date', *LIST_VIEWS, 'unchanged')
+    
+    def __init__(self, prev_date: str, curr_date: str, changes: pd.DataFrame):
+        """
+        初始化对比结果
+        
+        Args:
+            prev_date: 前一日期
+            curr_date: 当前日期
+            changes: 列式变化表（每个 ticker 一行，见 Analyzer.compare_holdings）
+        """
+        self.prev_date = prev_date
+        self.curr_date = curr_date
+        self.changes = changes
+        
+        # 各类变化的数量在创建时统计，count() 不需要生成列表
+        codes = changes['change_type'].cat.codes.to_numpy()
+        significant = changes['significant'].to_numpy()
+        counts = np.bincount(codes, minlength=len(CHANGE_TYPES)).tolist()
+        self._counts = dict(zip(CHANGE_TYPES, counts))
+        for key in ('significant_increased', 'significant_decreased'):
+            code = CHANGE_TYPES.index(self.LIST_VIEWS[key][0])
+            self._counts[key] = int(np.count_nonzero(significant & (codes == code)))
+        self._views: Dict[str, List[ChangedHolding]] = {}
+    
+    def count(self, key: str) -> int:
+        """
+        获取某类变化的数量（不生成列表）
+        
+        Args:
+            key: 列表键（如 added、significant_increased）或 unchanged
+        
+        Returns:
+            数量
+        """
+        return int(self._counts.get(key, 0))
+    
+    def rows(self, key: str) -> pd.DataFrame:
+        """
+        获取某类变化的列式数据
+        
+        Args:
+            key: 列表键（如 added、significant_increased）
+        
+        Returns:
+            changes 中对应的行
+        """
+        change_type, significant_only = self.LIST_VIEWS[key]
+        mask = self.changes['change_type'] == change_type
+        if significant_only:
+            mask &= self.changes['significant']
+        return self.changes[mask]
+    
+    def __getitem__(self, key: str):
+        if key == 'prev_date':
+            return self.prev_date
+        if key == 'curr_date':
+            return self.curr_date
+        if key == 'unchanged':
+            return self.count('unchanged')
+        if key not in self.LIST_VIEWS:
+            raise KeyError(key)
+        
+        if key not in self._views:
+            rows = self.rows(key)
+            self._views[key] = [
+                ChangedHolding(*values)
+                for values in zip(
+                    rows['ticker'].tolist(),
+                    rows['company'].tolist(),
+                    rows['prev_shares'].tolist(),
+                    rows['curr_shares'].tolist(),
+                    rows['prev_weight'].tolist(),
+                    rows['curr_weight'].tolist(),
+                    rows['change_type'].astype(object).tolist(),
+                    rows['weight_change'].tolist()
+                )
+            ]
+        return self._views[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+    
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+
+def count_changes(result: Mapping[str, Any], key: str) -> int:
+    """
+    获取某类变化的数量（兼容 HoldingsDiff 和普通字典形式的结果）
+
+    Args:
+        result: HoldingsDiff，或 {'added': [...], ..., 'unchanged': 数量} 字典
+        key: 列表键（如 added、significant_increased）或 unchanged
+
+    Returns:
+        数量
+    """
+    if isinstance(result, HoldingsDiff):
+        return result.count(key)
+    if key == 'unchanged':
+        return int(result.get('unchanged', 0))
+    return len(result.get(key, ()))
+
+
+def _take(values: np.ndarray, rows: np.ndarray, fill) -> np.ndarray:
+    """按行号取值，行号 -1 取 fill"""
+    return np.append(values, np.array([fill], dtype=values.dtype))[rows]
+
+
+def _last_rows(tickers: np.ndarray) -> Tuple[pd.Index, np.ndarray]:
+    """
+    ticker 去重（按首次出现顺序）及每个 ticker 最后一次出现的行号
+
+    Returns:
+        (去重后的 ticker 索引, 对应的行号数组)
+    """
+    index = pd.Index(tickers, dtype=object)
+    last = np.flatnonzero(~index.duplicated(keep='last'))
+    unique = index.unique()
+    return unique, last[pd.Index(tickers[last], dtype=object).get_indexer(unique)]
 
 
 class Analyzer:
@@ -82,10 +232,12 @@ class Analyzer:
         previous_df: pd.DataFrame,
         prev_date: str,
         curr_date: str
-    ) -> Dict:
+    ) -> HoldingsDiff:
         """
         对比两个日期的持仓变化
         
+        按 ticker 对齐两天的持仓后用布尔掩码一次性分类，不逐行构造对象。
+        
         Args:
             current_df: 当前日期的持仓数据
             previous_df: 前一日期的持仓数据
@@ -93,7 +245,7 @@ class Analyzer:
             curr_date: 当前日期（YYYY-MM-DD）
         
         Returns:
-            分析结果字典，包含：
+            分析结果（HoldingsDiff，可按字典方式访问），包含：
             - prev_date: 前一日期
             - curr_date: 当前日期
             - added: 新增持仓列表
@@ -103,128 +255,197 @@ class Analyzer:
             - significant_increased: 显著增持列表
             - significant_decreased: 显著减持列表
             - unchanged: 未变化持仓数量
+            列表在首次访问时才从列式结果（HoldingsDiff.changes）生成
         """
         logger.info(f"开始对比持仓变化: {prev_date} → {curr_date}")
         
         # 确保数据格式正确
-        current_df = self._ensure_dataframe_format(current_df)
-        previous_df = self._ensure_dataframe_format(previous_df)
-        
-        # 创建 ticker 到行的映射
-        prev_holdings = {row['ticker']: row for _, row in previous_df.iterrows()}
-        curr_holdings = {row['ticker']: row for _, row in current_df.iterrows()}
-        
-        prev_tickers = set(prev_holdings.keys())
-        curr_tickers = set(curr_holdings.keys())
-        
-        # 分类持仓变化
-        added_tickers = curr_tickers - prev_tickers
-        removed_tickers = prev_tickers - curr_tickers
-        common_tickers = prev_tickers & curr_tickers
-        
-        # 新增持仓
-        added = [
-            ChangedHolding(
-                ticker=ticker,
-                company=curr_holdings[ticker]['company'],
-                curr_shares=curr_holdings[ticker]['shares'],
-                curr_weight=curr_holdings[ticker]['weight'],
-                change_type='added'
-            )
-            for ticker in added_tickers
-        ]
-        
-        # 移除持仓
-        removed = [
-            ChangedHolding(
-                ticker=ticker,
-                company=prev_holdings[ticker]['company'],
-                prev_shares=prev_holdings[ticker]['shares'],
-                prev_weight=prev_holdings[ticker]['weight'],
-                change_type='removed'
-            )
-            for ticker in removed_tickers
-        ]
+        curr_tickers, curr_company, curr_shares, curr_weight = self._extract_columns(current_df)
+        prev_tickers, prev_company, prev_shares, prev_weight = self._extract_columns(previous_df)
         
-        # 分析权重变化
-        increased = []
-        decreased = []
-        unchanged_count = 0
+        # ticker → 行号（同一 ticker 出现多次时保留最后一行）
+        curr_keys, curr_last = _last_rows(curr_tickers)
+        prev_keys, prev_last = _last_rows(prev_tickers)
         
-        for ticker in common_tickers:
-            prev_row = prev_holdings[ticker]
-            curr_row = curr_holdings[ticker]
-            
-            prev_weight = prev_row['weight']
-            curr_weight = curr_row['weight']
-            weight_change = curr_weight - prev_weight
-            
-            if abs(weight_change) < 0.01:  # 变化小于 0.01% 视为未变化
-                unchanged_count += 1
+        # 对齐：当前持仓在前（保持原顺序），只在前一日出现的持仓追加在后；
+        # 行号 -1 表示当天没有该持仓
+        prev_only = prev_keys[~prev_keys.isin(curr_keys)]
+        tickers = curr_keys.append(prev_only)
+        curr_rows = np.concatenate([curr_last, np.full(len(prev_only), -1, dtype=curr_last.dtype)])
+        prev_rows = _take(prev_last, prev_keys.get_indexer(tickers), -1)
+        
+        added = prev_rows < 0
+        removed = curr_rows < 0
+        
+        # 新增持仓的前一日数值、移除持仓的当日数值记为 0
+        company = np.where(
+            removed,
+            _take(prev_company, prev_rows, None),
+            _take(curr_company, curr_rows, None)
+        )
+        result = self._classify(
+            prev_date, curr_date,
+            tickers.to_numpy(dtype=object), company,
+            _take(prev_shares, prev_rows, 0.0), _take(curr_shares, curr_rows, 0.0),
+            _take(prev_weight, prev_rows, 0.0), _take(curr_weight, curr_rows, 0.0),
+            added, removed
+        )
+        
+        logger.info(
+            f"对比完成: 新增 {result.count('added')}, 移除 {result.count('removed')}, "
+            f"增持 {result.count('increased')}, 减持 {result.count('decreased')}, "
+            f"显著增持 {result.count('significant_increased')}, "
+            f"显著减持 {result.count('significant_decreased')}, "
+            f"未变化 {result['unchanged']}"
+        )
+        
+        return result
+    
+    def compare_horizons(
+        self,
+        history: 'HoldingsHistory',
+        horizons: Iterable[int] = DEFAULT_HORIZONS
+    ) -> Dict[str, HoldingsDiff]:
+        """
+        在同一份对齐的持仓历史上计算多个周期的持仓变化
+        
+        每个周期都是最新一天与 N 个交易日之前的一天对比，分类规则与
+        compare_holdings 相同（1 个交易日的结果与 compare_holdings 一致）。
+        
+        Args:
+            history: 持仓历史（HoldingsHistory.load 读取）
+            horizons: 周期列表（交易日数），如 [1, 5, 20, 60]
+        
+        Returns:
+            {周期名（如 '5d'）: 分析结果}，按周期升序；历史数据不足的周期被跳过
+        """
+        results = {}
+        last = len(history.dates) - 1
+        if last < 1:
+            logger.info(f"{history.etf_symbol} 历史数据不足，跳过多周期对比")
+            return results
+        
+        curr_held = history.held[last]
+        shares = history.values['shares']
+        weight = history.values['weight']
+        
+        for days in sorted(set(horizons)):
+            base = last - days
+            if base < 0:
+                logger.debug(f"{history.etf_symbol} 历史数据不足 {days + 1} 天，跳过 {days}d 对比")
                 continue
             
-            changed = ChangedHolding(
-                ticker=ticker,
-                company=curr_row['company'],
-                prev_shares=prev_row['shares'],
-                curr_shares=curr_row['shares'],
-                prev_weight=prev_weight,
-                curr_weight=curr_weight,
-                weight_change=weight_change
-            )
+            # 当日持有的股票在前，只在基准日持有的股票在后（与 compare_holdings 相同）
+            prev_held = history.held[base]
+            cols = np.concatenate([
+                np.flatnonzero(curr_held),
+                np.flatnonzero(prev_held & ~curr_held)
+            ])
+            added = ~prev_held[cols]
+            removed = ~curr_held[cols]
             
-            if weight_change > 0:
-                changed.change_type = 'increased'
-                increased.append(changed)
-            else:
-                changed.change_type = 'decreased'
-                decreased.append(changed)
+            results[f"{days}d"] = self._classify(
+                history.dates[base], history.dates[last],
+                history.tickers[cols], history.companies[cols],
+                np.where(added, 0.0, shares[base, cols]), np.where(removed, 0.0, shares[last, cols]),
+                np.where(added, 0.0, weight[base, cols]), np.where(removed, 0.0, weight[last, cols]),
+                added, removed
+            )
         
-        # 按权重变化幅度排序
-        increased.sort(key=lambda x: x.weight_change, reverse=True)
-        decreased.sort(key=lambda x: x.weight_change)
+        logger.info(
+            f"{history.etf_symbol} 多周期对比完成: " + ", ".join(
+                f"{name} 新增 {r.count('added')} 移除 {r.count('removed')} "
+                f"增持 {r.count('increased')} 减持 {r.count('decreased')}"
+                for name, r in results.items()
+            )
+        )
+        return results
+    
+    def _classify(
+        self,
+        prev_date: str,
+        curr_date: str,
+        tickers: np.ndarray,
+        company: np.ndarray,
+        prev_shares: np.ndarray,
+        curr_shares: np.ndarray,
+        prev_weight: np.ndarray,
+        curr_weight: np.ndarray,
+        added: np.ndarray,
+        removed: np.ndarray
+    ) -> HoldingsDiff:
+        """
+        对已对齐的两天持仓分类并生成列式结果
         
-        # 筛选显著变化
-        significant_increased = [h for h in increased if h.weight_change >= self.threshold]
-        significant_decreased = [h for h in decreased if abs(h.weight_change) >= self.threshold]
-        
-        result = {
-            'prev_date': prev_date,
-            'curr_date': curr_date,
-            'added': added,
-            'removed': removed,
-            'increased': increased,
-            'decreased': decreased,
-            'significant_increased': significant_increased,
-            'significant_decreased': significant_decreased,
-            'unchanged': unchanged_count
-        }
+        Args:
+            prev_date: 前一日期
+            curr_date: 当前日期
+            tickers: 股票代码（两天的并集，每只一个）
+            company: 公司名称
+            prev_shares / curr_shares / prev_weight / curr_weight:
+                两天的数值（未持有的一天已记为 0）
+            added: 仅当天持有的掩码
+            removed: 仅前一天持有的掩码
         
-        logger.info(
-            f"对比完成: 新增 {len(added)}, 移除 {len(removed)}, "
-            f"增持 {len(increased)}, 减持 {len(decreased)}, "
-            f"显著增持 {len(significant_increased)}, 显著减持 {len(significant_decreased)}, "
-            f"未变化 {unchanged_count}"
+        Returns:
+            分析结果
+        """
+        common = ~(added | removed)
+        weight_change = np.where(common, curr_weight - prev_weight, 0.0)
+        
+        # 分析权重变化（变化小于 0.01% 视为未变化）
+        unchanged = common & (np.abs(weight_change) < 0.01)
+        increased = common & ~unchanged & (weight_change > 0)
+        decreased = common & ~unchanged & ~increased
+        
+        # 筛选显著变化
+        significant = (
+            (increased & (weight_change >= self.threshold))
+            | (decreased & (np.abs(weight_change) >= self.threshold))
         )
         
-        return result
+        # 变化类型编码（CHANGE_TYPES 的下标）
+        codes = np.select([added, removed, increased, decreased], [0, 1, 2, 3], default=4)
+        
+        # 排序：新增、移除保持原顺序，增持按变化幅度降序，减持按变化幅度升序
+        sort_key = np.select([increased, decreased], [-weight_change, weight_change], default=0.0)
+        order = np.lexsort((sort_key, codes))
+        
+        changes = pd.DataFrame({
+            'ticker': tickers[order],
+            'company': company[order],
+            'prev_shares': prev_shares[order],
+            'curr_shares': curr_shares[order],
+            'prev_weight': prev_weight[order],
+            'curr_weight': curr_weight[order],
+            'weight_change': weight_change[order],
+            'change_type': pd.Categorical.from_codes(codes[order], categories=CHANGE_TYPES),
+            'significant': significant[order]
+        })
+        
+        return HoldingsDiff(prev_date, curr_date, changes)
     
-    def _ensure_dataframe_format(self, df: pd.DataFrame) -> pd.DataFrame:
-        """确保 DataFrame 格式正确"""
+    def _extract_columns(self, df: pd.DataFrame) -> Tuple[np.ndarray, ...]:
+        """
+        检查字段并取出对比所需的列
+        
+        Returns:
+            (ticker, company, shares, weight) 数组，数值列转换为 float64
+        """
         required_cols = ['company', 'ticker', 'shares', 'market_value', 'weight']
         
         if not all(col in df.columns for col in required_cols):
             raise ValueError(f"DataFrame 缺少必需字段，需要: {required_cols}")
         
         # 确保数值类型正确
-        df = df.copy()
-        df['shares'] = pd.to_numeric(df['shares'], errors='coerce')
-        df['market_value'] = pd.to_numeric(df['market_value'], errors='coerce')
-        df['weight'] = pd.to_numeric(df['weight'], errors='coerce')
-        
-        return df
+        return (
+            df['ticker'].to_numpy(dtype=object),
+            df['company'].to_numpy(dtype=object),
+            pd.to_numeric(df['shares'], errors='coerce').to_numpy(dtype='float64'),
+            pd.to_numeric(df['weight'], errors='coerce').to_numpy(dtype='float64')
+        )
     
-    def get_summary_stats(self, analysis_result: Dict) -> Dict:
+    def get_summary_stats(self, analysis_result: HoldingsDiff) -> Dict:
         """
         获取变化摘要统计
         
@@ -235,12 +456,12 @@ class Analyzer:
             统计信息字典
         """
         return {
-            'total_added': len(analysis_result['added']),
-            'total_removed': len(analysis_result['removed']),
-            'total_increased': len(analysis_result['increased']),
-            'total_decreased': len(analysis_result['decreased']),
-            'significant_increased': len(analysis_result['significant_increased']),
-            'significant_decreased': len(analysis_result['significant_decreased']),
-            'unchanged': analysis_result['unchanged'],
+            'total_added': count_changes(analysis_result, 'added'),
+            'total_removed': count_changes(analysis_result, 'removed'),
+            'total_increased': count_changes(analysis_result, 'increased'),
+            'total_decreased': count_changes(analysis_result, 'decreased'),
+            'significant_increased': count_changes(analysis_result, 'significant_increased'),
+            'significant_decreased': count_changes(analysis_result, 'significant_decreased'),
+            'unchanged': count_changes(analysis_result, 'unchanged'),
             'threshold': self.threshold
         }
@@ -0,0 +1,271 @@
+"""
+HTTP 录制/回放模块
+
+录制模式把共享 Session 上的每一次 HTTP 交互（DataFetcher 下载、WeChatNotifier 推送）
+写入磁带文件；回放模式从磁带返回响应，不访问网络，并按录制时的耗时或指定的固定
+延迟等待，用于离线测量端到端耗时、在本地复现线上的慢运行。
+
+磁带为 gzip 压缩的 JSON Lines，每行一次交互（只保存响应，不保存请求体）：
+
+    {"method": "GET", "url": "https://arkfunds.io/...", "status": 200, "reason": "OK",
+     "headers": {...}, "body": "...", "encoding": "utf-8", "elapsed": 0.231}
+
+URL 中的 key 参数（企业微信 Webhook 密钥）写入磁带前会被替换。
+"""
+
+import os
+import gzip
+import json
+import time
+import base64
+import logging
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass, asdict
+from datetime import timedelta
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+
+# 不写入磁带的 URL 参数
+REDACTED_PARAMS = {'key'}
+
+# 响应体已解压保存，回放时不能再带这些头
+DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+
+
+@dataclass
+class HttpExchange:
+    """一次录制的 HTTP 交互"""
+    method: str
+    url: str                           # 已脱敏的 URL
+    status: int
+    reason: str
+    headers: Dict[str, str]
+    body: bytes
+    elapsed: float                     # 录制时的耗时（秒）
+
+    def to_json(self) -> str:
+        """序列化为磁带中的一行"""
+        raw = asdict(self)
+        try:
+            raw['body'] = self.body.decode('utf-8')
+            raw['encoding'] = 'utf-8'
+        except UnicodeDecodeError:
+            raw['body'] = base64.b64encode(self.body).decode('ascii')
+            raw['encoding'] = 'base64'
+        return json.dumps(raw, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, line: str) -> 'HttpExchange':
+        """从磁带中的一行解析"""
+        raw = json.loads(line)
+        encoding = raw.pop('encoding', 'utf-8')
+        body = raw['body']
+        raw['body'] = base64.b64decode(body) if encoding == 'base64' else body.encode('utf-8')
+        return cls(**raw)
+
+
+def redact_url(url: str) -> str:
+    """替换 URL 中的敏感参数（录制和匹配都使用脱敏后的 URL）"""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+
+    query = [
+        (name, '***' if name in REDACTED_PARAMS else value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query, safe='*')))
+
+
+class Cassette:
+    """HTTP 磁带（录制或回放）"""
+
+    def __init__(self, path: str, mode: str, latency: Optional[float] = None):
+        """
+        初始化磁带
+
+        Args:
+            path: 磁带文件路径
+            mode: record（录制）或 replay（回放）
+            latency: 回放时每次请求的固定延迟（秒），None 表示使用录制时的耗时
+
+        Raises:
+            ValueError: mode 不合法
+            FileNotFoundError: 回放时磁带文件不存在
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"无效的磁带模式: {mode}")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+
+        self._lock = threading.Lock()
+        self._recorded: List[HttpExchange] = []
+        self._queues: Dict[Tuple[str, str], Deque[HttpExchange]] = defaultdict(deque)
+        self._last: Dict[Tuple[str, str], HttpExchange] = {}
+
+        if mode == 'replay':
+            self._load()
+
+        logger.info(f"初始化 HTTP 磁带（{mode}）: {self.path}")
+
+    def install(self, session: requests.Session) -> None:
+        """
+        将录制/回放适配器挂载到 Session（替换原有连接池适配器）
+
+        Args:
+            session: 共享的 HTTP Session
+        """
+        if self.mode == 'record':
+            # 录制时沿用 Session 原有的连接池配置
+            pool = session.get_adapter('https://')
+            adapter = RecordingAdapter(
+                self,
+                pool_connections=getattr(pool, '_pool_connections', 10),
+                pool_maxsize=getattr(pool, '_pool_maxsize', 10),
+                max_retries=0
+            )
+        else:
+            adapter = ReplayAdapter(self)
+
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+    # ==================== 录制 ====================
+
+    def record(self, exchange: HttpExchange) -> None:
+        """记录一次交互（线程安全，并发下载时按完成顺序记录）"""
+        with self._lock:
+            self._recorded.append(exchange)
+
+    def save(self) -> int:
+        """
+        原子写入磁带文件
+
+        Returns:
+            写入的交互数
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+
+        with self._lock:
+            exchanges = list(self._recorded)
+
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            for exchange in exchanges:
+                f.write(exchange.to_json() + '\n')
+        os.replace(tmp_path, self.path)
+
+        logger.info(f"✅ HTTP 磁带已保存: {self.path}（{len(exchanges)} 次交互）")
+        return len(exchanges)
+
+    # ==================== 回放 ====================
+
+    def next_exchange(self, method: str, url: str) -> Optional[HttpExchange]:
+        """
+        取出与请求匹配的下一次交互
+
+        同一 (方法, URL) 的交互按录制顺序依次返回，用完后重复返回最后一次。
+
+        Args:
+            method: 请求方法
+            url: 请求 URL（未脱敏）
+
+        Returns:
+            匹配的交互；磁带中没有该请求时返回 None
+        """
+        key = (method.upper(), redact_url(url))
+
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            return self._last.get(key)
+
+    def delay_for(self, exchange: HttpExchange) -> float:
+        """回放时的等待时间（秒）"""
+        return self.latency if self.latency is not None else exchange.elapsed
+
+    def _load(self) -> None:
+        """读取磁带文件"""
+        if not self.path.exists():
+            raise FileNotFoundError(f"HTTP 磁带不存在: {self.path}")
+
+        count = 0
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    exchange = HttpExchange.from_json(line)
+                    self._queues[(exchange.method, exchange.url)].append(exchange)
+                    count += 1
+
+        logger.info(f"读取 HTTP 磁带: {self.path}（{count} 次交互）")
+
+
+class RecordingAdapter(HTTPAdapter):
+    """正常发送请求，同时把响应写入磁带"""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+
+        self.cassette.record(HttpExchange(
+            method=request.method,
+            url=redact_url(request.url),
+            status=response.status_code,
+            reason=response.reason or '',
+            headers={
+                name: value for name, value in response.headers.items()
+                if name.lower() not in DROPPED_HEADERS
+            },
+            body=response.content,
+            elapsed=response.elapsed.total_seconds()
+        ))
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """从磁带返回响应，不访问网络"""
+
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        exchange = self.cassette.next_exchange(request.method, request.url)
+        if exchange is None:
+            raise requests.ConnectionError(
+                f"HTTP 磁带中没有该请求: {request.method} {redact_url(request.url)}",
+                request=request
+            )
+
+        delay = self.cassette.delay_for(exchange)
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = exchange.status
+        response.reason = exchange.reason
+        response.headers = CaseInsensitiveDict(exchange.headers)
+        response._content = exchange.body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=delay)
+        return response
+
+    def close(self):
+        pass
@@ -5,14 +5,23 @@
 """
 
 import os
-import time
 import logging
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from .utils import Config, ensure_dir, get_holding_file_path
+from .storage import create_holdings_store, read_holdings_csv
+from .manifest import HoldingsManifest
+from .http_client import get_timeout
+from .http_cache import ResponseCache
+from .holdings_client import HoldingsClient
+from .sources import DailySource, HistorySource, create_daily_source, create_history_source
+from .retry import RetryPolicy
+from .repository import HoldingsRepository
 
 
 logger = logging.getLogger(__name__)
@@ -23,8 +32,8 @@ class DataFetcher:
     数据获取类
     
     负责：
-    1. 从数据源下载持仓 CSV 数据
-    2. 保存数据到本地文件
+    1. 从数据源（ARKFunds.io / GitHub / 本地回放）获取持仓数据
+    2. 保存数据到本地文件（CSV，启用列式/SQLite 存储时同步写入）
     3. 从本地文件加载数据
     """
     
@@ -37,34 +46,65 @@ class DataFetcher:
         'ARKF': 'ARK_FINTECH_INNOVATION_ETF_ARKF_HOLDINGS',
     }
     
-    # 主数据源：ARKFunds.io API（推荐，数据最新）
-    # 由开源项目维护，数据来源于 ARK Invest 官方
-    # GitHub: https://github.com/frefrik/ark-invest-api
-    # 返回格式：JSON，包含当日最新持仓数据
-    ARKFUNDS_API_TEMPLATE = "https://arkfunds.io/api/v1/etf/holdings?symbol={etf_symbol}"
+    # 历史回填时并行写入 CSV 的线程数
+    BACKFILL_WRITE_WORKERS = 8
     
-    # 备用数据源1：GitHub 历史数据（仅用于历史回溯）
-    # 注意：此数据源已停止更新（最后更新 2021-09-08）
-    # 仅用于下载历史数据，不应作为主数据源
-    GITHUB_URL_TEMPLATE = "https://raw.githubusercontent.com/thisjustinh/ark-invest-history/master/fund-holdings/{etf_symbol}.csv"
-    
-    # 备用数据源2：ARK 官网（不可用）
+    # 备用数据源：ARK 官网（不可用）
     # ARK 官网存在 Cloudflare 保护，经测试会返回 403/404 错误
     # ARK_URL_TEMPLATE = "https://ark-funds.com/wp-content/fundsiteliterature/csv/{full_name}.csv"
     
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        repository: Optional[HoldingsRepository] = None,
+        session: Optional[requests.Session] = None,
+        response_cache: Optional[ResponseCache] = None,
+        source: Optional[DailySource] = None,
+        history_source: Optional[HistorySource] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
         """
         初始化 DataFetcher
         
         Args:
             config: 系统配置对象
+            repository: 共享的持仓仓库（可选，传入后本地读取走仓库缓存）
+            session: 共享的 HTTP Session（可选，不传时每次请求单独建立连接）
+            response_cache: API 响应缓存（可选，不传时每次都完整下载）
+            source: 每日持仓数据源（可选，不传时按 config.source.daily 创建）
+            history_source: 历史数据源（可选，不传时按 config.source.history 创建）
+            retry_policy: 共享的重试策略（可选，不传时按 config.retry 创建）
         """
         self.config = config
-        self.timeout = 30  # HTTP 请求超时时间（秒）
+        self.timeout = get_timeout(config.http)  # HTTP 请求超时时间（连接, 读取）
+        self.http = session if session is not None else requests
+        self.retry_policy = retry_policy or RetryPolicy.from_config(config.retry)
+        self.response_cache = response_cache
+        self.repository = repository
+        
+        # 下载和格式转换（数据源只依赖该客户端，不依赖 DataFetcher）
+        self.client = HoldingsClient(self.http, self.timeout, self.retry_policy, response_cache)
+        
+        # 数据源
+        self.source = source or create_daily_source(
+            config.source.daily, self.client, config.source.replay_dir
+        )
+        self.history_source = history_source or create_history_source(
+            config.source.history, self.client, config.source.replay_dir
+        )
+        
+        # 存储后端（backend 为 csv 时为 None）
+        if repository is not None:
+            self.store = repository.store
+        else:
+            self.store = create_holdings_store(
+                config.data.data_dir,
+                config.storage.backend
+            )
     
     def fetch_holdings(self, etf_symbol: str, date: str) -> pd.DataFrame:
         """
-        下载指定 ETF 的持仓数据（使用真实API）
+        从每日持仓数据源获取指定 ETF 的持仓数据
         
         Args:
             etf_symbol: ETF 代码（如 'ARKK'）
@@ -77,348 +117,61 @@ class DataFetcher:
         Raises:
             requests.RequestException: 网络请求失败
             ValueError: 数据格式不正确或缺少必需列
+            FileNotFoundError: 回放数据源中没有该 ETF 的数据
         """
-        # 检查 ETF 是否支持
-        if etf_symbol not in self.ETF_FULL_NAMES:
-            logger.error(f"不支持的 ETF 代码: {etf_symbol}，支持的代码: {list(self.ETF_FULL_NAMES.keys())}")
-            raise ValueError(f"不支持的 ETF 代码: {etf_symbol}")
-        
-        # 优先使用 ARKFunds.io API（真实数据）
-        url = self.ARKFUNDS_API_TEMPLATE.format(etf_symbol=etf_symbol)
-        logger.info(f"开始下载 {etf_symbol} 持仓数据: {url}")
-        
         try:
-            # 使用重试机制下载JSON数据
-            json_data = self._download_json_with_retry(url)
-            
-            # 转换JSON为DataFrame
-            df = self._transform_json(json_data, etf_symbol, date)
+            df = self.source.fetch_latest(etf_symbol, date)
             
             logger.info(f"✅ {etf_symbol} 数据下载成功，共 {len(df)} 条记录")
             return df
             
         except Exception as e:
-            logger.error(f"ARKFunds.io API 获取失败: {e}")
-            logger.warning("注意：当前没有可用的真实数据源")
+            logger.error(f"{self.source.name} 数据源获取失败: {e}")
             raise
     
-    def _download_json_with_retry(self, url: str) -> dict:
-        """
-        使用重试机制下载 JSON 数据
-        
-        Args:
-            url: API URL
-            
-        Returns:
-            JSON 响应数据（字典）
-            
-        Raises:
-            requests.RequestException: 重试耗尽后仍失败
-        """
-        max_retries = self.config.retry.max_retries
-        retry_delays = self.config.retry.retry_delays
-        
-        last_exception = None
-        
-        for attempt in range(max_retries):
-            try:
-                logger.debug(f"尝试下载 (第 {attempt + 1}/{max_retries} 次)...")
-                
-                # 添加 User-Agent
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-                response = requests.get(url, timeout=self.timeout, headers=headers)
-                response.raise_for_status()  # 抛出 HTTP 错误
-                
-                # 解析 JSON
-                json_data = response.json()
-                
-                logger.debug(f"下载成功，数据日期: {json_data.get('date', 'unknown')}")
-                return json_data
-            
-            except (requests.RequestException, ValueError) as e:
-                last_exception = e
-                logger.warning(f"下载失败 (第 {attempt + 1} 次): {e}")
-                
-                # 如果还有重试机会，等待后重试
-                if attempt < max_retries - 1:
-                    delay = retry_delays[attempt]
-                    logger.info(f"等待 {delay} 秒后重试...")
-                    time.sleep(delay)
-        
-        # 所有重试都失败
-        error_msg = f"下载失败，已重试 {max_retries} 次: {last_exception}"
-        logger.error(error_msg)
-        raise requests.RequestException(error_msg)
-    
-    def _transform_json(
-        self, 
-        json_data: dict, 
-        etf_symbol: str, 
-        date: str
-    ) -> pd.DataFrame:
+    def fetch_many(
+        self,
+        etf_symbols: List[str],
+        dates: List[str],
+        max_workers: int = 5
+    ) -> Iterator[Tuple[str, Dict[str, pd.DataFrame], Optional[Exception]]]:
         """
-        转换 ARKFunds.io API JSON 格式到标准 DataFrame
-        
-        Args:
-            json_data: API 返回的 JSON 数据
-            etf_symbol: ETF 代码
-            date: 日期（用于覆盖API返回的日期，如果需要）
-            
-        Returns:
-            转换后的 DataFrame
-            
-        Raises:
-            ValueError: 缺少必需字段或数据格式错误
-        """
-        logger.info(f"转换 JSON 数据到 DataFrame...")
-        
-        # 验证 JSON 结构
-        if 'holdings' not in json_data:
-            raise ValueError("JSON 数据缺少 'holdings' 字段")
-        
-        holdings = json_data['holdings']
-        api_date = json_data.get('date', date)  # 使用API返回的日期
-        
-        logger.info(f"API 数据日期: {api_date}, 持仓数量: {len(holdings)}")
-        
-        # 转换为 DataFrame
-        df = pd.DataFrame(holdings)
+        并发下载多只 ETF 的持仓数据，按完成顺序逐个返回
         
-        # 添加日期和 ETF 代码列
-        df['date'] = api_date
-        df['etf_symbol'] = etf_symbol
-        
-        # 确保必需列存在
-        required_columns = ['company', 'ticker', 'shares', 'market_value', 'weight']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            raise ValueError(
-                f"JSON 数据缺少必需字段: {missing_columns}\n"
-                f"实际字段: {df.columns.tolist()}"
-            )
-        
-        # 处理 ticker 为 null 的情况（某些资产没有ticker，如货币基金）
-        df['ticker'] = df['ticker'].fillna('N/A')
-        
-        # 确保 cusip 列存在
-        if 'cusip' not in df.columns:
-            df['cusip'] = None
-        
-        # 选择并排序列
-        final_columns = [
-            'date', 'etf_symbol', 'company', 'ticker', 
-            'cusip', 'shares', 'market_value', 'weight'
-        ]
-        
-        df = df[final_columns]
-        
-        # 数据类型转换
-        df['shares'] = pd.to_numeric(df['shares'], errors='coerce')
-        df['market_value'] = pd.to_numeric(df['market_value'], errors='coerce')
-        df['weight'] = pd.to_numeric(df['weight'], errors='coerce')
-        
-        # 删除无效行
-        original_count = len(df)
-        df = df.dropna(subset=['ticker', 'shares'])
-        dropped_count = original_count - len(df)
-        
-        if dropped_count > 0:
-            logger.warning(f"删除 {dropped_count} 条无效记录")
-        
-        logger.info(f"✅ 数据转换成功，有效记录: {len(df)} 条")
-        return df
-    
-    def _download_with_retry(self, url: str) -> pd.DataFrame:
-        """
-        使用重试机制下载 CSV
+        所有 (ETF, 日期) 请求同时提交到线程池，某只 ETF 的全部日期下载完成后
+        立即返回该 ETF，调用方可以边下载边处理。
         
         Args:
-            url: CSV 文件 URL
+            etf_symbols: ETF 代码列表
+            dates: 每只 ETF 需要下载的日期列表
+            max_workers: 最大并发请求数
             
-        Returns:
-            原始 DataFrame
-            
-        Raises:
-            requests.RequestException: 重试耗尽后仍失败
+        Yields:
+            (etf_symbol, {日期: DataFrame}, error)；任一日期下载失败时
+            error 为第一个异常，DataFrame 字典可能不完整
         """
-        max_retries = self.config.retry.max_retries
-        retry_delays = self.config.retry.retry_delays
-        
-        last_exception = None
-        
-        for attempt in range(max_retries):
-            try:
-                logger.debug(f"尝试下载 (第 {attempt + 1}/{max_retries} 次)...")
-                
-                # 添加 User-Agent 避免 403 错误
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-                response = requests.get(url, timeout=self.timeout, headers=headers)
-                response.raise_for_status()  # 抛出 HTTP 错误
-                
-                # 使用 pandas 读取 CSV
-                # 尝试检测分隔符类型
-                text_sample = response.text[:1000]  # 取前1000个字符检测
-                
-                if '\t' in text_sample:
-                    # Tab 分隔
-                    sep = '\t'
-                elif ',' in text_sample.split('\n')[0]:
-                    # 逗号分隔
-                    sep = ','
-                else:
-                    # 多个空格分隔
-                    sep = r'\s+'
-                
-                df = pd.read_csv(
-                    pd.io.common.StringIO(response.text),
-                    encoding='utf-8',
-                    sep=sep,
-                    engine='python' if sep == r'\s+' else 'c'
-                )
-                
-                logger.debug(f"下载成功，原始列名: {df.columns.tolist()}")
-                return df
-            
-            except (requests.RequestException, pd.errors.ParserError) as e:
-                last_exception = e
-                logger.warning(f"下载失败 (第 {attempt + 1} 次): {e}")
+        pending = {etf: len(dates) for etf in etf_symbols}
+        frames = {etf: {} for etf in etf_symbols}
+        errors: Dict[str, Optional[Exception]] = {etf: None for etf in etf_symbols}
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = {
+                pool.submit(self.fetch_holdings, etf, date): (etf, date)
+                for etf in etf_symbols
+                for date in dates
+            }
+            
+            for future in as_completed(futures):
+                etf, date = futures[future]
+                try:
+                    frames[etf][date] = future.result()
+                except Exception as e:
+                    if errors[etf] is None:
+                        errors[etf] = e
                 
-                # 如果还有重试机会，等待后重试
-                if attempt < max_retries - 1:
-                    delay = retry_delays[attempt]
-                    logger.info(f"等待 {delay} 秒后重试...")
-                    time.sleep(delay)
-        
-        # 所有重试都失败
-        error_msg = f"下载失败，已重试 {max_retries} 次: {last_exception}"
-        logger.error(error_msg)
-        raise requests.RequestException(error_msg)
-    
-    def _transform_csv(
-        self, 
-        df: pd.DataFrame, 
-        etf_symbol: str, 
-        date: str
-    ) -> pd.DataFrame:
-        """
-        转换 ARK CSV 格式到标准格式
-        
-        Args:
-            df: 原始 DataFrame
-            etf_symbol: ETF 代码
-            date: 日期
-            
-        Returns:
-            转换后的 DataFrame
-            
-        Raises:
-            ValueError: 缺少必需列或数据格式错误
-        """
-        # 0. 如果是 GitHub 历史数据格式，筛选最新日期
-        # GitHub 数据包含所有历史记录（数千行），需自动筛选最新日期
-        # 列名第一列是 date（或需要转换为 date）
-        if 'date' in df.columns or df.columns[0].lower() == 'date':
-            logger.info("检测到历史数据格式，筛选最新日期")
-            
-            # 确保第一列是 date
-            if df.columns[0] != 'date':
-                df.columns = ['date'] + list(df.columns[1:])
-            
-            # 转换日期并筛选最新
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
-            df = df.dropna(subset=['date'])
-            
-            max_date = df['date'].max()
-            df = df[df['date'] == max_date].copy()
-            
-            logger.info(f"筛选出最新日期 {max_date.strftime('%Y-%m-%d')} 的数据，共 {len(df)} 条")
-            
-            # 转换日期格式为字符串
-            df['date'] = df['date'].dt.strftime('%Y-%m-%d')
-        
-        # 1. 清理列名（去除空格、转小写、替换特殊字符）
-        df.columns = (
-            df.columns
-            .str.strip()
-            .str.lower()
-            .str.replace(r'[^a-z0-9]', '_', regex=True)
-            .str.replace(r'_+', '_', regex=True)
-            .str.strip('_')
-        )
-        
-        logger.debug(f"清理后列名: {df.columns.tolist()}")
-        
-        # 2. 列名映射（ARK CSV 列名 → 标准列名）
-        # ARK CSV 常见列名：date, fund, company, ticker, cusip, shares, market_value, weight
-        column_mapping = {
-            'fund': 'etf_symbol',
-            'market_value': 'market_value',
-            'weight': 'weight'
-        }
-        
-        # 尝试多种可能的列名变体
-        for original_col in df.columns:
-            # 处理带美元符号的列名（如 market_value_$）
-            if 'market' in original_col and 'value' in original_col:
-                column_mapping[original_col] = 'market_value'
-            # 处理带百分号的列名（如 weight_%）
-            elif 'weight' in original_col:
-                column_mapping[original_col] = 'weight'
-        
-        df = df.rename(columns=column_mapping)
-        
-        # 3. 验证必需列
-        required_columns = ['company', 'ticker', 'shares', 'market_value', 'weight']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            raise ValueError(
-                f"CSV 缺少必需列: {missing_columns}\n"
-                f"实际列名: {df.columns.tolist()}"
-            )
-        
-        # 4. 添加日期和 ETF 代码列
-        if 'date' not in df.columns:
-            df['date'] = date
-        else:
-            # 转换日期格式（如果存在）
-            df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
-        
-        if 'etf_symbol' not in df.columns:
-            df['etf_symbol'] = etf_symbol
-        
-        # 5. 数值类型转换
-        df['shares'] = pd.to_numeric(df['shares'], errors='coerce')
-        df['market_value'] = pd.to_numeric(df['market_value'], errors='coerce')
-        df['weight'] = pd.to_numeric(df['weight'], errors='coerce')
-        
-        # 6. 删除无效行（ticker 或 shares 为空）
-        original_count = len(df)
-        df = df.dropna(subset=['ticker', 'shares'])
-        dropped_count = original_count - len(df)
-        
-        if dropped_count > 0:
-            logger.warning(f"删除 {dropped_count} 条无效记录")
-        
-        # 7. 选择并排序列
-        final_columns = [
-            'date', 'etf_symbol', 'company', 'ticker', 
-            'cusip', 'shares', 'market_value', 'weight'
-        ]
-        
-        # 添加缺失的可选列（如 cusip）
-        for col in final_columns:
-            if col not in df.columns:
-                df[col] = None
-        
-        df = df[final_columns]
-        
-        return df
+                pending[etf] -= 1
+                if pending[etf] == 0:
+                    yield etf, frames.pop(etf), errors[etf]
     
     def save_to_csv(
         self, 
@@ -440,6 +193,8 @@ class DataFetcher:
         Side Effects:
             - 创建目录 data/holdings/{etf_symbol}/（如不存在）
             - 如文件已存在，记录警告日志但不覆盖
+            - 更新 data/holdings/{etf_symbol}/manifest.json
+            - 启用列式/SQLite 存储时，同步写入 data/store/{backend}/
         """
         file_path = get_holding_file_path(
             self.config.data.data_dir, 
@@ -466,10 +221,22 @@ class DataFetcher:
             error_msg = f"文件保存失败 {file_path}: {e}"
             logger.error(error_msg)
             raise IOError(error_msg)
+        
+        # 登记到清单
+        HoldingsManifest(self.config.data.data_dir, etf_symbol).record(date, df)
+        
+        # 同步写入存储后端
+        if self.store is not None:
+            self.store.write(df, etf_symbol, date)
+        
+        # 刷新仓库缓存（新文件直接放入缓存，后续读取无需再解析）
+        if self.repository is not None:
+            self.repository.invalidate(etf_symbol, date)
+            self.repository.put(etf_symbol, date, df)
     
     def load_from_csv(self, etf_symbol: str, date: str) -> pd.DataFrame:
         """
-        从本地 CSV 文件加载持仓数据
+        从本地加载持仓数据（优先读取存储后端，其次 CSV 文件）
         
         Args:
             etf_symbol: ETF 代码
@@ -482,6 +249,14 @@ class DataFetcher:
             FileNotFoundError: 文件不存在
             pd.errors.ParserError: CSV 解析失败
         """
+        if self.repository is not None:
+            return self.repository.get(etf_symbol, date)
+        
+        if self.store is not None and self.store.has_date(etf_symbol, date):
+            df = self.store.read(etf_symbol, start_date=date, end_date=date)
+            logger.debug(f"从存储后端加载数据: {etf_symbol}/{date}，共 {len(df)} 条记录")
+            return df
+        
         file_path = get_holding_file_path(
             self.config.data.data_dir,
             etf_symbol,
@@ -495,7 +270,7 @@ class DataFetcher:
             )
         
         try:
-            df = pd.read_csv(file_path, encoding='utf-8')
+            df = read_holdings_csv(file_path)
             logger.debug(f"从本地加载数据: {file_path}，共 {len(df)} 条记录")
             return df
         except pd.errors.ParserError as e:
@@ -503,6 +278,37 @@ class DataFetcher:
             logger.error(error_msg)
             raise pd.errors.ParserError(error_msg)
     
+    def load_comparison_holdings(
+        self,
+        etf_symbol: str,
+        target_date: str
+    ) -> Tuple[Optional[str], Optional[pd.DataFrame]]:
+        """
+        加载对比日持仓：本地已保存的、早于目标日期的最近一个交易日
+        
+        Args:
+            etf_symbol: ETF 代码
+            target_date: 目标日期 YYYY-MM-DD
+            
+        Returns:
+            (对比日期, 持仓 DataFrame)；本地没有更早的数据时返回 (None, None)
+        """
+        manifest = HoldingsManifest(self.config.data.data_dir, etf_symbol)
+        
+        # 从最近的日期往前找，跳过无法读取的文件
+        date = manifest.latest_date(before=target_date)
+        while date is not None:
+            try:
+                df = self.load_from_csv(etf_symbol, date)
+                logger.info(f"对比数据使用本地历史: {etf_symbol}/{date}")
+                return date, df
+            except (FileNotFoundError, pd.errors.ParserError) as e:
+                logger.warning(f"本地历史数据不可用，尝试更早的日期: {e}")
+            
+            date = manifest.latest_date(before=date)
+        
+        return None, None
+    
     def file_exists(self, etf_symbol: str, date: str) -> bool:
         """
         检查持仓数据文件是否存在
@@ -527,7 +333,10 @@ class DataFetcher:
         days: int = 90
     ) -> int:
         """
-        从 GitHub 下载历史数据并保存
+        从历史数据源下载历史数据并保存
+        
+        整个文件一次解析、一次标准化，再按日期 groupby 一次拆分，
+        各日期的 CSV 并行写入。
         
         Args:
             etf_symbol: ETF 代码
@@ -536,64 +345,111 @@ class DataFetcher:
         Returns:
             成功下载的文件数量
         """
-        from datetime import datetime, timedelta
-        
         logger.info(f"开始下载 {etf_symbol} 最近 {days} 天的历史数据")
         
-        # 下载 GitHub 完整历史数据
-        url = self.GITHUB_URL_TEMPLATE.format(etf_symbol=etf_symbol)
-        logger.info(f"从 GitHub 下载历史数据: {url}")
-        
         try:
-            # 下载完整历史数据
-            df_all = self._download_with_retry(url)
-            
-            # 确保第一列是 date
-            if df_all.columns[0] != 'date':
-                df_all.columns = ['date'] + list(df_all.columns[1:])
+            # 下载并标准化完整历史数据
+            df_all = self._transform_history(self.history_source.fetch_history(etf_symbol), etf_symbol)
             
-            # 转换日期列
-            df_all['date'] = pd.to_datetime(df_all['date'], errors='coerce')
-            df_all = df_all.dropna(subset=['date'])
+            if df_all.empty:
+                logger.warning(f"{etf_symbol} 历史数据为空")
+                return 0
             
-            # 计算日期范围
-            end_date = df_all['date'].max()
-            start_date = end_date - timedelta(days=days)
+            # 计算日期范围（date 列为 YYYY-MM-DD 字符串，可直接比较）
+            end_date = pd.Timestamp(df_all['date'].max())
+            start_str = (end_date - timedelta(days=days)).strftime('%Y-%m-%d')
             
-            logger.info(f"历史数据时间范围: {start_date.strftime('%Y-%m-%d')} 至 {end_date.strftime('%Y-%m-%d')}")
+            logger.info(f"历史数据时间范围: {start_str} 至 {end_date.strftime('%Y-%m-%d')}")
             
-            # 筛选指定天数的数据
-            df_filtered = df_all[df_all['date'] >= start_date].copy()
+            # 筛选指定天数的数据，并按日期一次拆分
+            df_filtered = df_all[df_all['date'] >= start_str]
+            existing = set(HoldingsManifest(self.config.data.data_dir, etf_symbol).dates())
             
-            # 按日期分组保存
-            success_count = 0
-            dates = sorted(df_filtered['date'].unique())
-            
-            for date in dates:
-                date_str = date.strftime('%Y-%m-%d')
-                
-                # 检查文件是否已存在
-                if self.file_exists(etf_symbol, date_str):
+            frames = {}
+            for date_str, df_day in df_filtered.groupby('date', sort=True):
+                if date_str in existing or self.file_exists(etf_symbol, date_str):
                     logger.debug(f"文件已存在，跳过: {etf_symbol}/{date_str}")
                     continue
-                
-                # 筛选当天数据
-                df_day = df_filtered[df_filtered['date'] == date].copy()
-                
-                # 转换格式
-                df_day = self._transform_csv(df_day, etf_symbol, date_str)
-                
-                # 保存文件
-                self.save_to_csv(df_day, etf_symbol, date_str)
-                success_count += 1
+                frames[date_str] = df_day.reset_index(drop=True)
+            
+            # 批量保存
+            saved_dates = self.save_many_to_csv(frames, etf_symbol)
             
-            logger.info(f"✅ {etf_symbol} 历史数据下载完成: 新增 {success_count} 个文件")
-            return success_count
+            logger.info(f"✅ {etf_symbol} 历史数据下载完成: 新增 {len(saved_dates)} 个文件")
+            return len(saved_dates)
             
         except Exception as e:
             logger.error(f"❌ {etf_symbol} 历史数据下载失败: {e}")
             return 0
     
+    def _transform_history(self, df: pd.DataFrame, etf_symbol: str) -> pd.DataFrame:
+        """
+        标准化完整历史数据
+        
+        Args:
+            df: 原始 DataFrame
+            etf_symbol: ETF 代码
+            
+        Returns:
+            标准格式 DataFrame（date 列为 YYYY-MM-DD 字符串，无法解析的日期已丢弃）
+        """
+        # 确保第一列是 date
+        if df.columns[0] != 'date':
+            df.columns = ['date'] + list(df.columns[1:])
+        
+        return self.client.standardize_columns(df, etf_symbol, None)
+    
+    def save_many_to_csv(self, frames: Dict[str, pd.DataFrame], etf_symbol: str) -> List[str]:
+        """
+        批量保存多天的持仓数据（历史回填用）
+        
+        CSV 文件并行写入；清单、存储后端在全部写完后统一更新一次，
+        避免每天都重写一遍。
+        
+        Args:
+            frames: {日期: 持仓 DataFrame}
+            etf_symbol: ETF 代码
+            
+        Returns:
+            实际保存的日期列表（已存在的文件被跳过，不覆盖）
+        """
+        data_dir = self.config.data.data_dir
+        
+        to_write = {
+            date: df for date, df in frames.items()
+            if not os.path.exists(get_holding_file_path(data_dir, etf_symbol, date))
+        }
+        
+        if not to_write:
+            return []
+        
+        # 先加载清单（写入新文件后再加载会触发全量重建）
+        manifest = HoldingsManifest(data_dir, etf_symbol)
+        ensure_dir(str(Path(data_dir) / "holdings" / etf_symbol))
+        
+        def write_one(date: str) -> None:
+            file_path = get_holding_file_path(data_dir, etf_symbol, date)
+            to_write[date].to_csv(file_path, index=False, encoding='utf-8', sep=',')
+        
+        # 并行写入 CSV（各日期文件互不相关）
+        with ThreadPoolExecutor(max_workers=self.BACKFILL_WRITE_WORKERS) as pool:
+            list(pool.map(write_one, to_write))
+        
+        saved_dates = sorted(to_write)
+        logger.info(f"✅ 数据已保存: {etf_symbol} {len(saved_dates)} 个文件（{saved_dates[0]} 至 {saved_dates[-1]}）")
+        
+        # 登记到清单
+        manifest.record_many(to_write)
+        
+        # 同步写入存储后端（一次写入）
+        if self.store is not None:
+            self.store.write_many(etf_symbol, to_write)
+        
+        if self.repository is not None:
+            self.repository.invalidate(etf_symbol)
+        
+        return saved_dates
+    
     def cleanup_old_data(self, retention_days: int = 90) -> dict:
         """
         清理过期的历史数据
@@ -610,6 +466,8 @@ class DataFetcher:
         
         cutoff_date = datetime.now() - timedelta(days=retention_days)
         cutoff_str = cutoff_date.strftime('%Y-%m-%d')
+        # 截止日当天的文件同样删除，首个保留的日期是截止日的下一天
+        keep_from = (cutoff_date + timedelta(days=1)).strftime('%Y-%m-%d')
         
         logger.info(f"删除早于 {cutoff_str} 的数据")
         
@@ -628,22 +486,31 @@ class DataFetcher:
             etf_symbol = etf_dir.name
             deleted_files = []
             
-            # 遍历该 ETF 的所有 CSV 文件
-            for csv_file in etf_dir.glob("*.csv"):
+            # 遍历磁盘上的 CSV 文件（清单之外的文件同样清理）
+            for csv_file in sorted(etf_dir.glob("*.csv")):
                 try:
                     # 从文件名提取日期（格式：YYYY-MM-DD.csv）
                     file_date_str = csv_file.stem
                     file_date = datetime.strptime(file_date_str, '%Y-%m-%d')
                     
-                    # 如果早于截止日期，删除
+                    # 如果早于截止时间（截止日当天 0 点也早于截止时间，同样删除）
                     if file_date < cutoff_date:
                         csv_file.unlink()
                         deleted_files.append(file_date_str)
+                        if self.repository is not None:
+                            self.repository.invalidate(etf_symbol, file_date_str)
                         logger.debug(f"删除过期文件: {csv_file}")
                 
                 except (ValueError, OSError) as e:
                     logger.warning(f"处理文件失败 {csv_file}: {e}")
             
+            # 清单和存储后端按同一边界清理：保留截止日之后的日期
+            manifest = HoldingsManifest(self.config.data.data_dir, etf_symbol)
+            manifest.remove([d for d in manifest.dates() if d < keep_from])
+            
+            if self.store is not None:
+                self.store.delete_before(etf_symbol, keep_from)
+            
             if deleted_files:
                 stats[etf_symbol] = {
                     'deleted_count': len(deleted_files),
@@ -0,0 +1,226 @@
+"""
+持仓历史模块
+
+把一只 ETF 最近若干个交易日的持仓一次性读入并对齐成面板（日期 × 股票）：
+
+    history.dates    = ['2025-01-13', '2025-01-14', '2025-01-15']
+    history.tickers  = ['TSLA', 'COIN', ...]          # 按首次出现顺序
+    history.held     # bool (日期数, 股票数)，当日是否持有
+    history.values['shares' / 'weight' / 'market_value']  # float64，未持有为 NaN
+
+多周期对比（Analyzer.compare_horizons）和趋势图从同一个对象切片，
+不再为每个周期、每个图表单独读取文件。
+"""
+
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from .repository import HoldingsRepository
+
+logger = logging.getLogger(__name__)
+
+
+# 读取的列
+HISTORY_COLUMNS = ['ticker', 'company', 'shares', 'market_value', 'weight']
+
+# 对齐成面板的数值字段
+VALUE_FIELDS = ('shares', 'weight', 'market_value')
+
+
+class HoldingsHistory:
+    """单只 ETF 的对齐持仓历史（只读）"""
+
+    def __init__(
+        self,
+        etf_symbol: str,
+        dates: List[str],
+        tickers: np.ndarray,
+        companies: np.ndarray,
+        held: np.ndarray,
+        values: Dict[str, np.ndarray]
+    ):
+        """
+        初始化持仓历史（通常通过 load / from_frames 创建）
+
+        Args:
+            etf_symbol: ETF 代码
+            dates: 升序日期列表
+            tickers: 股票代码数组（列索引）
+            companies: 每只股票最近一次出现时的公司名称
+            held: 持有标记，形状 (日期数, 股票数)
+            values: {字段: 数值数组}，形状 (日期数, 股票数)
+        """
+        self.etf_symbol = etf_symbol
+        self.dates = dates
+        self.tickers = tickers
+        self.companies = companies
+        self.held = held
+        self.values = values
+
+        self._row_index = {date: i for i, date in enumerate(dates)}
+        self._ticker_index = {ticker: j for j, ticker in enumerate(tickers.tolist())}
+
+    @classmethod
+    def from_frames(cls, etf_symbol: str, frames: Dict[str, pd.DataFrame]) -> 'HoldingsHistory':
+        """
+        将多天的持仓对齐成面板（同一天同一 ticker 多行时保留第一行）
+
+        Args:
+            etf_symbol: ETF 代码
+            frames: {日期: 持仓 DataFrame}
+
+        Returns:
+            持仓历史
+        """
+        dates = sorted(frames)
+        if not dates:
+            empty = np.zeros((0, 0))
+            return cls(
+                etf_symbol, [], np.array([], dtype=object), np.array([], dtype=object),
+                empty.astype(bool), {field: empty for field in VALUE_FIELDS}
+            )
+
+        # 合并为长表，一次完成 ticker 编码
+        combined = pd.concat([frames[date][HISTORY_COLUMNS] for date in dates], ignore_index=True)
+        rows = np.repeat(np.arange(len(dates)), [len(frames[date]) for date in dates])
+        codes, tickers = pd.factorize(combined['ticker'].to_numpy(dtype=object), use_na_sentinel=False)
+        n_tickers = len(tickers)
+
+        # 每个 (日期, ticker) 保留第一行（如多条 N/A 现金行）
+        _, first = np.unique(rows * n_tickers + codes, return_index=True)
+        keep = np.sort(first)
+        rows, codes = rows[keep], codes[keep]
+
+        held = np.zeros((len(dates), n_tickers), dtype=bool)
+        held[rows, codes] = True
+
+        values = {}
+        for field in VALUE_FIELDS:
+            column = pd.to_numeric(combined[field], errors='coerce').to_numpy(dtype='float64')
+            block = np.full((len(dates), n_tickers), np.nan)
+            block[rows, codes] = column[keep]
+            values[field] = block
+
+        # 公司名称取每只股票最后一次出现的行
+        company = combined['company'].to_numpy(dtype=object)[keep]
+        _, last_in_reversed = np.unique(codes[::-1], return_index=True)
+        companies = company[::-1][last_in_reversed]
+
+        return cls(etf_symbol, dates, np.asarray(tickers, dtype=object), companies, held, values)
+
+    @classmethod
+    def load(
+        cls,
+        repository: 'HoldingsRepository',
+        etf_symbol: str,
+        end_date: str,
+        days: Optional[int] = None
+    ) -> 'HoldingsHistory':
+        """
+        读取截至 end_date 的最近 days 个交易日（经由持仓仓库，一次批量读取）
+
+        Args:
+            repository: 持仓仓库
+            etf_symbol: ETF 代码
+            end_date: 结束日期（含）
+            days: 交易日数（None 表示本地全部日期）
+
+        Returns:
+            持仓历史（本地数据不足时日期数少于 days）
+        """
+        dates = [date for date in repository.list_dates(etf_symbol) if date <= end_date]
+        if days is not None:
+            dates = dates[-days:]
+        return cls.for_dates(repository, etf_symbol, dates)
+
+    @classmethod
+    def for_dates(
+        cls,
+        repository: 'HoldingsRepository',
+        etf_symbol: str,
+        dates: List[str]
+    ) -> 'HoldingsHistory':
+        """
+        读取指定日期序列的持仓历史（经由持仓仓库，一次批量读取）
+
+        Args:
+            repository: 持仓仓库
+            etf_symbol: ETF 代码
+            dates: 日期列表（升序）
+
+        Returns:
+            持仓历史（读取失败的日期会被跳过）
+        """
+        frames = repository.get_many(etf_symbol, dates, columns=HISTORY_COLUMNS)
+
+        history = cls.from_frames(etf_symbol, frames)
+        logger.debug(
+            f"读取 {etf_symbol} 持仓历史: {len(history.dates)} 天, {len(history.tickers)} 只股票"
+        )
+        return history
+
+    # ==================== 切片 ====================
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def row(self, date: str) -> Optional[int]:
+        """日期对应的行号（不存在时返回 None）"""
+        return self._row_index.get(date)
+
+    def covers(self, dates: List[str]) -> bool:
+        """检查是否包含给定的所有日期"""
+        return all(date in self._row_index for date in dates)
+
+    def series(
+        self,
+        field: str,
+        tickers: List[str],
+        dates: Optional[List[str]] = None,
+        fill_value: Optional[float] = 0.0
+    ) -> np.ndarray:
+        """
+        读取指定股票的时间序列
+
+        Args:
+            field: 字段名（shares / weight / market_value）
+            tickers: 股票代码列表（不在历史中的股票整列为缺失值）
+            dates: 日期列表（None 表示全部日期，需在历史中）
+            fill_value: 未持有时的填充值（None 表示保留 NaN）
+
+        Returns:
+            二维数组，形状为 (日期数, 股票数)
+        """
+        block = self.values[field]
+        rows = slice(None) if dates is None else [self._row_index[date] for date in dates]
+        n_rows = len(self.dates) if dates is None else len(rows)
+
+        result = np.full((n_rows, len(tickers)), np.nan)
+        for j, ticker in enumerate(tickers):
+            col = self._ticker_index.get(ticker)
+            if col is not None:
+                result[:, j] = block[rows, col]
+
+        if fill_value is not None:
+            result = np.where(np.isnan(result), fill_value, result)
+        return result
+
+    def totals(self, field: str, dates: Optional[List[str]] = None) -> np.ndarray:
+        """
+        读取每日合计（如基金总市值）
+
+        Args:
+            field: 字段名
+            dates: 日期列表（None 表示全部日期）
+
+        Returns:
+            一维数组，每个日期一个合计值
+        """
+        block = self.values[field]
+        if dates is not None:
+            block = block[[self._row_index[date] for date in dates]]
+        return np.nansum(block, axis=1)
@@ -0,0 +1,504 @@
+"""
+持仓下载客户端模块
+
+数据源（sources）通过 HoldingsClient 下载和转换持仓数据，不依赖 DataFetcher：
+
+- get_json / download_json：带重试的 JSON 下载（共享 RetryPolicy）
+- fetch_json：下载并转换 ARKFunds.io 响应（配置了响应缓存时走条件请求和转换结果缓存）
+- download_csv：带重试的 CSV 下载
+- transform_json / transform_csv / standardize_columns：转换为标准格式 DataFrame
+"""
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+
+from .http_cache import ResponseCache
+from .http_client import parse_json_response
+from .retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class HoldingsClient:
+    """持仓数据的下载（重试、响应缓存）和格式转换"""
+    
+    def __init__(
+        self,
+        http,
+        timeout,
+        retry_policy: RetryPolicy,
+        response_cache: Optional[ResponseCache] = None
+    ):
+        """
+        初始化下载客户端
+        
+        Args:
+            http: requests.Session 或 requests 模块
+            timeout: 请求超时（秒，或 (连接, 读取)）
+            retry_policy: 重试策略
+            response_cache: API 响应缓存（可选，不传时每次都完整下载）
+        """
+        self.http = http
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.response_cache = response_cache
+    
+    def fetch_json(self, url: str, etf_symbol: str, date: str) -> pd.DataFrame:
+        """
+        下载并转换 JSON 持仓数据（配置了响应缓存时经由缓存）
+        
+        Args:
+            url: API URL
+            etf_symbol: ETF 代码
+            date: 日期
+            
+        Returns:
+            标准格式 DataFrame
+        """
+        if self.response_cache is not None:
+            # 内容未变化时不重复下载/转换
+            return self._fetch_json_cached(url, etf_symbol, date)
+        
+        return self.transform_json(self.download_json(url), etf_symbol, date)
+    
+    def download_json(self, url: str) -> dict:
+        """
+        使用重试机制下载 JSON 数据
+        
+        Args:
+            url: API URL
+            
+        Returns:
+            JSON 响应数据（字典）
+            
+        Raises:
+            requests.RequestException: 重试耗尽后仍失败
+        """
+        _, json_data = self.get_json(url)
+        return json_data
+    
+    def get_json(
+        self,
+        url: str,
+        extra_headers: Optional[dict] = None
+    ) -> Tuple[requests.Response, Optional[dict]]:
+        """
+        使用重试机制发送 GET 请求并解析 JSON
+        
+        Args:
+            url: API URL
+            extra_headers: 额外请求头（如条件请求头）
+            
+        Returns:
+            (响应对象, JSON 数据)；服务器返回 304 时 JSON 数据为 None
+            
+        Raises:
+            requests.RequestException: 重试耗尽后仍失败
+        """
+        policy = self.retry_policy
+        max_retries = policy.max_retries
+        
+        last_exception = None
+        
+        for attempt in range(max_retries):
+            # 预算用完或主机已熔断时直接失败
+            policy.before_attempt(url)
+            
+            try:
+                logger.debug(f"尝试下载 (第 {attempt + 1}/{max_retries} 次)...")
+                
+                # 添加 User-Agent
+                headers = {
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                }
+                headers.update(extra_headers or {})
+                response = self.http.get(url, timeout=policy.clamp_timeout(self.timeout), headers=headers)
+                response.raise_for_status()  # 抛出 HTTP 错误
+                
+                # 条件请求命中：内容未变化
+                if response.status_code == 304:
+                    logger.debug("服务器返回 304，内容未变化")
+                    policy.record_success(url)
+                    return response, None
+                
+                # 解析 JSON
+                json_data = parse_json_response(response)
+                
+                logger.debug(f"下载成功，数据日期: {json_data.get('date', 'unknown')}")
+                policy.record_success(url)
+                return response, json_data
+            
+            except (requests.RequestException, ValueError) as e:
+                last_exception = e
+                policy.record_failure(url, e)
+                logger.warning(f"下载失败 (第 {attempt + 1} 次): {e}")
+                
+                # 如果还有重试机会，退避后重试（不超过运行预算）
+                if attempt < max_retries - 1:
+                    policy.wait(attempt + 1)
+        
+        # 所有重试都失败
+        error_msg = f"下载失败，已重试 {max_retries} 次: {last_exception}"
+        logger.error(error_msg)
+        raise requests.RequestException(error_msg)
+    
+    def _fetch_json_cached(self, url: str, etf_symbol: str, date: str) -> pd.DataFrame:
+        """
+        通过响应缓存获取并转换 JSON 数据
+        
+        - 缓存未过期：不发请求
+        - 缓存已过期：发送条件请求，304 时继续使用缓存
+        - 内容哈希未变化：直接复用已转换的 DataFrame，跳过 transform_json
+        
+        Args:
+            url: API URL
+            etf_symbol: ETF 代码
+            date: 日期
+            
+        Returns:
+            转换后的 DataFrame
+        """
+        cache = self.response_cache
+        entry = cache.get(url)
+        json_data = None
+        
+        if entry is not None and cache.is_fresh(entry):
+            logger.info(f"使用缓存的响应（未过期）: {url}")
+        else:
+            response, json_data = self.get_json(url, cache.conditional_headers(entry))
+            
+            if json_data is None and entry is not None:
+                logger.info(f"服务器确认内容未变化（304），使用缓存: {url}")
+                cache.touch(entry, response.headers)
+            elif entry is not None and cache.hash_payload(response.content) == entry.payload_hash:
+                logger.info(f"响应内容未变化，使用缓存: {url}")
+                cache.touch(entry, response.headers)
+            else:
+                entry = cache.store(url, response.content, response.headers, json_data.get('date'))
+        
+        frame_key = f"{entry.payload_hash}:{etf_symbol}:{date}"
+        df = cache.load_frame(entry, frame_key)
+        if df is not None:
+            logger.info(f"✅ {etf_symbol} 复用已转换数据，共 {len(df)} 条记录")
+            return df
+        
+        if json_data is None:
+            json_data = cache.load_payload(entry)
+        
+        df = self.transform_json(json_data, etf_symbol, date)
+        cache.store_frame(entry, frame_key, df)
+        return df
+    
+    def transform_json(
+        self, 
+        json_data: dict, 
+        etf_symbol: str, 
+        date: str
+    ) -> pd.DataFrame:
+        """
+        转换 ARKFunds.io API JSON 格式到标准 DataFrame
+        
+        Args:
+            json_data: API 返回的 JSON 数据
+            etf_symbol: ETF 代码
+            date: 日期（用于覆盖API返回的日期，如果需要）
+            
+        Returns:
+            转换后的 DataFrame
+            
+        Raises:
+            ValueError: 缺少必需字段或数据格式错误
+        """
+        logger.info(f"转换 JSON 数据到 DataFrame...")
+        
+        # 验证 JSON 结构
+        if 'holdings' not in json_data:
+            raise ValueError("JSON 数据缺少 'holdings' 字段")
+        
+        holdings = json_data['holdings']
+        api_date = json_data.get('date', date)  # 使用API返回的日期
+        
+        logger.info(f"API 数据日期: {api_date}, 持仓数量: {len(holdings)}")
+        
+        # 确保必需列存在
+        fields = set().union(*holdings) if holdings else set()
+        required_columns = ['company', 'ticker', 'shares', 'market_value', 'weight']
+        missing_columns = [col for col in required_columns if col not in fields]
+        
+        if missing_columns:
+            raise ValueError(
+                f"JSON 数据缺少必需字段: {missing_columns}\n"
+                f"实际字段: {sorted(fields)}"
+            )
+        
+        # 直接按列提取，不经过逐行字典构造 DataFrame
+        # ticker 为 null 的情况（某些资产没有ticker，如货币基金）填充为 N/A
+        company = np.array([h.get('company') for h in holdings], dtype=object)
+        ticker = np.array(
+            [t if t is not None else 'N/A' for t in (h.get('ticker') for h in holdings)],
+            dtype=object
+        )
+        cusip = np.array([h.get('cusip') for h in holdings], dtype=object)
+        shares = self._to_float64([h.get('shares') for h in holdings])
+        market_value = self._to_float64([h.get('market_value') for h in holdings])
+        weight = self._to_float64([h.get('weight') for h in holdings])
+        
+        # 删除无效行（shares 无法解析）
+        valid = ~np.isnan(shares)
+        dropped_count = int(len(valid) - valid.sum())
+        
+        if dropped_count > 0:
+            company, ticker, cusip = company[valid], ticker[valid], cusip[valid]
+            shares, market_value, weight = shares[valid], market_value[valid], weight[valid]
+            logger.warning(f"删除 {dropped_count} 条无效记录")
+        
+        # 一次性构造 DataFrame（列顺序即最终顺序）
+        count = len(shares)
+        df = pd.DataFrame({
+            'date': np.full(count, api_date, dtype=object),
+            'etf_symbol': np.full(count, etf_symbol, dtype=object),
+            'company': pd.Categorical(company),
+            'ticker': pd.Categorical(ticker),
+            'cusip': cusip,
+            'shares': shares,
+            'market_value': market_value,
+            'weight': weight,
+        })
+        
+        logger.info(f"✅ 数据转换成功，有效记录: {len(df)} 条")
+        return df
+    
+    @staticmethod
+    def _to_float64(values: list) -> np.ndarray:
+        """
+        将 JSON 数值列转换为 float64 数组
+        
+        Args:
+            values: 原始值列表（可能包含 None 或字符串）
+            
+        Returns:
+            float64 数组，无法解析的值为 NaN
+        """
+        try:
+            # 纯数值（None 转为 NaN）走 numpy 快速路径
+            return np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+    
+    def download_csv(self, url: str) -> pd.DataFrame:
+        """
+        使用重试机制下载 CSV
+        
+        Args:
+            url: CSV 文件 URL
+            
+        Returns:
+            原始 DataFrame
+            
+        Raises:
+            requests.RequestException: 重试耗尽后仍失败
+        """
+        policy = self.retry_policy
+        max_retries = policy.max_retries
+        
+        last_exception = None
+        
+        for attempt in range(max_retries):
+            # 预算用完或主机已熔断时直接失败
+            policy.before_attempt(url)
+            
+            try:
+                logger.debug(f"尝试下载 (第 {attempt + 1}/{max_retries} 次)...")
+                
+                # 添加 User-Agent 避免 403 错误
+                headers = {
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                }
+                response = self.http.get(url, timeout=policy.clamp_timeout(self.timeout), headers=headers)
+                response.raise_for_status()  # 抛出 HTTP 错误
+                
+                # 使用 pandas 读取 CSV
+                # 尝试检测分隔符类型
+                text_sample = response.text[:1000]  # 取前1000个字符检测
+                
+                if '\t' in text_sample:
+                    # Tab 分隔
+                    sep = '\t'
+                elif ',' in text_sample.split('\n')[0]:
+                    # 逗号分隔
+                    sep = ','
+                else:
+                    # 多个空格分隔
+                    sep = r'\s+'
+                
+                df = pd.read_csv(
+                    pd.io.common.StringIO(response.text),
+                    encoding='utf-8',
+                    sep=sep,
+                    engine='python' if sep == r'\s+' else 'c'
+                )
+                
+                logger.debug(f"下载成功，原始列名: {df.columns.tolist()}")
+                policy.record_success(url)
+                return df
+            
+            except (requests.RequestException, pd.errors.ParserError) as e:
+                last_exception = e
+                policy.record_failure(url, e)
+                logger.warning(f"下载失败 (第 {attempt + 1} 次): {e}")
+                
+                # 如果还有重试机会，退避后重试（不超过运行预算）
+                if attempt < max_retries - 1:
+                    policy.wait(attempt + 1)
+        
+        # 所有重试都失败
+        error_msg = f"下载失败，已重试 {max_retries} 次: {last_exception}"
+        logger.error(error_msg)
+        raise requests.RequestException(error_msg)
+    
+    def transform_csv(
+        self, 
+        df: pd.DataFrame, 
+        etf_symbol: str, 
+        date: str
+    ) -> pd.DataFrame:
+        """
+        转换 ARK CSV 格式到标准格式
+        
+        Args:
+            df: 原始 DataFrame
+            etf_symbol: ETF 代码
+            date: 日期
+            
+        Returns:
+            转换后的 DataFrame
+            
+        Raises:
+            ValueError: 缺少必需列或数据格式错误
+        """
+        # 0. 如果是 GitHub 历史数据格式，筛选最新日期
+        # GitHub 数据包含所有历史记录（数千行），需自动筛选最新日期
+        # 列名第一列是 date（或需要转换为 date）
+        if 'date' in df.columns or df.columns[0].lower() == 'date':
+            logger.info("检测到历史数据格式，筛选最新日期")
+            
+            # 确保第一列是 date
+            if df.columns[0] != 'date':
+                df.columns = ['date'] + list(df.columns[1:])
+            
+            # 转换日期并筛选最新
+            df['date'] = pd.to_datetime(df['date'], errors='coerce')
+            df = df.dropna(subset=['date'])
+            
+            max_date = df['date'].max()
+            df = df[df['date'] == max_date].copy()
+            
+            logger.info(f"筛选出最新日期 {max_date.strftime('%Y-%m-%d')} 的数据，共 {len(df)} 条")
+            
+            # 转换日期格式为字符串
+            df['date'] = df['date'].dt.strftime('%Y-%m-%d')
+        
+        return self.standardize_columns(df, etf_symbol, date)
+    
+    def standardize_columns(
+        self,
+        df: pd.DataFrame,
+        etf_symbol: str,
+        date: Optional[str]
+    ) -> pd.DataFrame:
+        """
+        清理列名、映射到标准列并转换类型（可处理单日数据或整段历史）
+        
+        Args:
+            df: 原始 DataFrame
+            etf_symbol: ETF 代码（原始数据没有 fund 列时使用）
+            date: 日期（原始数据没有 date 列时使用）
+            
+        Returns:
+            标准格式 DataFrame
+            
+        Raises:
+            ValueError: 缺少必需列
+        """
+        # 1. 清理列名（去除空格、转小写、替换特殊字符）
+        df.columns = (
+            df.columns
+            .str.strip()
+            .str.lower()
+            .str.replace(r'[^a-z0-9]', '_', regex=True)
+            .str.replace(r'_+', '_', regex=True)
+            .str.strip('_')
+        )
+        
+        logger.debug(f"清理后列名: {df.columns.tolist()}")
+        
+        # 2. 列名映射（ARK CSV 列名 → 标准列名）
+        # ARK CSV 常见列名：date, fund, company, ticker, cusip, shares, market_value, weight
+        column_mapping = {
+            'fund': 'etf_symbol',
+            'market_value': 'market_value',
+            'weight': 'weight'
+        }
+        
+        # 尝试多种可能的列名变体
+        for original_col in df.columns:
+            # 处理带美元符号的列名（如 market_value_$）
+            if 'market' in original_col and 'value' in original_col:
+                column_mapping[original_col] = 'market_value'
+            # 处理带百分号的列名（如 weight_%）
+            elif 'weight' in original_col:
+                column_mapping[original_col] = 'weight'
+        
+        df = df.rename(columns=column_mapping)
+        
+        # 3. 验证必需列
+        required_columns = ['company', 'ticker', 'shares', 'market_value', 'weight']
+        missing_columns = [col for col in required_columns if col not in df.columns]
+        
+        if missing_columns:
+            raise ValueError(
+                f"CSV 缺少必需列: {missing_columns}\n"
+                f"实际列名: {df.columns.tolist()}"
+            )
+        
+        # 4. 添加日期和 ETF 代码列
+        if 'date' not in df.columns:
+            df['date'] = date
+        else:
+            # 转换日期格式（如果存在），无法解析的日期与无效行一起删除
+            df['date'] = pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d')
+        
+        if 'etf_symbol' not in df.columns:
+            df['etf_symbol'] = etf_symbol
+        
+        # 5. 数值类型转换
+        df['shares'] = pd.to_numeric(df['shares'], errors='coerce')
+        df['market_value'] = pd.to_numeric(df['market_value'], errors='coerce')
+        df['weight'] = pd.to_numeric(df['weight'], errors='coerce')
+        
+        # 6. 删除无效行（日期、ticker 或 shares 为空）
+        original_count = len(df)
+        df = df.dropna(subset=['date', 'ticker', 'shares'])
+        dropped_count = original_count - len(df)
+        
+        if dropped_count > 0:
+            logger.warning(f"删除 {dropped_count} 条无效记录")
+        
+        # 7. 选择并排序列
+        final_columns = [
+            'date', 'etf_symbol', 'company', 'ticker', 
+            'cusip', 'shares', 'market_value', 'weight'
+        ]
+        
+        # 添加缺失的可选列（如 cusip）
+        for col in final_columns:
+            if col not in df.columns:
+                df[col] = None
+        
+        df = df[final_columns]
+        
+        return df
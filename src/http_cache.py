@@ -0,0 +1,219 @@
+"""
+HTTP 响应缓存模块
+
+按 URL 在本地缓存 API 原始响应，用于同一天多次运行（如 --manual 调试）：
+
+    data/cache/http/
+    ├── {key}.json        # 元数据：URL、ETag、Last-Modified、下载时间、内容哈希
+    ├── {key}.body        # 原始响应内容
+    └── {key}.frame.pkl   # 由该响应转换得到的 DataFrame
+
+- TTL 内直接使用缓存，不发请求
+- 过期后发送条件请求（If-None-Match / If-Modified-Since），304 时继续使用缓存
+- 服务器返回 200 但内容哈希不变时，直接复用已转换的 DataFrame
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+from .utils import Config
+from .http_client import loads_json
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    """缓存的响应元数据"""
+    url: str
+    payload_hash: str                  # 响应内容 SHA-256
+    fetched_at: float                  # 最近一次确认有效的时间（Unix 时间戳）
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    data_date: Optional[str] = None    # 响应中的 date 字段
+    frame_key: Optional[str] = None    # 已缓存 DataFrame 对应的 (哈希, ETF, 日期)
+
+
+class ResponseCache:
+    """基于文件的 HTTP 响应缓存"""
+
+    def __init__(self, data_dir: str, ttl_seconds: int = 900):
+        """
+        初始化响应缓存
+
+        Args:
+            data_dir: 数据存储根目录
+            ttl_seconds: 缓存有效期（秒），过期后发送条件请求重新验证
+        """
+        self.root = Path(data_dir) / "cache" / "http"
+        self.ttl_seconds = ttl_seconds
+
+        logger.info(f"初始化 ResponseCache，目录: {self.root}，有效期: {ttl_seconds} 秒")
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional['ResponseCache']:
+        """根据系统配置创建缓存（未启用时返回 None）"""
+        if not config.http.response_cache:
+            return None
+        return cls(config.data.data_dir, ttl_seconds=config.http.response_cache_ttl)
+
+    # ==================== 查询 ====================
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """
+        获取 URL 的缓存元数据
+
+        Args:
+            url: 请求 URL
+
+        Returns:
+            缓存元数据；未缓存或缓存损坏时返回 None
+        """
+        meta_path = self._path(url, '.json')
+        if not meta_path.exists() or not self._path(url, '.body').exists():
+            return None
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return CachedResponse(**json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"响应缓存损坏，忽略: {meta_path} ({e})")
+            return None
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        """检查缓存是否仍在有效期内"""
+        return time.time() - entry.fetched_at < self.ttl_seconds
+
+    def conditional_headers(self, entry: Optional[CachedResponse]) -> Dict[str, str]:
+        """
+        构造条件请求头
+
+        Args:
+            entry: 缓存元数据（None 表示没有缓存）
+
+        Returns:
+            If-None-Match / If-Modified-Since 请求头
+        """
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def load_payload(self, entry: CachedResponse) -> dict:
+        """读取缓存的 JSON 响应"""
+        with open(self._path(entry.url, '.body'), 'rb') as f:
+            return loads_json(f.read())
+
+    def load_frame(self, entry: CachedResponse, frame_key: str) -> Optional[pd.DataFrame]:
+        """
+        读取由该响应转换得到的 DataFrame
+
+        Args:
+            entry: 缓存元数据
+            frame_key: 期望的 (哈希, ETF, 日期) 键
+
+        Returns:
+            DataFrame；键不匹配或文件不存在时返回 None
+        """
+        frame_path = self._path(entry.url, '.frame.pkl')
+        if entry.frame_key != frame_key or not frame_path.exists():
+            return None
+
+        try:
+            return pd.read_pickle(frame_path)
+        except Exception as e:
+            logger.warning(f"DataFrame 缓存读取失败，重新转换: {frame_path} ({e})")
+            return None
+
+    # ==================== 写入 ====================
+
+    def store(self, url: str, body: bytes, headers, data_date: Optional[str] = None) -> CachedResponse:
+        """
+        保存新的响应
+
+        Args:
+            url: 请求 URL
+            body: 原始响应内容
+            headers: 响应头（读取 ETag / Last-Modified）
+            data_date: 响应中的 date 字段
+
+        Returns:
+            新的缓存元数据
+        """
+        entry = CachedResponse(
+            url=url,
+            payload_hash=self.hash_payload(body),
+            fetched_at=time.time(),
+            etag=headers.get('ETag'),
+            last_modified=headers.get('Last-Modified'),
+            data_date=data_date
+        )
+
+        self._atomic_write(self._path(url, '.body'), body)
+        self._save_meta(entry)
+        return entry
+
+    def touch(self, entry: CachedResponse, headers=None) -> None:
+        """
+        刷新缓存的确认时间（304 或内容未变化时调用）
+
+        Args:
+            entry: 缓存元数据
+            headers: 新响应头（可选，更新 ETag / Last-Modified）
+        """
+        entry.fetched_at = time.time()
+        if headers is not None:
+            entry.etag = headers.get('ETag') or entry.etag
+            entry.last_modified = headers.get('Last-Modified') or entry.last_modified
+        self._save_meta(entry)
+
+    def store_frame(self, entry: CachedResponse, frame_key: str, df: pd.DataFrame) -> None:
+        """
+        保存由该响应转换得到的 DataFrame
+
+        Args:
+            entry: 缓存元数据
+            frame_key: (哈希, ETF, 日期) 键
+            df: 转换结果
+        """
+        frame_path = self._path(entry.url, '.frame.pkl')
+        tmp_path = frame_path.with_name(frame_path.name + ".tmp")
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, frame_path)
+
+        entry.frame_key = frame_key
+        self._save_meta(entry)
+
+    @staticmethod
+    def hash_payload(body: bytes) -> str:
+        """计算响应内容哈希"""
+        return hashlib.sha256(body).hexdigest()
+
+    # ==================== 内部方法 ====================
+
+    def _path(self, url: str, suffix: str) -> Path:
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]
+        return self.root / f"{key}{suffix}"
+
+    def _save_meta(self, entry: CachedResponse) -> None:
+        content = json.dumps(asdict(entry), ensure_ascii=False, indent=2).encode('utf-8')
+        self._atomic_write(self._path(entry.url, '.json'), content)
+
+    def _atomic_write(self, path: Path, content: bytes) -> None:
+        """原子写入（先写临时文件再替换）"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
@@ -0,0 +1,120 @@
+"""
+HTTP 客户端模块
+
+提供共享的 requests.Session：
+- HTTPAdapter 连接池（按主机复用 TCP/TLS 连接，keep-alive）
+- 连接/读取超时从 config.yaml 的 http 配置读取
+- JSON 响应解析（安装 orjson 时使用 orjson，否则使用标准库 json）
+
+同一次运行中的数据下载（arkfunds.io）和企业微信推送（qyapi.weixin.qq.com）
+共用同一个 Session，避免每次请求都重新握手。
+"""
+
+import json
+import logging
+from typing import TYPE_CHECKING, Any, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .utils import HttpConfig
+
+if TYPE_CHECKING:
+    from .cassette import Cassette
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    # orjson 为可选依赖，未安装时使用标准库 json 解析
+    HAS_ORJSON = False
+
+
+def create_http_session(
+    http_config: HttpConfig,
+    cassette: Optional['Cassette'] = None
+) -> requests.Session:
+    """
+    创建带连接池的 HTTP Session
+
+    Args:
+        http_config: HTTP 配置
+        cassette: HTTP 磁带（可选，传入后挂载录制/回放适配器）
+
+    Returns:
+        requests.Session（http/https 均挂载连接池适配器）
+    """
+    session = requests.Session()
+
+    # 重试由调用方的重试逻辑负责，适配器本身不重试
+    adapter = HTTPAdapter(
+        pool_connections=http_config.pool_connections,
+        pool_maxsize=http_config.pool_maxsize,
+        max_retries=0
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    logger.info(
+        f"初始化 HTTP Session，连接池: {http_config.pool_connections} 个主机 × "
+        f"{http_config.pool_maxsize} 个连接"
+    )
+
+    if cassette is not None:
+        cassette.install(session)
+
+    return session
+
+
+def get_timeout(http_config: HttpConfig) -> Tuple[float, float]:
+    """
+    获取 requests 使用的超时设置
+
+    Args:
+        http_config: HTTP 配置
+
+    Returns:
+        (连接超时, 读取超时)，单位秒
+    """
+    return (http_config.connect_timeout, http_config.read_timeout)
+
+
+def loads_json(content: Union[bytes, str]) -> Any:
+    """
+    解析 JSON 内容（优先使用 orjson）
+
+    Args:
+        content: 原始响应内容（bytes 或 str）
+
+    Returns:
+        解析后的 Python 对象
+
+    Raises:
+        ValueError: 内容不是合法 JSON（orjson.JSONDecodeError 也是 ValueError 子类）
+    """
+    if HAS_ORJSON:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def parse_json_response(response: requests.Response) -> Any:
+    """
+    解析 JSON 响应
+
+    直接解析原始字节，跳过 requests 的编码探测和文本解码。
+
+    Args:
+        response: HTTP 响应
+
+    Returns:
+        解析后的 Python 对象
+
+    Raises:
+        ValueError: 响应不是合法 JSON
+    """
+    content = response.content
+    if not isinstance(content, (bytes, bytearray, str)):
+        return response.json()
+    return loads_json(content)
@@ -0,0 +1,204 @@
+"""
+图片上传编码模块
+
+企业微信图片消息限制 base64 编码前不超过 2MB，而综合报告长图高 48 英寸、150 dpi，
+持仓较多时接近甚至超过上限。原图在预算内时直接发送原图，不做任何重新编码；
+超出预算时依次尝试：
+
+    1. 调色板量化 PNG（256 色，图表颜色少，通常缩小 3-4 倍）
+    2. 优化 PNG（无损，量化后仍超限时）
+    3. JPEG（质量 85 / 70 / 55）
+    4. 缩小宽度后 JPEG（80% / 65% / 50%，相当于降低 dpi）
+
+编码结果写在原图旁边：
+
+    images/ARKK/
+    ├── 2025-01-15_comprehensive.png            # 原图
+    ├── 2025-01-15_comprehensive.upload.png     # 上传用图片（或 .jpg）
+    └── 2025-01-15_comprehensive.upload.json    # 选择的参数、字节数、MD5
+
+发送时读取 .upload.json，原图内容（MD5）和预算不变时直接复用，不重复编码。
+企业微信只支持 JPG 和 PNG，因此不使用 WebP。
+"""
+
+import io
+import os
+import json
+import hashlib
+import logging
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+# JPEG 质量阶梯
+JPEG_QUALITIES = [85, 70, 55]
+
+# 缩小宽度的比例阶梯（JPEG 仍超限时使用）
+SCALES = [0.8, 0.65, 0.5]
+
+
+class ImageTooLargeError(Exception):
+    """图片在所有编码方式下都超过字节预算"""
+    pass
+
+
+@dataclass
+class EncodedImage:
+    """上传用图片"""
+    path: str                   # 上传用图片路径（使用原图时即原图路径）
+    format: str                 # PNG / JPEG
+    size: int                   # 字节数
+    md5: str                    # 上传用图片的 MD5（企业微信校验用）
+    source_md5: str             # 原图的 MD5（判断是否可以复用）
+    max_bytes: int              # 编码时的字节预算
+    settings: Dict[str, Any] = field(default_factory=dict)  # 选择的编码参数
+
+    def read(self) -> bytes:
+        """读取上传用图片"""
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+def encode_for_upload(image_path: str, max_bytes: int) -> EncodedImage:
+    """
+    按字节预算编码上传用图片（原图和预算不变时复用上次的结果）
+
+    Args:
+        image_path: 原图路径
+        max_bytes: 字节预算（base64 编码前）
+
+    Returns:
+        上传用图片
+
+    Raises:
+        FileNotFoundError: 原图不存在
+        ImageTooLargeError: 所有编码方式都超过预算
+    """
+    source = Path(image_path)
+    with open(source, 'rb') as f:
+        data = f.read()
+    source_md5 = hashlib.md5(data).hexdigest()
+
+    sidecar = _sidecar_path(source)
+    encoded = _load_sidecar(sidecar, source_md5, max_bytes)
+    if encoded is not None:
+        logger.debug(f"复用上传编码: {encoded.path}")
+        return encoded
+
+    content, image_format, settings = _encode(data, max_bytes)
+
+    if settings['strategy'] == 'original':
+        path = source
+    else:
+        path = source.with_name(f"{source.stem}.upload.{'jpg' if image_format == 'JPEG' else 'png'}")
+        _atomic_write(path, content)
+
+    encoded = EncodedImage(
+        path=str(path),
+        format=image_format,
+        size=len(content),
+        md5=hashlib.md5(content).hexdigest(),
+        source_md5=source_md5,
+        max_bytes=max_bytes,
+        settings=settings
+    )
+    _atomic_write(sidecar, json.dumps(asdict(encoded), ensure_ascii=False, indent=2).encode('utf-8'))
+
+    logger.info(
+        f"上传编码: {source.name} {len(data) / 1024:.0f} KB -> {encoded.size / 1024:.0f} KB "
+        f"({settings['strategy']})"
+    )
+    return encoded
+
+
+# ==================== 内部方法 ====================
+
+def _encode(data: bytes, max_bytes: int) -> Tuple[bytes, str, Dict[str, Any]]:
+    """依次尝试各编码方式，返回 (内容, 格式, 参数)"""
+    image = Image.open(io.BytesIO(data))
+
+    # 原图在预算内：直接发送，不做有损量化
+    if image.format == 'PNG' and len(data) <= max_bytes:
+        return data, 'PNG', {'strategy': 'original'}
+
+    rgb = _flatten(image)
+
+    # 1. 调色板量化 PNG
+    palette = _save(rgb.quantize(256, method=Image.Quantize.FASTOCTREE), 'PNG', optimize=True)
+    if len(palette) <= max_bytes:
+        return palette, 'PNG', {'strategy': 'png-palette', 'colors': 256}
+
+    # 2. 优化 PNG（无损）
+    optimized = _save(rgb, 'PNG', optimize=True)
+    if len(optimized) <= max_bytes:
+        return optimized, 'PNG', {'strategy': 'png-optimized'}
+
+    # 3-4. JPEG，质量不够时逐级缩小宽度
+    for scale in [1.0] + SCALES:
+        scaled = rgb if scale == 1.0 else rgb.resize(
+            (max(1, round(rgb.width * scale)), max(1, round(rgb.height * scale))),
+            Image.Resampling.LANCZOS
+        )
+        for quality in JPEG_QUALITIES:
+            content = _save(scaled, 'JPEG', quality=quality, optimize=True)
+            if len(content) <= max_bytes:
+                return content, 'JPEG', {
+                    'strategy': 'jpeg', 'quality': quality, 'scale': scale, 'width': scaled.width
+                }
+
+    raise ImageTooLargeError(
+        f"图片压缩后仍超过上限 {max_bytes / 1024 / 1024:.1f} MB: "
+        f"{rgb.width}x{rgb.height}，最小 {len(content) / 1024 / 1024:.1f} MB"
+    )
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """转换为 RGB（透明部分以白色填充，与图表背景一致）"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _save(image: Image.Image, image_format: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def _sidecar_path(source: Path) -> Path:
+    return source.with_name(f"{source.stem}.upload.json")
+
+
+def _load_sidecar(sidecar: Path, source_md5: str, max_bytes: int):
+    """读取上次的编码结果（原图或预算变化、文件缺失时返回 None）"""
+    if not sidecar.exists():
+        return None
+
+    try:
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            encoded = EncodedImage(**json.load(f))
+    except Exception as e:
+        logger.warning(f"上传编码记录损坏，重新编码: {sidecar} ({e})")
+        return None
+
+    if encoded.source_md5 != source_md5 or encoded.max_bytes != max_bytes:
+        return None
+    if not os.path.exists(encoded.path) or os.path.getsize(encoded.path) != encoded.size:
+        return None
+    return encoded
+
+
+def _atomic_write(path: Path, content: bytes) -> None:
+    """原子写入（先写临时文件再替换）"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
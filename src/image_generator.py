@@ -5,18 +5,21 @@
 """
 
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
-import matplotlib.pyplot as plt
 import matplotlib
+# 在导入 pyplot 之前选择非交互式后端（不依赖显示环境，也不加载 GUI 工具包）
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
 from src.utils import ensure_dir
+from src.history import HoldingsHistory
+from src.manifest import HoldingsManifest
+from src.repository import HoldingsRepository
+from src.render_service import comprehensive_image_path, summary_image_path
 
 logger = logging.getLogger(__name__)
 
-# 使用非交互式后端
-matplotlib.use('Agg')
-
 # 配置中文字体（macOS 系统）
 plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
@@ -25,18 +28,34 @@ plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
 class ImageGenerator:
     """图片生成器"""
     
-    def __init__(self, data_dir: str = "./data"):
+    def __init__(
+        self,
+        data_dir: str = "./data",
+        store=None,
+        repository: Optional[HoldingsRepository] = None
+    ):
         """
         初始化图片生成器
         
         Args:
             data_dir: 数据存储根目录
+            store: 列式持仓存储（可选，启用后历史数据一次性读取）
+            repository: 共享的持仓仓库（可选，未传入时按 data_dir/store 新建）
         """
         self.data_dir = Path(data_dir)
+        self.repository = repository or HoldingsRepository(data_dir, store=store)
         self.image_dir = self.data_dir / "images"
         ensure_dir(str(self.image_dir))
         logger.info(f"初始化 ImageGenerator，图片目录: {self.image_dir}")
     
+    def comprehensive_image_path(self, etf_symbol: str, date: str) -> Path:
+        """综合报告长图的保存路径"""
+        return comprehensive_image_path(str(self.data_dir), etf_symbol, date)
+    
+    def summary_image_path(self, date: str) -> Path:
+        """汇总长图的保存路径"""
+        return summary_image_path(str(self.data_dir), date)
+    
     def generate_holdings_table(
         self,
         holdings: List[Dict],
@@ -343,6 +362,36 @@ class ImageGenerator:
         else:
             return f"${amount:.0f}"
     
+    def _load_history(self, etf_symbol: str, csv_files, columns: List[str]) -> Dict:
+        """
+        读取历史持仓数据（按日期分组，经由持仓仓库缓存）
+        
+        Args:
+            etf_symbol: ETF 代码
+            csv_files: 历史 CSV 文件列表（文件名即日期，已排序）
+            columns: 需要的列
+        
+        Returns:
+            {日期: DataFrame}，按日期升序
+        """
+        dates = [csv_file.stem for csv_file in csv_files]
+        return self.repository.get_many(etf_symbol, dates, columns=columns)
+    
+    def _shares_series(self, history: HoldingsHistory, dates: List[str], tickers: List[str]) -> Dict:
+        """
+        从持仓历史切出指定股票的持股数时间序列（该日期不持有时记为 0）
+        
+        Args:
+            history: 综合报告共用的持仓历史
+            dates: 日期列表（需在历史中）
+            tickers: 股票代码列表
+        
+        Returns:
+            {ticker: 持股数列表}
+        """
+        shares = history.series('shares', tickers, dates)
+        return {ticker: shares[:, j].tolist() for j, ticker in enumerate(tickers)}
+    
     def generate_fund_trend_chart(
         self,
         etf_symbol: str,
@@ -369,8 +418,8 @@ class ImageGenerator:
             logger.warning(f"历史数据目录不存在: {etf_dir}")
             return None
         
-        # 获取所有历史文件
-        csv_files = sorted(etf_dir.glob("*.csv"))
+        # 获取所有历史文件（从清单读取，无需扫描目录）
+        csv_files = HoldingsManifest(str(self.data_dir), etf_symbol).file_paths()
         
         if len(csv_files) < 2:
             logger.warning(f"历史数据不足（仅 {len(csv_files)} 天），需要至少2天数据")
@@ -382,16 +431,10 @@ class ImageGenerator:
         dates = []
         total_values = []
         
-        for csv_file in csv_files[-days:]:
-            try:
-                df = pd.read_csv(csv_file)
-                file_date = csv_file.stem  # 文件名即日期
-                total_value = df['market_value'].sum()
-                
-                dates.append(file_date)
-                total_values.append(total_value)
-            except Exception as e:
-                logger.warning(f"读取文件失败 {csv_file}: {e}")
+        history = self._load_history(etf_symbol, csv_files[-days:], ['market_value'])
+        for file_date, df in history.items():
+            dates.append(file_date)
+            total_values.append(df['market_value'].sum())
         
         if len(dates) < 2:
             logger.warning("有效数据不足")
@@ -465,7 +508,8 @@ class ImageGenerator:
         previous_df,
         etf_symbol: str,
         date: str,
-        added_tickers: List[str] = None
+        added_tickers: List[str] = None,
+        history: Optional[HoldingsHistory] = None
     ) -> str:
         """
         生成综合报告长图（包含所有内容）
@@ -477,6 +521,7 @@ class ImageGenerator:
             etf_symbol: ETF 代码
             date: 当前日期
             added_tickers: 新增股票代码列表（可选）
+            history: 已读取的持仓历史（可选，与多周期对比共用；未提供或未覆盖全部历史日期时在此一次读取）
         
         Returns:
             生成的图片路径
@@ -486,10 +531,12 @@ class ImageGenerator:
         import pandas as pd
         from datetime import datetime, timedelta
         
-        # 计算图表数量
-        etf_dir = self.data_dir / "holdings" / etf_symbol
-        csv_files = sorted(etf_dir.glob("*.csv")) if etf_dir.exists() else []
-        data_days = len(csv_files)
+        # 一次读取全部历史窗口，各图表从同一个对象切片
+        file_dates = [csv_file.stem for csv_file in HoldingsManifest(str(self.data_dir), etf_symbol).file_paths()]
+        if history is None or not history.covers(file_dates):
+            history = HoldingsHistory.for_dates(self.repository, etf_symbol, file_dates)
+        dates = [file_date for file_date in file_dates if history.row(file_date) is not None]
+        data_days = len(dates)
         
         # 创建长图布局
         # 1. 持仓表格 (高度: 10)
@@ -521,7 +568,7 @@ class ImageGenerator:
         # ===== 2. 基金总额趋势 =====
         ax_trend = fig.add_subplot(gs[1])
         if data_days >= 5:
-            self._draw_fund_trend(ax_trend, etf_symbol, date, csv_files, data_days)
+            self._draw_fund_trend(ax_trend, etf_symbol, date, history, dates)
         else:
             ax_trend.text(0.5, 0.5, f'历史数据不足（仅 {data_days} 天），需要至少 5 天数据',
                          ha='center', va='center', fontsize=12, color='red')
@@ -530,7 +577,7 @@ class ImageGenerator:
         # ===== 3. Top 10 个股趋势 =====
         ax_stocks = fig.add_subplot(gs[2])
         if data_days >= 5:
-            self._draw_top10_trend(ax_stocks, current_df, etf_symbol, date, csv_files, data_days)
+            self._draw_top10_trend(ax_stocks, current_df, etf_symbol, date, history, dates)
         else:
             ax_stocks.text(0.5, 0.5, f'历史数据不足（仅 {data_days} 天），需要至少 5 天数据',
                           ha='center', va='center', fontsize=12, color='red')
@@ -540,14 +587,13 @@ class ImageGenerator:
         if has_new_stocks:
             ax_new_stocks = fig.add_subplot(gs[3])
             self._draw_new_stocks_trend(
-                ax_new_stocks, added_tickers, current_df, etf_symbol, date, csv_files
+                ax_new_stocks, added_tickers, current_df, etf_symbol, date, history, dates
             )
         
         # 保存图片
-        image_dir = self.image_dir / etf_symbol
-        ensure_dir(str(image_dir))
+        image_path = self.comprehensive_image_path(etf_symbol, date)
+        ensure_dir(str(image_path.parent))
         
-        image_path = image_dir / f"{date}_comprehensive.png"
         plt.savefig(image_path, bbox_inches='tight', dpi=150, facecolor='white')
         plt.close()
         
@@ -618,26 +664,16 @@ class ImageGenerator:
             pad=20
         )
     
-    def _draw_fund_trend(self, ax, etf_symbol: str, date: str, csv_files, data_days):
+    def _draw_fund_trend(self, ax, etf_symbol: str, date: str, history: HoldingsHistory, dates: List[str]):
         """在指定 Axes 上绘制基金总额趋势（1 个月 + 3 个月）"""
         import pandas as pd
         
         # 隐藏父 Axes
         ax.axis('off')
         
-        # 读取所有历史数据
-        dates_all = []
-        values_all = []
-        
-        for csv_file in csv_files:
-            try:
-                df = pd.read_csv(csv_file)
-                file_date = csv_file.stem
-                total_value = df['market_value'].sum()
-                dates_all.append(file_date)
-                values_all.append(total_value)
-            except Exception as e:
-                logger.warning(f"读取文件失败 {csv_file}: {e}")
+        # 从持仓历史切出每日总市值
+        dates_all = dates
+        values_all = history.totals('market_value', dates).tolist()
         
         if len(dates_all) < 2:
             ax.text(0.5, 0.5, '有效数据不足', ha='center', va='center', fontsize=12)
@@ -700,7 +736,8 @@ class ImageGenerator:
         current_df, 
         etf_symbol: str, 
         date: str, 
-        csv_files
+        history: HoldingsHistory,
+        dates: List[str]
     ):
         """
         在指定 Axes 上绘制新增股票的持股数趋势
@@ -711,7 +748,8 @@ class ImageGenerator:
             current_df: 当前持仓数据
             etf_symbol: ETF 代码
             date: 当前日期
-            csv_files: 所有历史 CSV 文件列表
+            history: 综合报告共用的持仓历史
+            dates: 历史日期列表（已排序）
         """
         import pandas as pd
         
@@ -735,24 +773,7 @@ class ImageGenerator:
         new_stocks_info = sorted(new_stocks_info, key=lambda x: x['shares'], reverse=True)
         
         # 读取历史数据，追踪这些新增股票的持股数变化
-        stock_shares = {stock['ticker']: [] for stock in new_stocks_info}
-        dates = []
-        
-        # 读取所有历史数据
-        for csv_file in csv_files:
-            try:
-                df = pd.read_csv(csv_file)
-                file_date = csv_file.stem
-                dates.append(file_date)
-                
-                for stock in new_stocks_info:
-                    ticker = stock['ticker']
-                    row = df[df['ticker'] == ticker]
-                    # 如果该股票在该日期存在，记录持股数；否则记录为 0
-                    shares = row.iloc[0]['shares'] if len(row) > 0 else 0
-                    stock_shares[ticker].append(shares)
-            except Exception as e:
-                logger.warning(f"读取文件失败 {csv_file}: {e}")
+        stock_shares = self._shares_series(history, dates, [stock['ticker'] for stock in new_stocks_info])
         
         # 获取父 Axes 位置
         pos = ax.get_position()
@@ -877,10 +898,9 @@ class ImageGenerator:
         self._draw_top_changes(ax_changes, summary_result)
         
         # 保存图片
-        image_dir = self.image_dir / "SUMMARY"
-        ensure_dir(str(image_dir))
+        image_path = self.summary_image_path(date)
+        ensure_dir(str(image_path.parent))
         
-        image_path = image_dir / f"{date}_summary.png"
         plt.savefig(image_path, bbox_inches='tight', dpi=150, facecolor='white')
         plt.close()
         
@@ -1218,7 +1238,7 @@ class ImageGenerator:
         ax4.grid(True, alpha=0.3, axis='y')
         ax4.tick_params(axis='x', labelsize=6, rotation=45)
     
-    def _draw_top10_trend(self, ax, current_df, etf_symbol: str, date: str, csv_files, data_days):
+    def _draw_top10_trend(self, ax, current_df, etf_symbol: str, date: str, history: HoldingsHistory, dates: List[str]):
         """在指定 Axes 上绘制 Top 10 个股趋势（1 个月 + 3 个月）"""
         import pandas as pd
         
@@ -1229,39 +1249,9 @@ class ImageGenerator:
         current_top10 = current_df.nlargest(10, 'weight')['ticker'].tolist()
         
         # 读取历史数据并追踪这些股票的持股数变化
-        stock_shares_1m = {ticker: [] for ticker in current_top10}
-        stock_shares_3m = {ticker: [] for ticker in current_top10}
-        dates_1m = []
-        dates_3m = []
-        
-        # 1 个月数据
-        for csv_file in csv_files[-30:]:
-            try:
-                df = pd.read_csv(csv_file)
-                file_date = csv_file.stem
-                dates_1m.append(file_date)
-                
-                for ticker in current_top10:
-                    row = df[df['ticker'] == ticker]
-                    shares = row.iloc[0]['shares'] if len(row) > 0 else 0
-                    stock_shares_1m[ticker].append(shares)
-            except Exception as e:
-                logger.warning(f"读取文件失败 {csv_file}: {e}")
-        
-        # 3 个月数据
-        for csv_file in csv_files[-90:]:
-            try:
-                df = pd.read_csv(csv_file)
-                file_date = csv_file.stem
-                if file_date not in dates_3m:
-                    dates_3m.append(file_date)
-                
-                for ticker in current_top10:
-                    row = df[df['ticker'] == ticker]
-                    shares = row.iloc[0]['shares'] if len(row) > 0 else 0
-                    stock_shares_3m[ticker].append(shares)
-            except Exception as e:
-                pass
+        dates_1m, dates_3m = dates[-30:], dates[-90:]
+        stock_shares_1m = self._shares_series(history, dates_1m, current_top10)
+        stock_shares_3m = self._shares_series(history, dates_3m, current_top10)
         
         # 获取父 Axes 位置
         pos = ax.get_position()
@@ -1321,7 +1311,8 @@ class ImageGenerator:
         current_df, 
         etf_symbol: str, 
         date: str, 
-        csv_files
+        history: HoldingsHistory,
+        dates: List[str]
     ):
         """
         在指定 Axes 上绘制新增股票的持股数趋势
@@ -1332,7 +1323,8 @@ class ImageGenerator:
             current_df: 当前持仓数据
             etf_symbol: ETF 代码
             date: 当前日期
-            csv_files: 所有历史 CSV 文件列表
+            history: 综合报告共用的持仓历史
+            dates: 历史日期列表（已排序）
         """
         import pandas as pd
         
@@ -1356,24 +1348,7 @@ class ImageGenerator:
         new_stocks_info = sorted(new_stocks_info, key=lambda x: x['shares'], reverse=True)
         
         # 读取历史数据，追踪这些新增股票的持股数变化
-        stock_shares = {stock['ticker']: [] for stock in new_stocks_info}
-        dates = []
-        
-        # 读取所有历史数据
-        for csv_file in csv_files:
-            try:
-                df = pd.read_csv(csv_file)
-                file_date = csv_file.stem
-                dates.append(file_date)
-                
-                for stock in new_stocks_info:
-                    ticker = stock['ticker']
-                    row = df[df['ticker'] == ticker]
-                    # 如果该股票在该日期存在，记录持股数；否则记录为 0
-                    shares = row.iloc[0]['shares'] if len(row) > 0 else 0
-                    stock_shares[ticker].append(shares)
-            except Exception as e:
-                logger.warning(f"读取文件失败 {csv_file}: {e}")
+        stock_shares = self._shares_series(history, dates, [stock['ticker'] for stock in new_stocks_info])
         
         # 获取父 Axes 位置
         pos = ax.get_position()
@@ -1498,10 +1473,9 @@ class ImageGenerator:
         self._draw_top_changes(ax_changes, summary_result)
         
         # 保存图片
-        image_dir = self.image_dir / "SUMMARY"
-        ensure_dir(str(image_dir))
+        image_path = self.summary_image_path(date)
+        ensure_dir(str(image_path.parent))
         
-        image_path = image_dir / f"{date}_summary.png"
         plt.savefig(image_path, bbox_inches='tight', dpi=150, facecolor='white')
         plt.close()
         
@@ -0,0 +1,116 @@
+"""
+导入耗时报告模块
+
+在子进程中用 `python -X importtime` 导入一组模块，解析标准错误输出，
+统计总导入耗时和最重的顶层依赖，用于检查各运行模式的启动开销：
+
+    report = measure_imports(['main', 'src.scheduler'])
+    report.total_ms        # 导入耗时合计（毫秒）
+    report.wall_ms         # 子进程总耗时（含解释器启动）
+    report.top(5)          # [(模块名, 累计耗时毫秒), ...]
+    'pandas' in report     # 是否导入了某个模块
+"""
+
+import sys
+import time
+import logging
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# 项目根目录（子进程在此目录下运行，保证 main 和 src 可导入）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 子进程执行的导入脚本（模块名由命令行参数传入；importlib.import_module 不经过
+# -X importtime 的计时，因此使用 __import__）
+_IMPORT_SCRIPT = "import sys\nfor name in sys.argv[1:]:\n    __import__(name)"
+
+
+@dataclass
+class ImportReport:
+    """一组模块的导入耗时"""
+    modules: List[str]                                        # 请求导入的模块
+    wall_ms: float = 0.0                                      # 子进程总耗时（含解释器启动）
+    cumulative_ms: Dict[str, float] = field(default_factory=dict)  # 每个模块的累计导入耗时
+    top_level: Dict[str, float] = field(default_factory=dict)      # 顶层导入（未被其他模块嵌套）
+
+    @property
+    def total_ms(self) -> float:
+        """导入耗时合计（顶层导入的累计耗时之和）"""
+        return sum(self.top_level.values())
+
+    def top(self, n: int = 10) -> List[Tuple[str, float]]:
+        """累计耗时最高的 n 个顶层导入"""
+        return sorted(self.top_level.items(), key=lambda item: item[1], reverse=True)[:n]
+
+    def __contains__(self, module: str) -> bool:
+        return module in self.cumulative_ms
+
+
+def parse_importtime(output: str, report: ImportReport) -> ImportReport:
+    """
+    解析 -X importtime 的输出
+
+    每行格式为 `import time: 自身耗时 | 累计耗时 | 模块名`（微秒），
+    模块名前的缩进表示嵌套层级。
+
+    Args:
+        output: 子进程的标准错误输出
+        report: 待填充的报告
+
+    Returns:
+        填充后的报告
+    """
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # 表头
+
+        name = parts[2].rstrip()
+        module = name.strip()
+        cumulative_ms = int(parts[1]) / 1000
+
+        report.cumulative_ms[module] = cumulative_ms
+        if name == ' ' + module:
+            report.top_level[module] = cumulative_ms
+
+    return report
+
+
+def measure_imports(modules: List[str], python: str = sys.executable) -> ImportReport:
+    """
+    在新的子进程中导入模块并测量耗时
+
+    Args:
+        modules: 模块名列表（按顺序导入）
+        python: Python 解释器路径
+
+    Returns:
+        导入耗时报告
+
+    Raises:
+        RuntimeError: 子进程导入失败
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', _IMPORT_SCRIPT, *modules],
+        cwd=str(PROJECT_ROOT),
+        capture_output=True,
+        text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError(f"导入失败: {' '.join(modules)}\n" + '\n'.join(errors[-5:]))
+
+    report = parse_importtime(result.stderr, ImportReport(modules=list(modules), wall_ms=wall_ms))
+    logger.debug(f"导入 {len(modules)} 个模块: {report.total_ms:.0f} ms（进程 {wall_ms:.0f} ms）")
+    return report
@@ -0,0 +1,251 @@
+"""
+持仓数据清单模块
+
+为每只 ETF 维护一份持仓文件清单（data/holdings/{etf_symbol}/manifest.json），
+记录每个日期的行数、总市值、内容哈希和文件大小。
+
+列出历史日期、检查缺失日期、计算图表天数等操作直接读取清单，
+不再各自扫描目录并解析文件名。清单在保存和清理数据时原子更新，
+如与实际文件不一致，可通过 rebuild() 重建。
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .storage import read_holdings_csv
+
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+@dataclass
+class ManifestEntry:
+    """单个日期的持仓文件记录"""
+    date: str                          # 日期 YYYY-MM-DD
+    rows: int                          # 持仓行数
+    total_market_value: float          # 总市值
+    sha256: str                        # 文件内容哈希
+    size: int                          # 文件大小（字节）
+
+
+class HoldingsManifest:
+    """单只 ETF 的持仓文件清单"""
+
+    def __init__(self, data_dir: str, etf_symbol: str):
+        """
+        加载清单（清单不存在但目录中已有 CSV 时自动重建）
+
+        Args:
+            data_dir: 数据存储根目录
+            etf_symbol: ETF 代码
+        """
+        self.etf_symbol = etf_symbol
+        self.etf_dir = Path(data_dir) / "holdings" / etf_symbol
+        self.manifest_file = self.etf_dir / MANIFEST_FILENAME
+
+        self.entries: Dict[str, ManifestEntry] = {}
+
+        if self.manifest_file.exists():
+            self._load()
+        elif self.etf_dir.exists() and any(self.etf_dir.glob("*.csv")):
+            logger.info(f"{etf_symbol} 清单不存在，根据现有文件重建")
+            self.rebuild()
+
+    # ==================== 查询 ====================
+
+    def dates(self) -> List[str]:
+        """已有数据的日期（升序）"""
+        return sorted(self.entries)
+
+    def latest_date(self, before: Optional[str] = None) -> Optional[str]:
+        """
+        最新日期
+
+        Args:
+            before: 只考虑早于该日期的记录（None 表示不限）
+
+        Returns:
+            最新日期（没有符合条件的记录时为 None）
+        """
+        dates = [d for d in self.entries if before is None or d < before]
+        return max(dates) if dates else None
+
+    def get(self, date: str) -> Optional[ManifestEntry]:
+        """获取指定日期的记录"""
+        return self.entries.get(date)
+
+    def file_paths(self) -> List[Path]:
+        """按日期升序返回持仓文件路径"""
+        return [self.etf_dir / f"{date}.csv" for date in self.dates()]
+
+    def missing_weekdays(self, start_date: str, end_date: str) -> List[str]:
+        """
+        查找日期范围内缺失的工作日
+
+        Args:
+            start_date: 起始日期（含）
+            end_date: 结束日期（含）
+
+        Returns:
+            缺失的工作日列表（升序）
+        """
+        missing = []
+        current = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+
+        while current <= end:
+            date_str = current.strftime('%Y-%m-%d')
+            if current.weekday() < 5 and date_str not in self.entries:
+                missing.append(date_str)
+            current += timedelta(days=1)
+
+        return missing
+
+    # ==================== 更新 ====================
+
+    def record(self, date: str, df: Optional[pd.DataFrame] = None) -> ManifestEntry:
+        """
+        记录（或更新）一个日期的持仓文件
+
+        Args:
+            date: 日期
+            df: 该文件对应的 DataFrame（可选，不传则重新解析文件）
+
+        Returns:
+            新的清单记录
+        """
+        entry = self._build_entry(date, df)
+        self.entries[date] = entry
+        self._save()
+        return entry
+
+    def record_many(self, frames: Dict[str, pd.DataFrame]) -> None:
+        """
+        批量记录多个日期（只写一次清单文件）
+
+        Args:
+            frames: {日期: 对应的 DataFrame}
+        """
+        for date, df in frames.items():
+            self.entries[date] = self._build_entry(date, df)
+        self._save()
+
+    def remove(self, dates: List[str]) -> None:
+        """
+        移除指定日期的记录
+
+        Args:
+            dates: 日期列表
+        """
+        changed = False
+        for date in dates:
+            if self.entries.pop(date, None) is not None:
+                changed = True
+
+        if changed:
+            self._save()
+
+    def rebuild(self) -> int:
+        """
+        扫描目录重建清单
+
+        Returns:
+            清单中的日期数
+        """
+        entries = {}
+
+        if self.etf_dir.exists():
+            for csv_file in sorted(self.etf_dir.glob("*.csv")):
+                try:
+                    datetime.strptime(csv_file.stem, '%Y-%m-%d')
+                    entries[csv_file.stem] = self._build_entry(csv_file.stem)
+                except (ValueError, OSError, pd.errors.ParserError) as e:
+                    logger.warning(f"处理文件失败，跳过 {csv_file}: {e}")
+
+        self.entries = entries
+        self._save()
+
+        logger.info(f"✅ {self.etf_symbol} 清单重建完成: {len(entries)} 个日期")
+        return len(entries)
+
+    def verify(self) -> Dict[str, List[str]]:
+        """
+        检查清单与实际文件是否一致
+
+        Returns:
+            {'missing_files': 清单中有但文件不存在,
+             'untracked_files': 文件存在但清单中没有,
+             'changed_files': 文件大小与清单不一致}
+        """
+        actual = {}
+        if self.etf_dir.exists():
+            actual = {f.stem: f.stat().st_size for f in self.etf_dir.glob("*.csv")}
+
+        return {
+            'missing_files': sorted(set(self.entries) - set(actual)),
+            'untracked_files': sorted(set(actual) - set(self.entries)),
+            'changed_files': sorted(
+                date for date, size in actual.items()
+                if date in self.entries and self.entries[date].size != size
+            ),
+        }
+
+    # ==================== 内部方法 ====================
+
+    def _build_entry(self, date: str, df: Optional[pd.DataFrame] = None) -> ManifestEntry:
+        """根据文件内容生成清单记录"""
+        file_path = self.etf_dir / f"{date}.csv"
+
+        with open(file_path, 'rb') as f:
+            content = f.read()
+
+        if df is None:
+            df = read_holdings_csv(file_path, ['market_value'])
+
+        total_market_value = pd.to_numeric(df['market_value'], errors='coerce').sum()
+
+        return ManifestEntry(
+            date=date,
+            rows=len(df),
+            total_market_value=float(total_market_value),
+            sha256=hashlib.sha256(content).hexdigest(),
+            size=len(content)
+        )
+
+    def _load(self) -> None:
+        """读取清单文件"""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            self.entries = {
+                date: ManifestEntry(**entry)
+                for date, entry in raw.get('entries', {}).items()
+            }
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"清单文件损坏，重建: {self.manifest_file} ({e})")
+            self.rebuild()
+
+    def _save(self) -> None:
+        """原子写入清单文件（先写临时文件再替换）"""
+        self.etf_dir.mkdir(parents=True, exist_ok=True)
+
+        raw = {
+            'etf_symbol': self.etf_symbol,
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'entries': {date: asdict(self.entries[date]) for date in sorted(self.entries)}
+        }
+
+        tmp_path = self.manifest_file.with_name(self.manifest_file.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(raw, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_file)
@@ -8,13 +8,21 @@ import logging
 import requests
 import time
 import base64
-import hashlib
-from typing import Optional, List
+from typing import TYPE_CHECKING, Optional, List
 from pathlib import Path
 
+from .retry import CircuitOpenError, DeadlineExceeded, RetryPolicy
+
+if TYPE_CHECKING:
+    from .analyzer import HoldingsDiff
+
 logger = logging.getLogger(__name__)
 
 
+# 企业微信图片消息上限（base64 编码前）
+WECHAT_IMAGE_LIMIT = 2 * 1024 * 1024
+
+
 class WeChatNotifier:
     """企业微信通知器"""
     
@@ -22,7 +30,11 @@ class WeChatNotifier:
         self,
         webhook_url: str,
         max_retries: int = 3,
-        retry_delays: List[int] = None
+        retry_delays: List[int] = None,
+        session: Optional[requests.Session] = None,
+        timeout=10,
+        retry_policy: Optional[RetryPolicy] = None,
+        image_max_bytes: int = WECHAT_IMAGE_LIMIT
     ):
         """
         初始化通知器
@@ -31,12 +43,20 @@ class WeChatNotifier:
             webhook_url: 企业微信 Webhook URL
             max_retries: 最大重试次数
             retry_delays: 重试延迟列表（秒）
+            session: 共享的 HTTP Session（可选，不传时每次请求单独建立连接）
+            timeout: 请求超时（秒，或 (连接超时, 读取超时)）
+            retry_policy: 共享的重试策略（可选，传入时 max_retries/retry_delays 由策略决定）
+            image_max_bytes: 图片字节预算（base64 编码前，超出时压缩后再发送）
         """
         self.webhook_url = webhook_url
-        self.max_retries = max_retries
-        self.retry_delays = retry_delays or [1, 2, 4]
-        
-        logger.info(f"初始化 WeChatNotifier，最大重试次数: {max_retries}")
+        self.retry_policy = retry_policy or RetryPolicy(max_retries, retry_delays or [1, 2, 4])
+        self.max_retries = self.retry_policy.max_retries
+        self.retry_delays = self.retry_policy.retry_delays
+        self.http = session if session is not None else requests
+        self.timeout = timeout
+        self.image_max_bytes = image_max_bytes
+        
+        logger.info(f"初始化 WeChatNotifier，最大重试次数: {self.retry_policy.max_retries}")
     
     def send_markdown(self, content: str, max_length: int = 4096) -> bool:
         """
@@ -103,7 +123,7 @@ class WeChatNotifier:
     
     def send_image(self, image_path: str) -> bool:
         """
-        发送图片消息
+        发送图片消息（超过字节预算时先压缩，绘图阶段已编码的结果直接复用）
         
         Args:
             image_path: 图片文件路径
@@ -113,22 +133,21 @@ class WeChatNotifier:
         """
         logger.info(f"准备发送图片: {image_path}")
         
+        from .image_encoder import ImageTooLargeError, encode_for_upload
+        
         try:
-            # 读取图片文件
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
+            # 按预算编码（原图和预算不变时复用 .upload.json 记录的结果）
+            encoded = encode_for_upload(image_path, self.image_max_bytes)
+            image_data = encoded.read()
             
             # Base64 编码
             base64_data = base64.b64encode(image_data).decode('utf-8')
             
-            # 计算 MD5
-            md5 = hashlib.md5(image_data).hexdigest()
-            
             payload = {
                 "msgtype": "image",
                 "image": {
                     "base64": base64_data,
-                    "md5": md5
+                    "md5": encoded.md5
                 }
             }
             
@@ -137,6 +156,9 @@ class WeChatNotifier:
         except FileNotFoundError:
             logger.error(f"图片文件不存在: {image_path}")
             return False
+        except ImageTooLargeError as e:
+            logger.error(f"❌ 图片超过企业微信大小上限，未发送: {image_path} ({e})")
+            return False
         except Exception as e:
             logger.error(f"读取图片文件失败: {e}")
             return False
@@ -202,20 +224,30 @@ class WeChatNotifier:
         Returns:
             是否发送成功
         """
+        policy = self.retry_policy
+        
         for attempt in range(1, self.max_retries + 1):
+            try:
+                # 预算用完或 Webhook 主机已熔断时不再发送
+                policy.before_attempt(self.webhook_url)
+            except (CircuitOpenError, DeadlineExceeded) as e:
+                logger.error(f"❌ {e}")
+                return False
+            
             try:
                 logger.info(f"发送企业微信消息（第 {attempt}/{self.max_retries} 次）")
                 
-                response = requests.post(
+                response = self.http.post(
                     self.webhook_url,
                     json=payload,
-                    timeout=10
+                    timeout=policy.clamp_timeout(self.timeout)
                 )
                 
                 response.raise_for_status()
                 
                 # 检查企业微信 API 返回
                 result = response.json()
+                policy.record_success(self.webhook_url)
                 
                 if result.get('errcode') == 0:
                     logger.info("✅ 消息发送成功")
@@ -230,16 +262,19 @@ class WeChatNotifier:
                         return False
             
             except requests.RequestException as e:
+                policy.record_failure(self.webhook_url, e)
                 logger.error(f"❌ 网络请求失败: {e}")
             
             except Exception as e:
                 logger.error(f"❌ 发送消息时发生未知错误: {e}")
             
-            # 如果不是最后一次尝试，等待后重试
+            # 如果不是最后一次尝试，退避后重试（不超过运行预算）
             if attempt < self.max_retries:
-                delay = self.retry_delays[min(attempt - 1, len(self.retry_delays) - 1)]
-                logger.info(f"等待 {delay} 秒后重试...")
-                time.sleep(delay)
+                try:
+                    policy.wait(attempt)
+                except DeadlineExceeded as e:
+                    logger.error(f"❌ {e}")
+                    return False
         
         logger.error(f"❌ 消息发送失败，已重试 {self.max_retries} 次")
         return False
@@ -272,7 +307,7 @@ class WeChatNotifier:
         date: str,
         prev_date: str,
         curr_date: str,
-        analysis_result: dict
+        analysis_result: 'HoldingsDiff'
     ) -> str:
         """
         生成单个 ETF 的企业微信推送内容
@@ -282,11 +317,13 @@ class WeChatNotifier:
             date: 日期
             prev_date: 前一日日期
             curr_date: 当前日期
-            analysis_result: 分析结果
+            analysis_result: Analyzer.compare_holdings() 返回的分析结果
         
         Returns:
             Markdown 格式的推送内容
         """
+        from .analyzer import count_changes
+        
         # ETF 基本信息
         etf_info_map = {
             'ARKK': {'name': 'ARK 创新ETF', 'focus': '破坏性创新技术（AI、电动车、太空探索、区块链）', 'emoji': '🚀'},
@@ -305,8 +342,12 @@ class WeChatNotifier:
         lines.append("")
         lines.append("## 概览")
         lines.append(f"- 对比日期: {prev_date} → {curr_date}")
-        lines.append(f"- 新增: {len(analysis_result['added'])} | 移除: {len(analysis_result['removed'])}")
-        lines.append(f"- 增持: {len(analysis_result['increased'])} | 减持: {len(analysis_result['decreased'])}")
+        lines.append(
+            f"- 新增: {count_changes(analysis_result, 'added')} | 移除: {count_changes(analysis_result, 'removed')}"
+        )
+        lines.append(
+            f"- 增持: {count_changes(analysis_result, 'increased')} | 减持: {count_changes(analysis_result, 'decreased')}"
+        )
         lines.append("")
         lines.append("详细数据请查看下方图表 👇")
         
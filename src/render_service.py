@@ -0,0 +1,303 @@
+"""
+绘图服务模块
+
+把综合报告长图、汇总长图等耗时的 matplotlib 绘图任务分发到进程池并行执行：
+
+    renderer = RenderService.from_config(config, repository=repository)
+    renderer.submit('ARKK', 'generate_comprehensive_report_image', etf_symbol='ARKK', ...)
+    renderer.submit('SUMMARY', 'generate_summary_report_image', summary_result=..., date=...)
+    path = renderer.result('ARKK')                      # 等待指定任务
+    for name, path, error in renderer.as_completed():   # 按完成顺序收集其余任务
+        ...
+
+pyplot 依赖全局状态，不能在线程中并行绘图，因此每个工作进程使用 Agg 后端
+和独立的 ImageGenerator。任务参数在提交时序列化（pickle），工作进程只返回图片路径。
+进程数为 1 时退化为在主进程内顺序绘制（与原流程一致）。
+设置 upload_limit 时，绘图完成后在同一进程中按字节预算编码上传用图片
+（image_encoder），推送时直接复用编码结果。
+
+图片路径和图表样式版本也定义在这里：图片全部命中结果缓存时（同一天重跑），
+主进程不需要导入 matplotlib，也不会启动工作进程。
+"""
+
+import os
+import time
+import pickle
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from .utils import Config
+
+logger = logging.getLogger(__name__)
+
+
+# 图表样式版本（修改 ImageGenerator 的布局、配色、字体等绘图样式后递增，使缓存的图片失效）
+STYLE_VERSION = 1
+
+
+def comprehensive_image_path(data_dir: str, etf_symbol: str, date: str) -> Path:
+    """综合报告长图的保存路径"""
+    return Path(data_dir) / "images" / etf_symbol / f"{date}_comprehensive.png"
+
+
+def summary_image_path(data_dir: str, date: str) -> Path:
+    """汇总长图的保存路径"""
+    return Path(data_dir) / "images" / "SUMMARY" / f"{date}_summary.png"
+
+
+# 工作进程内的图片生成器（由 _init_worker 创建）
+_worker_generator = None
+
+
+def _init_worker(data_dir: str) -> None:
+    """工作进程初始化：选择 Agg 后端并创建图片生成器"""
+    global _worker_generator
+
+    import matplotlib
+    matplotlib.use('Agg')
+    from .image_generator import ImageGenerator
+
+    _worker_generator = ImageGenerator(data_dir=data_dir)
+
+
+def _render(payload: bytes) -> Tuple[str, float]:
+    """
+    在工作进程中执行一个绘图任务
+
+    Args:
+        payload: pickle 序列化的 (方法名, 参数字典, 上传字节预算)
+
+    Returns:
+        (图片路径, 绘图和编码耗时秒数)
+    """
+    method, kwargs, upload_limit = pickle.loads(payload)
+    start = time.perf_counter()
+    path = getattr(_worker_generator, method)(**kwargs)
+    _encode_upload(path, upload_limit)
+    return path, time.perf_counter() - start
+
+
+def _encode_upload(path: str, upload_limit: Optional[int]) -> None:
+    """预先编码上传用图片（失败时只记录警告，推送时会重新编码并报告错误）"""
+    if upload_limit is None:
+        return
+
+    from .image_encoder import encode_for_upload
+
+    try:
+        encode_for_upload(path, upload_limit)
+    except Exception as e:
+        logger.warning(f"⚠️ 上传编码失败: {path} ({e})")
+
+
+class RenderService:
+    """并行绘图服务"""
+
+    def __init__(
+        self,
+        data_dir: str,
+        image_gen=None,
+        max_workers: int = 1,
+        repository=None,
+        upload_limit: Optional[int] = None
+    ):
+        """
+        初始化绘图服务
+
+        Args:
+            data_dir: 数据存储根目录（工作进程据此创建图片生成器）
+            image_gen: 主进程的图片生成器（可选，顺序绘制时使用；未传入时在第一次绘图时创建）
+            max_workers: 绘图进程数（1 表示在主进程内顺序绘制）
+            repository: 共享的持仓仓库（可选，主进程创建图片生成器时使用）
+            upload_limit: 上传字节预算（可选，设置时绘图后立即编码上传用图片）
+        """
+        self.data_dir = data_dir
+        self.image_gen = image_gen
+        self.repository = repository
+        self.upload_limit = upload_limit
+        self.max_workers = max(1, max_workers)
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._futures: Dict[str, Future] = {}
+        self._callbacks: Dict[str, Callable[[str], None]] = {}
+        self._results: Dict[str, str] = {}
+
+        logger.info(
+            f"初始化 RenderService，"
+            f"{'并行绘图进程数: ' + str(self.max_workers) if self.parallel else '主进程内顺序绘制'}"
+        )
+
+    @classmethod
+    def from_config(cls, config: Config, repository=None, jobs: Optional[int] = None) -> 'RenderService':
+        """
+        根据系统配置创建绘图服务
+
+        Args:
+            config: 系统配置（data.render_workers 为 0 时按 CPU 核数自动选择）
+            repository: 共享的持仓仓库（可选）
+            jobs: 预计的绘图任务数（自动选择进程数时的上限，默认每只 ETF 一张加一张汇总图）
+        """
+        workers = config.data.render_workers
+        if workers == 0:
+            if jobs is None:
+                jobs = len(config.data.etfs) + 1
+            workers = min(os.cpu_count() or 1, jobs)
+        return cls(
+            config.data.data_dir,
+            max_workers=workers,
+            repository=repository,
+            upload_limit=config.notification.image_max_bytes
+        )
+
+    @property
+    def parallel(self) -> bool:
+        """是否使用进程池"""
+        return self.max_workers > 1
+
+    def comprehensive_image_path(self, etf_symbol: str, date: str) -> Path:
+        """综合报告长图的保存路径"""
+        return comprehensive_image_path(self.data_dir, etf_symbol, date)
+
+    def summary_image_path(self, date: str) -> Path:
+        """汇总长图的保存路径"""
+        return summary_image_path(self.data_dir, date)
+
+    # ==================== 任务 ====================
+
+    def submit(
+        self,
+        name: str,
+        method: str,
+        on_done: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> None:
+        """
+        提交绘图任务
+
+        Args:
+            name: 任务名（如 ETF 代码），用于读取结果
+            method: ImageGenerator 的方法名
+            on_done: 收集到结果时在主进程中调用（参数为图片路径，如保存缓存副本）
+            **kwargs: 方法参数（需可 pickle）
+        """
+        if name in self:
+            raise ValueError(f"绘图任务已存在: {name}")
+
+        if on_done is not None:
+            self._callbacks[name] = on_done
+
+        if not self.parallel:
+            # 顺序绘制：直接调用主进程的图片生成器，结果放入已完成的 Future
+            future = Future()
+            start = time.perf_counter()
+            try:
+                path = getattr(self._get_image_gen(), method)(**kwargs)
+                _encode_upload(path, self.upload_limit)
+                future.set_result((path, time.perf_counter() - start))
+            except Exception as e:
+                future.set_exception(e)
+            self._futures[name] = future
+            return
+
+        payload = pickle.dumps((method, kwargs, self.upload_limit), protocol=pickle.HIGHEST_PROTOCOL)
+        self._futures[name] = self._get_executor().submit(_render, payload)
+        logger.debug(f"提交绘图任务: {name} ({len(payload) / 1024:.0f} KB)")
+
+    def ready(self, name: str, path: str) -> None:
+        """
+        登记无需绘制的图片（如从缓存复制），之后可以像普通任务一样读取
+
+        与绘图任务一样，设置 upload_limit 时立即编码上传用图片
+        （sidecar 记录与原图一致时直接复用，不重复编码）。
+        """
+        if name in self:
+            raise ValueError(f"绘图任务已存在: {name}")
+        _encode_upload(path, self.upload_limit)
+        self._results[name] = path
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._futures or name in self._results
+
+    # ==================== 结果 ====================
+
+    def result(self, name: str) -> str:
+        """
+        等待并读取指定任务的图片路径
+
+        Args:
+            name: 任务名
+
+        Returns:
+            图片路径
+
+        Raises:
+            KeyError: 没有该任务
+            Exception: 绘图失败时抛出工作进程中的异常
+        """
+        if name in self._results:
+            return self._results[name]
+        return self._collect(name)
+
+    def as_completed(self) -> Iterator[Tuple[str, Optional[str], Optional[Exception]]]:
+        """
+        按完成顺序收集所有尚未读取的任务
+
+        Yields:
+            (任务名, 图片路径, 异常)，成功时异常为 None，失败时路径为 None
+        """
+        pending = {future: name for name, future in self._futures.items()}
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    yield name, self._collect(name), None
+                except Exception as e:
+                    yield name, None, e
+
+    def close(self) -> None:
+        """关闭进程池（等待已提交的任务完成）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self) -> 'RenderService':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ==================== 内部方法 ====================
+
+    def _get_image_gen(self):
+        if self.image_gen is None:
+            from .image_generator import ImageGenerator
+            self.image_gen = ImageGenerator(data_dir=self.data_dir, repository=self.repository)
+        return self.image_gen
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn：不继承主进程的线程和锁状态（数据下载使用线程池）
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.data_dir,)
+            )
+        return self._executor
+
+    def _collect(self, name: str) -> str:
+        """等待任务完成，登记结果并执行回调（失败的任务抛出异常且不再保留）"""
+        future = self._futures.pop(name)
+        callback = self._callbacks.pop(name, None)
+        path, seconds = future.result()
+        logger.info(f"图片已生成: {path}（绘图 {seconds:.1f} 秒）")
+
+        self._results[name] = path
+        if callback is not None:
+            callback(path)
+        return path
@@ -5,9 +5,9 @@ Markdown 报告生成模块
 """
 
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 from pathlib import Path
-from src.analyzer import ChangedHolding
+from src.analyzer import ChangedHolding, HoldingsDiff, count_changes
 from src.utils import ensure_dir
 
 logger = logging.getLogger(__name__)
@@ -30,9 +30,10 @@ class ReportGenerator:
     
     def generate_markdown(
         self,
-        analysis_result: Dict,
+        analysis_result: HoldingsDiff,
         etf_symbol: str,
-        current_holdings: List[Dict] = None
+        current_holdings: List[Dict] = None,
+        horizons: Optional[Dict[str, HoldingsDiff]] = None
     ) -> str:
         """
         生成 Markdown 格式报告
@@ -41,6 +42,7 @@ class ReportGenerator:
             analysis_result: Analyzer.compare_holdings() 返回的分析结果
             etf_symbol: ETF 代码（如 ARKK）
             current_holdings: 当前完整持仓列表（可选，用于生成完整持仓表）
+            horizons: Analyzer.compare_horizons() 返回的多周期结果（可选）
         
         Returns:
             Markdown 格式的报告内容
@@ -60,6 +62,10 @@ class ReportGenerator:
             self._generate_decreased_section(analysis_result['significant_decreased']),
         ]
         
+        # 如果提供了多周期结果，添加多周期变化表
+        if horizons:
+            sections.append(self._generate_horizons_section(horizons))
+        
         # 如果提供了完整持仓，添加完整持仓表
         if current_holdings:
             sections.append(self._generate_full_holdings(current_holdings))
@@ -96,15 +102,16 @@ class ReportGenerator:
         """生成报告标题"""
         return f"# {etf_symbol} 持仓变化 ({date})"
     
-    def _generate_summary(self, analysis: Dict, prev_date: str, curr_date: str) -> str:
-        """生成概览部分"""
+    def _generate_summary(self, analysis: HoldingsDiff, prev_date: str, curr_date: str) -> str:
+        """生成概览部分（也接受字典形式的分析结果）"""
+        # 只取数量，不生成完整的增持/减持列表
         stats = {
-            'added': len(analysis['added']),
-            'removed': len(analysis['removed']),
-            'increased': len(analysis['increased']),
-            'decreased': len(analysis['decreased']),
-            'sig_increased': len(analysis['significant_increased']),
-            'sig_decreased': len(analysis['significant_decreased']),
+            'added': count_changes(analysis, 'added'),
+            'removed': count_changes(analysis, 'removed'),
+            'increased': count_changes(analysis, 'increased'),
+            'decreased': count_changes(analysis, 'decreased'),
+            'sig_increased': count_changes(analysis, 'significant_increased'),
+            'sig_decreased': count_changes(analysis, 'significant_decreased'),
         }
         
         return f"""## 📊 概览
@@ -114,7 +121,7 @@ class ReportGenerator:
 - **移除持仓**: {stats['removed']} 只
 - **增持**: {stats['increased']} 只（显著增持 {stats['sig_increased']} 只）
 - **减持**: {stats['decreased']} 只（显著减持 {stats['sig_decreased']} 只）
-- **未变化**: {analysis['unchanged']} 只"""
+- **未变化**: {count_changes(analysis, 'unchanged')} 只"""
     
     def _generate_added_section(self, added: List[ChangedHolding]) -> str:
         """生成新增持仓部分"""
@@ -194,6 +201,33 @@ class ReportGenerator:
         rows_text = '\n\n'.join(rows)
         return f"## 📉 显著减持\n\n{rows_text}"
     
+    def _generate_horizons_section(self, horizons: Dict[str, HoldingsDiff]) -> str:
+        """生成多周期变化部分（只读取列式结果，不生成列表）"""
+        rows = [
+            "| 周期 | 对比日期 | 新增 | 移除 | 增持 | 减持 | 最大增持 | 最大减持 |",
+            "|------|----------|------|------|------|------|----------|----------|"
+        ]
+        
+        for name, diff in horizons.items():
+            top_increased = self._format_top_change(diff.rows('increased'))
+            top_decreased = self._format_top_change(diff.rows('decreased'))
+            rows.append(
+                f"| {name} | {diff.prev_date} → {diff.curr_date} "
+                f"| {diff.count('added')} | {diff.count('removed')} "
+                f"| {diff.count('increased')} | {diff.count('decreased')} "
+                f"| {top_increased} | {top_decreased} |"
+            )
+        
+        rows_text = '\n'.join(rows)
+        return f"## 🗓️ 多周期变化\n\n{rows_text}"
+    
+    def _format_top_change(self, rows) -> str:
+        """格式化变化幅度最大的一只（rows 已按变化幅度排序）"""
+        if rows.empty:
+            return "-"
+        first = rows.iloc[0]
+        return f"{first['ticker']} {first['weight_change']:+.2f}%"
+    
     def _generate_full_holdings(self, holdings: List[Dict]) -> str:
         """生成完整持仓表（可选）"""
         if not holdings:
@@ -0,0 +1,301 @@
+"""
+持仓数据仓库模块
+
+为所有流水线阶段提供统一的持仓读取入口：
+- 进程内 LRU 缓存，键为 (etf, date, 文件修改时间, 文件大小)，文件变化后自动失效
+- 命中/未命中计数，便于观察缓存效果
+- save_to_csv 写入时显式失效
+- 启用列式/SQLite 存储时，批量读取一次覆盖整个日期范围
+- 指定列时只解析需要的列；缓存中的部分列数据可以满足其子集的读取
+"""
+
+import os
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .utils import Config, get_holding_file_path
+from .storage import HoldingsStore, create_holdings_store, read_holdings_csv
+from .manifest import HoldingsManifest
+
+logger = logging.getLogger(__name__)
+
+
+class HoldingsRepository:
+    """
+    持仓数据仓库
+
+    同一进程内每个 (ETF, 日期) 最多解析一次。返回的 DataFrame 是缓存对象的
+    浅拷贝，调用方新增/替换列不会影响缓存。
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        store: Optional[HoldingsStore] = None,
+        max_entries: int = 512
+    ):
+        """
+        初始化持仓仓库
+
+        Args:
+            data_dir: 数据存储根目录
+            store: 持仓存储后端（可选）
+            max_entries: LRU 缓存最大条目数（每条为一只 ETF 一天的持仓）
+        """
+        self.data_dir = Path(data_dir)
+        self.store = store
+        self.max_entries = max_entries
+
+        # 值为 (DataFrame, 已读取的列)，列为 None 表示完整数据
+        self._cache: "OrderedDict[Tuple, Tuple[pd.DataFrame, Optional[List[str]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        logger.info(f"初始化 HoldingsRepository，缓存上限: {max_entries} 条")
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'HoldingsRepository':
+        """根据系统配置创建仓库（包括存储后端）"""
+        return cls(
+            config.data.data_dir,
+            store=create_holdings_store(config.data.data_dir, config.storage.backend),
+            max_entries=config.storage.repository_cache_size
+        )
+
+    # ==================== 读取 ====================
+
+    def get(self, etf_symbol: str, date: str) -> pd.DataFrame:
+        """
+        读取一天的持仓数据
+
+        Args:
+            etf_symbol: ETF 代码
+            date: 日期字符串 YYYY-MM-DD
+
+        Returns:
+            持仓 DataFrame
+
+        Raises:
+            FileNotFoundError: 本地没有该日期的数据
+            pd.errors.ParserError: CSV 解析失败
+        """
+        history = self.get_many(etf_symbol, [date], strict=True)
+
+        if date not in history:
+            raise FileNotFoundError(
+                f"持仓数据文件不存在: {self._csv_path(etf_symbol, date)}\n"
+                f"请先运行数据下载任务"
+            )
+
+        return history[date]
+
+    def get_many(
+        self,
+        etf_symbol: str,
+        dates: List[str],
+        columns: Optional[List[str]] = None,
+        strict: bool = False
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        批量读取多天的持仓数据
+
+        Args:
+            etf_symbol: ETF 代码
+            dates: 日期列表
+            columns: 只返回指定列（None 表示全部列）
+            strict: True 时 CSV 解析失败直接抛出异常，否则记录警告并跳过
+
+        Returns:
+            {日期: DataFrame}，顺序与 dates 一致；不存在的日期被跳过
+        """
+        result = {}
+        missing = {}  # {date: cache_key}
+
+        for date in dates:
+            key = self._cache_key(etf_symbol, date)
+            if key is None:
+                continue
+
+            if key in self._cache and self._covers(self._cache[key][1], columns):
+                self._cache.move_to_end(key)
+                self.hits += 1
+                result[date] = self._cache[key][0]
+            else:
+                self.misses += 1
+                missing[date] = key
+
+        if missing:
+            for date, df in self._load(etf_symbol, list(missing), columns, strict).items():
+                self._put(missing[date], df, columns)
+                result[date] = df
+
+        ordered = {}
+        for date in dates:
+            if date in result:
+                df = result[date]
+                if columns is not None and df.columns.tolist() != list(columns):
+                    ordered[date] = df[columns]
+                else:
+                    ordered[date] = df.copy(deep=False)
+
+        return ordered
+
+    def list_dates(self, etf_symbol: str) -> List[str]:
+        """
+        列出本地已有的日期（读取清单）
+
+        Args:
+            etf_symbol: ETF 代码
+
+        Returns:
+            升序日期列表
+        """
+        return HoldingsManifest(str(self.data_dir), etf_symbol).dates()
+
+    # ==================== 缓存管理 ====================
+
+    def put(self, etf_symbol: str, date: str, df: pd.DataFrame) -> None:
+        """
+        将刚写入的数据放入缓存（避免随后再次解析同一文件）
+
+        Args:
+            etf_symbol: ETF 代码
+            date: 日期
+            df: 持仓 DataFrame
+        """
+        key = self._cache_key(etf_symbol, date)
+        if key is not None:
+            self._put(key, df.copy(deep=False))
+
+    def invalidate(self, etf_symbol: str, date: Optional[str] = None) -> int:
+        """
+        使缓存失效
+
+        Args:
+            etf_symbol: ETF 代码
+            date: 日期（None 表示该 ETF 的所有日期）
+
+        Returns:
+            移除的条目数
+        """
+        stale = [
+            key for key in self._cache
+            if key[0] == etf_symbol and (date is None or key[1] == date)
+        ]
+        for key in stale:
+            del self._cache[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """清空缓存（计数器保留）"""
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """
+        获取缓存统计
+
+        Returns:
+            {'hits', 'misses', 'size', 'max_entries', 'hit_rate'}
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._cache),
+            'max_entries': self.max_entries,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+    # ==================== 内部方法 ====================
+
+    def _csv_path(self, etf_symbol: str, date: str) -> str:
+        return get_holding_file_path(str(self.data_dir), etf_symbol, date)
+
+    def _cache_key(self, etf_symbol: str, date: str) -> Optional[Tuple]:
+        """
+        计算缓存键 (etf, date, mtime_ns, size)
+
+        以 CSV 文件为准；CSV 不存在时使用存储后端的数据文件。
+        两者都不存在时返回 None。
+        """
+        paths = [self._csv_path(etf_symbol, date)]
+        if self.store is not None:
+            paths.append(str(self.store.get_path(etf_symbol, date)))
+
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            return (etf_symbol, date, st.st_mtime_ns, st.st_size)
+
+        return None
+
+    def _put(self, key: Tuple, df: pd.DataFrame, columns: Optional[List[str]] = None) -> None:
+        """写入缓存并按 LRU 淘汰（columns 为 None 表示完整数据）"""
+        # 同一 (etf, date) 的旧版本直接移除
+        self.invalidate(key[0], key[1])
+
+        self._cache[key] = (df, list(columns) if columns is not None else None)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _covers(cached_columns: Optional[List[str]], columns: Optional[List[str]]) -> bool:
+        """缓存条目是否包含所需的列（None 表示全部列）"""
+        if cached_columns is None:
+            return True
+        return columns is not None and set(columns).issubset(cached_columns)
+
+    def _load(
+        self,
+        etf_symbol: str,
+        dates: List[str],
+        columns: Optional[List[str]],
+        strict: bool
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        从磁盘加载（存储后端一次读取日期范围，其余逐个解析 CSV）
+
+        columns 不为 None 时只读取这些列
+        """
+        loaded = {}
+
+        if self.store is not None:
+            # 按日期分组需要 date 列
+            read_columns = None
+            if columns is not None:
+                read_columns = columns if 'date' in columns else ['date'] + list(columns)
+
+            df = self.store.read(
+                etf_symbol, start_date=min(dates), end_date=max(dates), columns=read_columns
+            )
+            wanted = set(dates)
+            for date, group in df.groupby('date', sort=False, observed=True):
+                if date in wanted:
+                    group = group.reset_index(drop=True)
+                    loaded[date] = group[columns] if columns is not None else group
+
+        for date in dates:
+            if date in loaded:
+                continue
+
+            file_path = self._csv_path(etf_symbol, date)
+            if not os.path.exists(file_path):
+                continue
+
+            try:
+                loaded[date] = read_holdings_csv(file_path, columns)
+                logger.debug(f"从本地加载数据: {file_path}")
+            except (pd.errors.ParserError, ValueError, OSError) as e:
+                if strict:
+                    error_msg = f"CSV 解析失败 {file_path}: {e}"
+                    logger.error(error_msg)
+                    raise pd.errors.ParserError(error_msg)
+                logger.warning(f"读取文件失败 {file_path}: {e}")
+
+        return loaded
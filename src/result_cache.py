@@ -0,0 +1,249 @@
+"""
+分析结果缓存模块
+
+按输入内容哈希缓存每日任务各阶段的输出，同一天重复运行（--manual 调试、
+推送失败后重跑）时，输入没有变化的阶段直接读取上次的结果：
+
+    data/cache/results/
+    ├── analysis/{key}.pkl        # 单只 ETF 的持仓对比结果
+    ├── horizons/{key}.pkl        # 多周期对比结果
+    ├── markdown/{key}.pkl        # Markdown 报告文本
+    ├── comprehensive/{key}.png   # 单只 ETF 的综合报告长图
+    ├── summary/{key}.pkl         # 跨基金汇总分析结果
+    └── summary_image/{key}.png   # 汇总长图
+
+键由 fingerprint() 计算：持仓 DataFrame 按内容哈希，其余参数（日期、阈值、
+周期列表、清单中的文件哈希等）按 JSON 序列化后哈希。任何输入变化都会得到新键，
+旧条目不会被误用。修改分析或绘图逻辑后递增 CACHE_VERSION 使旧结果全部失效。
+
+命中时刷新条目的修改时间，evict() 按修改时间淘汰：先删除超过保留天数的条目，
+总大小仍超过上限时再从最久未使用的条目开始删除。
+"""
+
+import os
+import json
+import time
+import pickle
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .utils import Config
+
+logger = logging.getLogger(__name__)
+
+
+# 缓存格式版本（分析/绘图逻辑变化时递增）
+CACHE_VERSION = 3
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    计算输入内容的哈希键
+
+    Args:
+        *parts: DataFrame、bytes 或可 JSON 序列化的值（字典按键排序）
+
+    Returns:
+        32 位十六进制哈希
+    """
+    digest = hashlib.sha256(f"v{CACHE_VERSION}".encode('utf-8'))
+
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            schema = [[str(c) for c in part.columns], [str(t) for t in part.dtypes]]
+            digest.update(b'frame')
+            digest.update(json.dumps(schema).encode('utf-8'))
+            digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+        elif isinstance(part, bytes):
+            digest.update(b'bytes')
+            digest.update(part)
+        else:
+            digest.update(b'json')
+            digest.update(
+                json.dumps(part, sort_keys=True, default=str, ensure_ascii=False).encode('utf-8')
+            )
+        digest.update(b'\0')
+
+    return digest.hexdigest()[:32]
+
+
+class ResultCache:
+    """基于文件的分析结果缓存"""
+
+    def __init__(self, data_dir: str):
+        """
+        初始化结果缓存
+
+        Args:
+            data_dir: 数据存储根目录
+        """
+        self.root = Path(data_dir) / "cache" / "results"
+        self.hits = 0
+        self.misses = 0
+
+        logger.info(f"初始化 ResultCache，目录: {self.root}")
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional['ResultCache']:
+        """根据系统配置创建缓存（未启用时返回 None）"""
+        if not config.storage.result_cache:
+            return None
+        return cls(config.data.data_dir)
+
+    # ==================== 对象 ====================
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """
+        读取缓存的对象
+
+        Args:
+            stage: 阶段名（analysis / horizons / markdown / summary 等）
+            key: fingerprint() 计算的键
+
+        Returns:
+            缓存的对象；未缓存或缓存损坏时返回 None
+        """
+        path = self._path(stage, key, '.pkl')
+        if not path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"结果缓存损坏，重新计算: {path} ({e})")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touch(path)
+        logger.debug(f"结果缓存命中: {stage}/{key}")
+        return value
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        """
+        保存对象
+
+        Args:
+            stage: 阶段名
+            key: fingerprint() 计算的键
+            value: 可 pickle 的对象
+        """
+        content = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._atomic_write(self._path(stage, key, '.pkl'), content)
+
+    # ==================== 文件 ====================
+
+    def get_file(self, stage: str, key: str, target: str) -> bool:
+        """
+        将缓存的文件（如 PNG）复制到目标路径
+
+        Args:
+            stage: 阶段名
+            key: fingerprint() 计算的键
+            target: 目标文件路径（扩展名与缓存文件一致）
+
+        Returns:
+            是否命中
+        """
+        target = Path(target)
+        path = self._path(stage, key, target.suffix)
+        if not path.exists():
+            self.misses += 1
+            return False
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + ".tmp")
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, target)
+
+        self.hits += 1
+        self._touch(path)
+        logger.debug(f"结果缓存命中: {stage}/{key} -> {target}")
+        return True
+
+    def put_file(self, stage: str, key: str, source: str) -> None:
+        """
+        保存文件副本
+
+        Args:
+            stage: 阶段名
+            key: fingerprint() 计算的键
+            source: 已生成的文件路径
+        """
+        source = Path(source)
+        with open(source, 'rb') as f:
+            self._atomic_write(self._path(stage, key, source.suffix), f.read())
+
+    # ==================== 淘汰 ====================
+
+    def evict(self, max_age_days: int = 0, max_bytes: int = 0) -> int:
+        """
+        淘汰过期和超出总大小的条目
+
+        Args:
+            max_age_days: 保留天数（按最近一次使用计算，0 表示不限）
+            max_bytes: 缓存总大小上限（字节，0 表示不限）
+
+        Returns:
+            删除的条目数
+        """
+        if not self.root.exists():
+            return 0
+
+        entries = []
+        for path in self.root.rglob('*'):
+            if path.is_file():
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(key=lambda entry: entry[0])
+
+        cutoff = time.time() - max_age_days * 86400 if max_age_days > 0 else None
+        total_bytes = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for mtime, size, path in entries:
+            expired = cutoff is not None and mtime < cutoff
+            oversized = max_bytes > 0 and total_bytes > max_bytes
+            if not expired and not oversized:
+                break
+
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            removed += 1
+
+        if removed:
+            logger.info(f"结果缓存淘汰 {removed} 个条目，剩余 {total_bytes / 1024 / 1024:.1f} MB")
+        return removed
+
+    # ==================== 统计 ====================
+
+    def stats(self) -> Dict[str, int]:
+        """本次运行的命中统计"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    # ==================== 内部方法 ====================
+
+    def _path(self, stage: str, key: str, suffix: str) -> Path:
+        return self.root / stage / f"{key}{suffix}"
+
+    def _touch(self, path: Path) -> None:
+        """刷新修改时间（淘汰时视为最近使用）"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _atomic_write(self, path: Path, content: bytes) -> None:
+        """原子写入（先写临时文件再替换）"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
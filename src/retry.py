@@ -0,0 +1,293 @@
+"""
+重试策略模块
+
+数据下载（DataFetcher）和企业微信推送（WeChatNotifier）共用一个 RetryPolicy：
+
+- 退避：按 retry_delays 递增等待，并加入随机抖动，避免并发请求同时重试
+- 运行预算：从策略创建起计时，超过 run_deadline 秒后不再发起新的请求或重试，
+  单次请求的超时也会被裁剪到剩余预算以内，数据下载花在网络上的最坏耗时有上界；
+  推送使用 without_deadline() 得到的副本，不受预算限制（绘图较慢时报告仍能发出）
+- 熔断：同一主机连续出现 breaker_threshold 次临时性错误（连接错误、超时、
+  5xx、429）后熔断，breaker_cooldown 秒内直接失败，不再等待超时；冷却后进入
+  半开状态，只放行一个试探请求，其他请求仍直接失败，试探成功则恢复、失败则重新
+  熔断。解析错误和其他 4xx 说明主机在正常响应，不计入熔断
+
+熔断和预算耗尽抛出的异常都是 requests.RequestException 的子类，
+调用方原有的异常处理无需修改。
+"""
+
+import copy
+import time
+import random
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import requests
+
+from .utils import RetryConfig
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(requests.RequestException):
+    """目标主机已熔断"""
+
+
+class DeadlineExceeded(requests.RequestException):
+    """本次运行的预算已用完"""
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    判断错误是否为临时性错误（计入熔断）
+
+    Args:
+        error: 请求过程中捕获的异常
+
+    Returns:
+        连接错误、超时、5xx 和 429 返回 True；解析错误、其他 4xx 等返回 False
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return False
+
+
+@dataclass
+class _Breaker:
+    """单个主机的熔断状态"""
+    failures: int = 0                  # 连续失败次数
+    open_until: float = 0.0            # 熔断截止时间（monotonic），0 表示未熔断
+    half_open: bool = False            # 试探请求进行中（其他请求继续熔断）
+
+
+class RetryPolicy:
+    """共享的重试策略（线程安全）"""
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        retry_delays: Sequence[float] = (1, 2, 4),
+        jitter: float = 0.5,
+        max_delay: float = 30.0,
+        run_deadline: Optional[float] = None,
+        breaker_threshold: Optional[int] = None,
+        breaker_cooldown: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        初始化重试策略
+
+        Args:
+            max_retries: 每次调用的最大尝试次数
+            retry_delays: 第 N 次失败后的基础等待时间（秒），超出列表时按最后一项翻倍
+            jitter: 抖动比例（0-1），实际等待在 [基础 × (1 - jitter), 基础] 之间
+            max_delay: 单次等待上限（秒）
+            run_deadline: 运行预算（秒，从创建时开始计时），None 或 0 表示不限
+            breaker_threshold: 连续出现多少次临时性错误后熔断，None 表示 max_retries 的两倍
+                （应大于 max_retries，单只 ETF 重试耗尽不会导致整个主机熔断）
+            breaker_cooldown: 熔断持续时间（秒）
+            clock: 时钟函数（测试用）
+            sleep: 等待函数（测试用）
+        """
+        self.max_retries = max_retries
+        self.retry_delays = list(retry_delays) or [1]
+        self.jitter = jitter
+        self.max_delay = max_delay
+        self.breaker_threshold = breaker_threshold if breaker_threshold is not None else max_retries * 2
+        self.breaker_cooldown = breaker_cooldown
+
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, _Breaker] = {}
+
+        self.started_at = clock()
+        self.deadline = self.started_at + run_deadline if run_deadline else None
+
+    @classmethod
+    def from_config(cls, retry_config: RetryConfig) -> 'RetryPolicy':
+        """根据重试配置创建策略（预算从创建时开始计时）"""
+        return cls(
+            max_retries=retry_config.max_retries,
+            retry_delays=retry_config.retry_delays,
+            jitter=retry_config.jitter,
+            max_delay=retry_config.max_delay,
+            run_deadline=retry_config.run_deadline,
+            breaker_threshold=retry_config.breaker_threshold,
+            breaker_cooldown=retry_config.breaker_cooldown
+        )
+
+    def without_deadline(self) -> 'RetryPolicy':
+        """
+        返回不受运行预算限制的副本（共享熔断状态）
+
+        Returns:
+            deadline 为 None 的策略，熔断计数与原策略共用
+        """
+        policy = copy.copy(self)
+        policy.deadline = None
+        return policy
+
+    # ==================== 预算 ====================
+
+    def remaining(self) -> Optional[float]:
+        """剩余预算（秒），不限时返回 None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - self._clock())
+
+    def clamp_timeout(self, timeout):
+        """
+        将请求超时裁剪到剩余预算以内
+
+        Args:
+            timeout: 秒数，或 (连接超时, 读取超时)
+
+        Returns:
+            与输入形式相同的超时
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+
+        remaining = max(remaining, 0.001)
+        if isinstance(timeout, tuple):
+            return tuple(min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+    # ==================== 单次尝试 ====================
+
+    def before_attempt(self, url: str) -> None:
+        """
+        发送请求前检查预算和熔断状态
+
+        Args:
+            url: 请求 URL（按主机熔断）
+
+        冷却结束后第一个到达的请求作为试探请求放行，并重新计时一个冷却期：
+        试探结束（record_success / record_failure）前其他请求直接失败；
+        试探请求没有记录结果时，冷却期过后再放行下一个试探。
+
+        Raises:
+            DeadlineExceeded: 预算已用完
+            CircuitOpenError: 目标主机处于熔断状态，或试探请求进行中
+        """
+        if self.remaining() == 0:
+            raise DeadlineExceeded(f"运行预算已用完，放弃请求: {self._host(url)}")
+
+        host = self._host(url)
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None or not breaker.open_until:
+                return
+
+            now = self._clock()
+            if breaker.open_until > now:
+                if breaker.half_open:
+                    raise CircuitOpenError(f"{host} 熔断试探中，等待试探请求结果")
+                raise CircuitOpenError(
+                    f"{host} 已熔断（连续失败 {breaker.failures} 次），"
+                    f"{breaker.open_until - now:.0f} 秒后重试"
+                )
+
+            # 冷却结束：本次请求作为试探请求
+            breaker.half_open = True
+            breaker.open_until = now + self.breaker_cooldown
+            logger.info(f"{host} 熔断冷却结束，发送试探请求")
+
+    def record_success(self, url: str) -> None:
+        """记录请求成功（关闭熔断）"""
+        with self._lock:
+            self._breakers.pop(self._host(url), None)
+
+    def record_failure(self, url: str, error: Optional[Exception] = None) -> None:
+        """
+        记录请求失败（连续的临时性错误达到阈值时熔断）
+
+        Args:
+            url: 请求 URL
+            error: 捕获的异常（可选，传入时只有临时性错误计入熔断）
+        """
+        host = self._host(url)
+
+        if error is not None and not is_transient(error):
+            # 试探请求得到正常响应（如 4xx），说明主机已恢复
+            with self._lock:
+                breaker = self._breakers.get(host)
+                if breaker is not None and breaker.half_open:
+                    del self._breakers[host]
+            return
+
+        with self._lock:
+            breaker = self._breakers.setdefault(host, _Breaker())
+            breaker.failures += 1
+            breaker.half_open = False
+
+            if breaker.failures >= self.breaker_threshold:
+                breaker.open_until = self._clock() + self.breaker_cooldown
+                logger.error(
+                    f"❌ {host} 连续失败 {breaker.failures} 次，熔断 {self.breaker_cooldown:.0f} 秒"
+                )
+
+    # ==================== 退避 ====================
+
+    def backoff(self, attempt: int) -> float:
+        """
+        计算第 attempt 次失败后的等待时间（已加抖动，未考虑预算）
+
+        Args:
+            attempt: 已失败的次数（从 1 开始）
+
+        Returns:
+            等待秒数
+        """
+        index = attempt - 1
+        if index < len(self.retry_delays):
+            base = self.retry_delays[index]
+        else:
+            base = self.retry_delays[-1] * 2 ** (index - len(self.retry_delays) + 1)
+
+        base = min(base, self.max_delay)
+        return base * (1 - self.jitter * random.random())
+
+    def wait(self, attempt: int) -> None:
+        """
+        重试前等待（不超过剩余预算）
+
+        Args:
+            attempt: 已失败的次数（从 1 开始）
+
+        Raises:
+            DeadlineExceeded: 剩余预算不足以等待
+        """
+        delay = self.backoff(attempt)
+        remaining = self.remaining()
+
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded(f"运行预算不足（剩余 {remaining:.1f} 秒），停止重试")
+
+        logger.info(f"等待 {delay:.1f} 秒后重试...")
+        self._sleep(delay)
+
+    # ==================== 统计 ====================
+
+    def open_circuits(self) -> List[str]:
+        """当前处于熔断状态的主机"""
+        now = self._clock()
+        with self._lock:
+            return sorted(host for host, b in self._breakers.items() if b.open_until > now)
+
+    def elapsed(self) -> float:
+        """策略创建以来的耗时（秒）"""
+        return self._clock() - self.started_at
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlsplit(url).netloc or url
@@ -0,0 +1,260 @@
+"""
+持仓数据源模块
+
+DataFetcher 通过两个接口获取持仓数据，具体数据源在 config.yaml 的
+source 配置中选择：
+
+- DailySource（fetch_latest，source.daily）：每日最新持仓
+- HistorySource（fetch_history，source.history）：完整历史持仓
+
+数据源只实现自己支持的接口：
+
+- ARKFundsSource：ARKFunds.io API（每日最新持仓，JSON），只实现 DailySource
+- GitHubHistorySource：GitHub 历史持仓 CSV（已停止更新，主要用于历史回溯），两者都实现
+- ReplaySource：本地回放目录（录制的 API 响应和历史 CSV），不访问网络，
+  可用于离线调试、基准测试和压力测试
+
+回放目录结构：
+
+    {replay_dir}/
+    ├── {ETF}/
+    │   ├── 2025-01-14.json   # ARKFunds.io API 原始响应
+    │   └── 2025-01-15.json
+    └── {ETF}.csv             # GitHub 格式的历史 CSV
+
+下载（重试、响应缓存）和格式转换由注入的 HoldingsClient 完成，
+数据源只决定数据从哪里来，不依赖 DataFetcher。
+"""
+
+import logging
+from pathlib import Path
+from typing import List, Optional, Protocol
+
+import pandas as pd
+
+from .holdings_client import HoldingsClient
+from .http_client import loads_json
+
+logger = logging.getLogger(__name__)
+
+
+class DailySource(Protocol):
+    """每日持仓数据源接口"""
+
+    name: str
+
+    def fetch_latest(self, etf_symbol: str, date: str) -> pd.DataFrame:
+        """
+        获取最新一天的持仓
+
+        Args:
+            etf_symbol: ETF 代码
+            date: 请求日期 YYYY-MM-DD
+
+        Returns:
+            标准格式持仓 DataFrame
+        """
+        ...
+
+
+class HistorySource(Protocol):
+    """历史持仓数据源接口"""
+
+    name: str
+
+    def fetch_history(self, etf_symbol: str) -> pd.DataFrame:
+        """
+        获取完整历史持仓
+
+        Args:
+            etf_symbol: ETF 代码
+
+        Returns:
+            原始 DataFrame（由 DataFetcher 标准化）
+        """
+        ...
+
+
+class ARKFundsSource:
+    """
+    ARKFunds.io API（推荐，数据最新）
+
+    由开源项目维护，数据来源于 ARK Invest 官方
+    GitHub: https://github.com/frefrik/ark-invest-api
+    返回格式：JSON，包含当日最新持仓数据
+    """
+
+    name = 'arkfunds'
+
+    URL_TEMPLATE = "https://arkfunds.io/api/v1/etf/holdings?symbol={etf_symbol}"
+
+    # API 支持的 ETF 代码
+    SUPPORTED_ETFS = ('ARKK', 'ARKQ', 'ARKW', 'ARKG', 'ARKF')
+
+    def __init__(self, client: HoldingsClient):
+        """
+        初始化数据源
+
+        Args:
+            client: 下载客户端（提供下载重试、响应缓存和格式转换）
+        """
+        self.client = client
+
+    def fetch_latest(self, etf_symbol: str, date: str) -> pd.DataFrame:
+        # 检查 ETF 是否支持
+        if etf_symbol not in self.SUPPORTED_ETFS:
+            logger.error(f"不支持的 ETF 代码: {etf_symbol}，支持的代码: {list(self.SUPPORTED_ETFS)}")
+            raise ValueError(f"不支持的 ETF 代码: {etf_symbol}")
+
+        url = self.URL_TEMPLATE.format(etf_symbol=etf_symbol)
+        logger.info(f"开始下载 {etf_symbol} 持仓数据: {url}")
+
+        return self.client.fetch_json(url, etf_symbol, date)
+
+
+class GitHubHistorySource:
+    """
+    GitHub 历史数据（仅用于历史回溯）
+
+    注意：此数据源已停止更新（最后更新 2021-09-08），不应作为主数据源
+    """
+
+    name = 'github'
+
+    URL_TEMPLATE = "https://raw.githubusercontent.com/thisjustinh/ark-invest-history/master/fund-holdings/{etf_symbol}.csv"
+
+    def __init__(self, client: HoldingsClient):
+        """
+        初始化数据源
+
+        Args:
+            client: 下载客户端
+        """
+        self.client = client
+
+    def fetch_latest(self, etf_symbol: str, date: str) -> pd.DataFrame:
+        url = self.URL_TEMPLATE.format(etf_symbol=etf_symbol)
+        logger.info(f"开始下载 {etf_symbol} 持仓数据: {url}")
+
+        # 历史 CSV 包含所有日期，transform_csv 只保留最新一天
+        df = self.client.download_csv(url)
+        return self.client.transform_csv(df, etf_symbol, date)
+
+    def fetch_history(self, etf_symbol: str) -> pd.DataFrame:
+        url = self.URL_TEMPLATE.format(etf_symbol=etf_symbol)
+        logger.info(f"从 GitHub 下载历史数据: {url}")
+        return self.client.download_csv(url)
+
+
+class ReplaySource:
+    """
+    本地回放数据源
+
+    每日持仓读取 {replay_dir}/{ETF}/{date}.json，该日期没有录制时使用
+    之前最近一次的录制（与 API 只返回最新数据的行为一致）。
+    ETF 代码不限于 ARK 的 5 只基金，可以回放任意规模的数据。
+    """
+
+    name = 'replay'
+
+    def __init__(self, client: HoldingsClient, replay_dir: str):
+        """
+        初始化回放数据源
+
+        Args:
+            client: 下载客户端（只使用格式转换，不访问网络）
+            replay_dir: 回放数据目录
+        """
+        self.client = client
+        self.root = Path(replay_dir)
+
+    def recorded_dates(self, etf_symbol: str) -> List[str]:
+        """列出已录制的日期（升序）"""
+        etf_dir = self.root / etf_symbol
+        if not etf_dir.exists():
+            return []
+        return sorted(path.stem for path in etf_dir.glob("*.json"))
+
+    def payload_path(self, etf_symbol: str, date: str) -> Optional[Path]:
+        """
+        查找回放使用的响应文件
+
+        Args:
+            etf_symbol: ETF 代码
+            date: 请求日期
+
+        Returns:
+            该日期（或之前最近一次）的录制文件；没有时返回 None
+        """
+        earlier = [d for d in self.recorded_dates(etf_symbol) if d <= date]
+        if not earlier:
+            return None
+        return self.root / etf_symbol / f"{earlier[-1]}.json"
+
+    def fetch_latest(self, etf_symbol: str, date: str) -> pd.DataFrame:
+        path = self.payload_path(etf_symbol, date)
+        if path is None:
+            raise FileNotFoundError(f"没有 {etf_symbol} 在 {date} 之前的回放数据: {self.root / etf_symbol}")
+
+        logger.info(f"回放 {etf_symbol} 持仓数据: {path}")
+
+        with open(path, 'rb') as f:
+            json_data = loads_json(f.read())
+
+        return self.client.transform_json(json_data, etf_symbol, date)
+
+    def fetch_history(self, etf_symbol: str) -> pd.DataFrame:
+        path = self.root / f"{etf_symbol}.csv"
+        if not path.exists():
+            raise FileNotFoundError(f"回放历史数据不存在: {path}")
+
+        logger.info(f"回放历史数据: {path}")
+        return pd.read_csv(path, encoding='utf-8')
+
+
+def create_daily_source(name: str, client: HoldingsClient, replay_dir: str) -> DailySource:
+    """
+    根据名称创建每日持仓数据源
+
+    Args:
+        name: 数据源名称（arkfunds / github / replay）
+        client: 下载客户端
+        replay_dir: 回放数据目录（replay 数据源使用）
+
+    Returns:
+        数据源实例
+
+    Raises:
+        ValueError: 未知的数据源名称
+    """
+    if name == 'arkfunds':
+        return ARKFundsSource(client)
+    if name == 'github':
+        return GitHubHistorySource(client)
+    if name == 'replay':
+        return ReplaySource(client, replay_dir)
+
+    raise ValueError(f"未知的每日持仓数据源: {name}")
+
+
+def create_history_source(name: str, client: HoldingsClient, replay_dir: str) -> HistorySource:
+    """
+    根据名称创建历史数据源
+
+    Args:
+        name: 数据源名称（github / replay）
+        client: 下载客户端
+        replay_dir: 回放数据目录（replay 数据源使用）
+
+    Returns:
+        数据源实例
+
+    Raises:
+        ValueError: 未知的数据源名称，或该数据源不提供历史数据（如 arkfunds）
+    """
+    if name == 'github':
+        return GitHubHistorySource(client)
+    if name == 'replay':
+        return ReplaySource(client, replay_dir)
+
+    raise ValueError(f"未知的历史数据源: {name}（arkfunds 不提供历史数据）")
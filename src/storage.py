@@ -0,0 +1,657 @@
+"""
+持仓数据存储模块
+
+提供两类存储后端，作为 CSV 文件的补充：
+- 列式存储（Parquet / Arrow IPC）：每只 ETF 一个目录，每天一个文件，
+  读取时只打开指定日期范围的文件、只解析需要的列，避免逐个解析 CSV
+- SQLite 存储：所有 ETF 共用一个数据库，按 (etf_symbol, date) 和 (ticker, date)
+  建立索引，支持跨基金查询（如某只股票在所有基金中的持仓变化）
+
+两者读出的列类型一致（数值列 float64，代码/名称列为分类类型）。
+"""
+
+import os
+import sqlite3
+import logging
+from abc import ABC, abstractmethod
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    # pyarrow 为可选依赖，未安装时只能使用 CSV 存储
+    HAS_PYARROW = False
+
+
+# 标准持仓列（与 DataFetcher 输出保持一致）
+HOLDINGS_COLUMNS = [
+    'date', 'etf_symbol', 'company', 'ticker',
+    'cusip', 'shares', 'market_value', 'weight'
+]
+
+# 数值列
+NUMERIC_COLUMNS = ['shares', 'market_value', 'weight']
+
+# 分类列（重复值多，使用字典编码）
+CATEGORY_COLUMNS = ['etf_symbol', 'company', 'ticker']
+
+# CSV 读取时的显式列类型（不再逐列推断）
+# 单日文件中的代码/名称几乎没有重复，按字符串读取比分类类型更快、更省内存
+HOLDINGS_CSV_DTYPES = {
+    'date': str,
+    'etf_symbol': str,
+    'company': str,
+    'ticker': str,
+    'cusip': str,
+    'shares': 'float64',
+    'market_value': 'float64',
+    'weight': 'float64',
+}
+
+# 支持的列式存储格式 → 文件扩展名
+COLUMNAR_FORMATS = {
+    'parquet': '.parquet',
+    'feather': '.arrow',  # Feather V2 即 Arrow IPC 文件格式
+}
+
+
+def normalize_holdings_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    统一持仓 DataFrame 的列类型
+
+    Args:
+        df: 持仓数据（列可以不完整）
+
+    Returns:
+        类型统一后的 DataFrame（副本）
+    """
+    df = df.copy()
+
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    if 'date' in df.columns:
+        df['date'] = df['date'].astype(str)
+
+    if 'cusip' in df.columns:
+        df['cusip'] = df['cusip'].astype(object).where(df['cusip'].notna(), None)
+
+    return df
+
+
+def read_holdings_csv(path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    读取单日持仓 CSV（所有持仓 CSV 读取的统一入口）
+
+    - 只解析需要的列（usecols）
+    - 使用显式列类型（数值列 float64，其余列为字符串）
+    - 只把空字段视为缺失值，"N/A" 等 ticker 保持原样
+
+    Args:
+        path: CSV 文件路径
+        columns: 需要的列（None 表示全部标准列）
+
+    Returns:
+        持仓 DataFrame；指定 columns 时按 columns 顺序返回
+
+    Raises:
+        ValueError: columns 包含未知列名
+        pd.errors.ParserError: CSV 解析失败
+        OSError: 文件读取失败
+    """
+    if columns is not None:
+        unknown = set(columns) - set(HOLDINGS_COLUMNS)
+        if unknown:
+            raise ValueError(f"未知的持仓列: {sorted(unknown)}")
+
+    wanted = set(columns or HOLDINGS_COLUMNS)
+
+    # 单日文件只有几十行，C 引擎比 pyarrow 引擎的固定开销更低
+    df = pd.read_csv(
+        path,
+        encoding='utf-8',
+        engine='c',
+        usecols=lambda col: col in wanted,
+        dtype=HOLDINGS_CSV_DTYPES,
+        keep_default_na=False,
+        na_values=['']
+    )
+
+    if columns is not None and df.columns.tolist() != list(columns):
+        df = df[columns]
+    return df
+
+
+class HoldingsStore(ABC):
+    """
+    持仓存储抽象基类
+
+    子类需实现 get_path / read / list_dates / write_many / delete_before。
+    写入遵循不可变历史原则：同一 (ETF, 日期) 已存在时不覆盖。
+    """
+
+    @abstractmethod
+    def get_path(self, etf_symbol: str, date: Optional[str] = None) -> Path:
+        """获取保存该 ETF（指定 date 时为该日）数据的文件路径"""
+
+    @abstractmethod
+    def read(
+        self,
+        etf_symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """读取指定日期范围的持仓数据"""
+
+    @abstractmethod
+    def list_dates(self, etf_symbol: str) -> List[str]:
+        """列出已存储的日期（升序）"""
+
+    @abstractmethod
+    def write_many(self, etf_symbol: str, frames: Dict[str, pd.DataFrame]) -> int:
+        """批量写入多天的持仓数据，返回实际写入的天数"""
+
+    @abstractmethod
+    def delete_before(self, etf_symbol: str, cutoff_date: str) -> List[str]:
+        """删除早于截止日期的数据，返回被删除的日期列表"""
+
+    def has_date(self, etf_symbol: str, date: str) -> bool:
+        """检查指定 (ETF, 日期) 是否已存储"""
+        return date in self.list_dates(etf_symbol)
+
+    def write(self, df: pd.DataFrame, etf_symbol: str, date: str) -> bool:
+        """
+        写入一天的持仓数据
+
+        Args:
+            df: 持仓数据 DataFrame
+            etf_symbol: ETF 代码
+            date: 日期字符串 YYYY-MM-DD
+
+        Returns:
+            True 表示写入成功，False 表示该日期已存在（未覆盖）
+        """
+        if self.write_many(etf_symbol, {date: df}) == 0:
+            logger.debug(f"存储已有数据，跳过: {etf_symbol}/{date}")
+            return False
+
+        logger.debug(f"存储写入: {etf_symbol}/{date}，共 {len(df)} 条记录")
+        return True
+
+    def migrate_from_csv(self, holdings_dir: str) -> Dict[str, int]:
+        """
+        一次性迁移现有 CSV 目录树到存储后端
+
+        Args:
+            holdings_dir: CSV 根目录（data/holdings）
+
+        Returns:
+            迁移统计 {etf: 新写入天数}
+        """
+        stats = {}
+        holdings_path = Path(holdings_dir)
+
+        if not holdings_path.exists():
+            logger.warning(f"CSV 目录不存在: {holdings_path}")
+            return stats
+
+        for etf_dir in sorted(holdings_path.iterdir()):
+            if not etf_dir.is_dir():
+                continue
+
+            frames = {}
+            for csv_file in sorted(etf_dir.glob("*.csv")):
+                try:
+                    frames[csv_file.stem] = read_holdings_csv(csv_file)
+                except (pd.errors.ParserError, OSError) as e:
+                    logger.warning(f"读取文件失败，跳过 {csv_file}: {e}")
+
+            stats[etf_dir.name] = self.write_many(etf_dir.name, frames)
+            logger.info(f"✅ {etf_dir.name}: 迁移 {stats[etf_dir.name]} 天数据")
+
+        return stats
+
+
+class ColumnarHoldingsStore(HoldingsStore):
+    """
+    列式持仓存储
+
+    目录结构：
+        data/store/{format}/{etf_symbol}/{YYYY-MM-DD}.parquet（或 .arrow）
+
+    每天一个文件：写入和去重检查只涉及当天的文件，不随历史长度增长。
+    写入遵循不可变历史原则：同一 (ETF, 日期) 已存在时不覆盖。
+    """
+
+    def __init__(self, data_dir: str, fmt: str = 'parquet'):
+        """
+        初始化列式存储
+
+        Args:
+            data_dir: 数据存储根目录
+            fmt: 存储格式（parquet / feather）
+
+        Raises:
+            ValueError: 不支持的存储格式
+            ImportError: 未安装 pyarrow
+        """
+        if fmt not in COLUMNAR_FORMATS:
+            raise ValueError(
+                f"不支持的存储格式: {fmt}，支持: {list(COLUMNAR_FORMATS.keys())}"
+            )
+
+        if not HAS_PYARROW:
+            raise ImportError("列式存储需要安装 pyarrow: pip install pyarrow")
+
+        self.fmt = fmt
+        self.root = Path(data_dir) / "store" / fmt
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        logger.info(f"初始化 ColumnarHoldingsStore，格式: {fmt}，目录: {self.root}")
+
+    def get_path(self, etf_symbol: str, date: Optional[str] = None) -> Path:
+        """获取 ETF 目录路径（指定 date 时为该日文件路径）"""
+        etf_dir = self.root / etf_symbol
+        if date is None:
+            return etf_dir
+        return etf_dir / f"{date}{COLUMNAR_FORMATS[self.fmt]}"
+
+    def read(
+        self,
+        etf_symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        读取指定日期范围的持仓数据
+
+        Args:
+            etf_symbol: ETF 代码
+            start_date: 起始日期（含），None 表示不限
+            end_date: 结束日期（含），None 表示不限
+            columns: 需要的列（None 表示全部列）
+
+        Returns:
+            按日期排序的持仓 DataFrame（没有数据时返回空 DataFrame）
+        """
+        # 按文件名筛选日期，范围之外的文件不打开
+        dates = [
+            d for d in self.list_dates(etf_symbol)
+            if (not start_date or d >= start_date) and (not end_date or d <= end_date)
+        ]
+
+        if not dates:
+            return pd.DataFrame(columns=list(columns or HOLDINGS_COLUMNS))
+
+        if self.fmt == 'parquet':
+            frames = [pd.read_parquet(self.get_path(etf_symbol, d), columns=columns) for d in dates]
+        else:
+            frames = [pd.read_feather(self.get_path(etf_symbol, d), columns=columns) for d in dates]
+
+        # 各天的分类列类别不同，合并后重新统一类型
+        return normalize_holdings_dtypes(pd.concat(frames, ignore_index=True))
+
+    def list_dates(self, etf_symbol: str) -> List[str]:
+        """
+        列出已存储的日期
+
+        Args:
+            etf_symbol: ETF 代码
+
+        Returns:
+            升序日期列表
+        """
+        etf_dir = self.get_path(etf_symbol)
+        if not etf_dir.exists():
+            return []
+
+        suffix = COLUMNAR_FORMATS[self.fmt]
+        return sorted(p.name[:-len(suffix)] for p in etf_dir.glob(f"*{suffix}"))
+
+    def has_date(self, etf_symbol: str, date: str) -> bool:
+        """检查指定 (ETF, 日期) 是否已存储（只检查当天的文件）"""
+        return self.get_path(etf_symbol, date).exists()
+
+    def write_many(self, etf_symbol: str, frames: Dict[str, pd.DataFrame]) -> int:
+        """
+        批量写入多天的持仓数据（每天写一个新文件，已有文件不读不改）
+
+        Args:
+            etf_symbol: ETF 代码
+            frames: {日期: 持仓 DataFrame}
+
+        Returns:
+            实际写入的天数（已存在的日期会被跳过）
+        """
+        written = 0
+
+        for date, df in frames.items():
+            if self.has_date(etf_symbol, date):
+                continue
+            df = df.copy()
+            df['date'] = date
+            self._write_day(etf_symbol, date, df)
+            written += 1
+
+        return written
+
+    def delete_before(self, etf_symbol: str, cutoff_date: str) -> List[str]:
+        """
+        删除早于截止日期的数据
+
+        Args:
+            etf_symbol: ETF 代码
+            cutoff_date: 截止日期（不含）
+
+        Returns:
+            被删除的日期列表
+        """
+        deleted_dates = [d for d in self.list_dates(etf_symbol) if d < cutoff_date]
+
+        for date in deleted_dates:
+            self.get_path(etf_symbol, date).unlink(missing_ok=True)
+
+        return deleted_dates
+
+    def _write_day(self, etf_symbol: str, date: str, df: pd.DataFrame) -> None:
+        """原子写入单日文件（先写临时文件再替换）"""
+        path = self.get_path(etf_symbol, date)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        df = normalize_holdings_dtypes(df.reindex(columns=HOLDINGS_COLUMNS)).reset_index(drop=True)
+
+        if self.fmt == 'parquet':
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_feather(tmp_path)
+
+        os.replace(tmp_path, path)
+
+
+class SQLiteHoldingsStore(HoldingsStore):
+    """
+    SQLite 持仓存储
+
+    数据库文件：
+        data/store/sqlite/holdings.db
+
+    所有 ETF 的持仓记录保存在同一张 holdings 表中，按 (etf_symbol, date)
+    和 (ticker, date) 建立索引。启用 WAL 模式，每天的写入为一次批量插入。
+    """
+
+    DB_FILENAME = "holdings.db"
+
+    def __init__(self, data_dir: str):
+        """
+        初始化 SQLite 存储（数据库不存在时自动创建）
+
+        Args:
+            data_dir: 数据存储根目录
+        """
+        self.root = Path(data_dir) / "store" / "sqlite"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root / self.DB_FILENAME
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS holdings (
+                    etf_symbol   TEXT NOT NULL,
+                    date         TEXT NOT NULL,
+                    company      TEXT,
+                    ticker       TEXT,
+                    cusip        TEXT,
+                    shares       REAL,
+                    market_value REAL,
+                    weight       REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_holdings_etf_date
+                    ON holdings (etf_symbol, date);
+                CREATE INDEX IF NOT EXISTS idx_holdings_ticker_date
+                    ON holdings (ticker, date);
+            """)
+
+        logger.info(f"初始化 SQLiteHoldingsStore，数据库: {self.db_path}")
+
+    def get_path(self, etf_symbol: str, date: Optional[str] = None) -> Path:
+        """获取数据库文件路径（所有 ETF、所有日期共用）"""
+        return self.db_path
+
+    def read(
+        self,
+        etf_symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        读取指定日期范围的持仓数据（走 (etf_symbol, date) 索引）
+
+        Args:
+            etf_symbol: ETF 代码
+            start_date: 起始日期（含），None 表示不限
+            end_date: 结束日期（含），None 表示不限
+            columns: 需要的列（None 表示全部列）
+
+        Returns:
+            按日期排序的持仓 DataFrame（无数据时返回空 DataFrame）
+        """
+        where, params = self._date_filter(start_date, end_date)
+        return self._query(
+            columns or HOLDINGS_COLUMNS,
+            "etf_symbol = ?" + where,
+            [etf_symbol] + params
+        )
+
+    def read_day(self, etf_symbol: str, date: str) -> pd.DataFrame:
+        """
+        读取某只 ETF 某一天的全部持仓
+
+        Args:
+            etf_symbol: ETF 代码
+            date: 日期字符串 YYYY-MM-DD
+
+        Returns:
+            持仓 DataFrame
+        """
+        return self.read(etf_symbol, start_date=date, end_date=date)
+
+    def ticker_history(
+        self,
+        ticker: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        etf_symbols: Optional[List[str]] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        读取某只股票在各基金中的持仓历史（走 (ticker, date) 索引）
+
+        例如 TSLA 最近 120 天在所有基金中的持股数：
+            store.ticker_history('TSLA', start_date='2025-01-01',
+                                 columns=['date', 'etf_symbol', 'shares'])
+
+        Args:
+            ticker: 股票代码
+            start_date: 起始日期（含），None 表示不限
+            end_date: 结束日期（含），None 表示不限
+            etf_symbols: 只查询指定基金（None 表示全部基金）
+            columns: 需要的列（默认 date / etf_symbol / shares / market_value / weight）
+
+        Returns:
+            按日期、基金排序的 DataFrame
+        """
+        if columns is None:
+            columns = ['date', 'etf_symbol'] + NUMERIC_COLUMNS
+
+        where, params = self._date_filter(start_date, end_date)
+        if etf_symbols:
+            where += f" AND etf_symbol IN ({', '.join('?' * len(etf_symbols))})"
+            params += list(etf_symbols)
+
+        return self._query(columns, "ticker = ?" + where, [ticker] + params,
+                           order_by="date, etf_symbol")
+
+    def list_dates(self, etf_symbol: str) -> List[str]:
+        """
+        列出已存储的日期
+
+        Args:
+            etf_symbol: ETF 代码
+
+        Returns:
+            升序日期列表
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT date FROM holdings WHERE etf_symbol = ? ORDER BY date",
+                (etf_symbol,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def has_date(self, etf_symbol: str, date: str) -> bool:
+        """检查指定 (ETF, 日期) 是否已存储"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM holdings WHERE etf_symbol = ? AND date = ? LIMIT 1",
+                (etf_symbol, date)
+            ).fetchone()
+        return row is not None
+
+    def write_many(self, etf_symbol: str, frames: Dict[str, pd.DataFrame]) -> int:
+        """
+        批量写入多天的持仓数据（单个事务内 executemany）
+
+        Args:
+            etf_symbol: ETF 代码
+            frames: {日期: 持仓 DataFrame}
+
+        Returns:
+            实际写入的天数（已存在的日期会被跳过）
+        """
+        existing = set(self.list_dates(etf_symbol))
+
+        new_frames = []
+        for date, df in frames.items():
+            if date in existing:
+                continue
+            df = df.reindex(columns=HOLDINGS_COLUMNS)
+            df['date'] = date
+            df['etf_symbol'] = etf_symbol
+            new_frames.append(df)
+
+        if not new_frames:
+            return 0
+
+        combined = pd.concat(new_frames, ignore_index=True)
+        for col in NUMERIC_COLUMNS:
+            combined[col] = pd.to_numeric(combined[col], errors='coerce')
+
+        # NaN → NULL，数值转为 Python 原生类型
+        combined = combined.astype(object).where(combined.notna(), None)
+        placeholders = ', '.join('?' * len(HOLDINGS_COLUMNS))
+
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO holdings ({', '.join(HOLDINGS_COLUMNS)}) VALUES ({placeholders})",
+                    combined.itertuples(index=False, name=None)
+                )
+
+        return len(new_frames)
+
+    def delete_before(self, etf_symbol: str, cutoff_date: str) -> List[str]:
+        """
+        删除早于截止日期的数据
+
+        Args:
+            etf_symbol: ETF 代码
+            cutoff_date: 截止日期（不含）
+
+        Returns:
+            被删除的日期列表
+        """
+        deleted_dates = [d for d in self.list_dates(etf_symbol) if d < cutoff_date]
+
+        if deleted_dates:
+            with closing(self._connect()) as conn:
+                with conn:
+                    conn.execute(
+                        "DELETE FROM holdings WHERE etf_symbol = ? AND date < ?",
+                        (etf_symbol, cutoff_date)
+                    )
+
+        return deleted_dates
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接（每次操作独立连接，可在多线程中使用）"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _date_filter(start_date: Optional[str], end_date: Optional[str]):
+        """构造日期过滤条件"""
+        where, params = "", []
+        if start_date:
+            where += " AND date >= ?"
+            params.append(start_date)
+        if end_date:
+            where += " AND date <= ?"
+            params.append(end_date)
+        return where, params
+
+    def _query(self, columns: List[str], where: str, params: list,
+               order_by: str = "date") -> pd.DataFrame:
+        """执行查询并统一列类型"""
+        unknown = set(columns) - set(HOLDINGS_COLUMNS)
+        if unknown:
+            raise ValueError(f"不支持的列: {sorted(unknown)}")
+
+        sql = (
+            f"SELECT {', '.join(columns)} FROM holdings "
+            f"WHERE {where} ORDER BY {order_by}, rowid"
+        )
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+
+        return normalize_holdings_dtypes(df.reindex(columns=list(columns)))
+
+
+def create_holdings_store(data_dir: str, backend: str) -> Optional[HoldingsStore]:
+    """
+    根据配置创建持仓存储后端
+
+    Args:
+        data_dir: 数据存储根目录
+        backend: 存储后端（csv / parquet / feather / sqlite）
+
+    Returns:
+        存储对象；backend 为 csv 或缺少依赖时返回 None（仅使用 CSV）
+    """
+    if backend == 'csv':
+        return None
+
+    if backend == 'sqlite':
+        return SQLiteHoldingsStore(data_dir)
+
+    if not HAS_PYARROW:
+        logger.warning(f"未安装 pyarrow，无法启用 {backend} 存储，回退到 CSV")
+        return None
+
+    return ColumnarHoldingsStore(data_dir, fmt=backend)
@@ -6,12 +6,17 @@ ARK 全系列基金汇总分析器
 2. 发现跨基金重叠股票
 3. 分析各基金独家持仓
 4. 对比昨日变化
+
+所有基金的持仓先合并为一张长表（每行一只基金的一只股票），
+按股票编码后用分组计数/求和得到重叠和独家持仓，当日与前一日的权重
+透视为 股票 × 基金 矩阵一次比较出多基金增减持，基金数量增加时
+不需要逐条遍历持仓。
 """
 
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
-from collections import defaultdict
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -69,6 +74,22 @@ ETF_INFO_MAP = {
 }
 
 
+# 汇总使用的列（etf 为合并时加入的基金代码）
+SUMMARY_COLUMNS = ['etf', 'ticker', 'company', 'weight', 'market_value', 'shares']
+
+# 重点变化排序优先级
+CHANGE_PRIORITY = {
+    'new_multi': 1,
+    'multi_increase': 2,
+    'new_overlap': 3,
+    'multi_decrease': 4,
+    'removed_multi': 5
+}
+
+# 持仓数据：DataFrame，或 to_dict('records') 得到的字典列表
+Holdings = Union[pd.DataFrame, List[dict]]
+
+
 class SummaryAnalyzer:
     """ARK 全系列基金汇总分析器"""
     
@@ -77,14 +98,14 @@ class SummaryAnalyzer:
     
     def analyze_all_etfs(
         self,
-        current_holdings: Dict[str, List[dict]],  # {etf: [dict, ...]}
-        previous_holdings: Dict[str, List[dict]] = None
+        current_holdings: Dict[str, Holdings],  # {etf: DataFrame}
+        previous_holdings: Optional[Dict[str, Holdings]] = None
     ) -> dict:
         """
         汇总分析所有 ETF 的持仓
         
         Args:
-            current_holdings: 当前所有 ETF 的持仓数据
+            current_holdings: 当前所有 ETF 的持仓数据（DataFrame 或字典列表）
             previous_holdings: 前一日所有 ETF 的持仓数据（可选）
         
         Returns:
@@ -92,9 +113,11 @@ class SummaryAnalyzer:
         """
         logger.info("开始汇总分析所有 ARK ETF...")
         
+        current_frames = {etf: self._as_frame(h) for etf, h in current_holdings.items()}
+        
         result = {
             'date': None,
-            'etf_count': len(current_holdings),
+            'etf_count': len(current_frames),
             'etf_summaries': {},  # 各基金摘要
             'statistics': {},  # 统计信息
             'overlapping_stocks': [],  # 跨基金重叠股票
@@ -102,114 +125,187 @@ class SummaryAnalyzer:
             'top_changes': [],  # 重点变化
         }
         
-        # 1. 收集所有股票信息
-        all_stocks = defaultdict(list)  # {ticker: [{etf, weight, company, ...}]}
-        
-        for etf, holdings in current_holdings.items():
-            if not holdings:
+        for etf, df in current_frames.items():
+            if df.empty:
                 continue
             
             # 设置日期（取第一个 ETF 的日期）
-            if result['date'] is None and len(holdings) > 0:
-                result['date'] = holdings[0].get('date', None)
+            if result['date'] is None and 'date' in df.columns:
+                result['date'] = df['date'].iloc[0]
             
             # 各基金摘要
             result['etf_summaries'][etf] = {
-                'info': self.etf_info[etf],
-                'holdings_count': len(holdings),
-                'top_holdings': holdings[:5],  # Top 5（字典格式）
+                'info': self._get_etf_info(etf),
+                'holdings_count': len(df),
+                'top_holdings': df.head(5).to_dict('records'),  # Top 5（字典格式）
             }
-            
-            # 收集股票
-            for holding in holdings:
-                ticker = holding.get('ticker', 'N/A')
-                if ticker != 'N/A':  # 排除货币基金
-                    all_stocks[ticker].append({
-                        'etf': etf,
-                        'weight': holding['weight'],
-                        'company': holding['company'],
-                        'market_value': holding.get('market_value', 0),
-                        'shares': holding.get('shares', 0)
-                    })
+        
+        # 1. 合并为长表，按股票汇总
+        current = self._long_frame(current_frames)
+        codes, stocks = self._aggregate_stocks(current)
         
         # 2. 分析跨基金重叠股票
-        result['overlapping_stocks'] = self._analyze_overlapping(all_stocks)
+        result['overlapping_stocks'] = self._analyze_overlapping(current, codes, stocks)
         
         # 3. 分析独家持仓
-        result['exclusive_stocks'] = self._analyze_exclusive(all_stocks, current_holdings)
+        result['exclusive_stocks'] = self._analyze_exclusive(current, codes, stocks)
         
         # 4. 统计信息
-        result['statistics'] = self._calculate_statistics(all_stocks, current_holdings)
+        result['statistics'] = self._calculate_statistics(stocks, current_frames)
         
         # 5. 对比昨日变化（如果有前一日数据）
         if previous_holdings:
-            result['top_changes'] = self._analyze_changes(
-                current_holdings, previous_holdings, all_stocks
+            previous = self._long_frame(
+                {etf: self._as_frame(h) for etf, h in previous_holdings.items()}
             )
+            result['top_changes'] = self._analyze_changes(current, previous, stocks)
         
-        logger.info(f"✅ 汇总分析完成: {len(all_stocks)} 只股票，"
+        logger.info(f"✅ 汇总分析完成: {len(stocks)} 只股票，"
                    f"{len(result['overlapping_stocks'])} 只跨基金重叠")
         
         return result
     
-    def _analyze_overlapping(self, all_stocks: dict) -> List[dict]:
+    def _get_etf_info(self, etf: str) -> ETFInfo:
+        """获取基金信息（不在 ETF_INFO_MAP 中的基金使用代码作为名称）"""
+        info = self.etf_info.get(etf)
+        if info is None:
+            info = ETFInfo(symbol=etf, name_cn=etf, name_en=etf, focus='', emoji='📊')
+        return info
+    
+    @staticmethod
+    def _as_frame(holdings: Holdings) -> pd.DataFrame:
+        """字典列表转换为 DataFrame（DataFrame 原样返回）"""
+        if isinstance(holdings, pd.DataFrame):
+            return holdings
+        return pd.DataFrame(holdings)
+    
+    @staticmethod
+    def _long_frame(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        合并各基金持仓为长表
+        
+        Args:
+            frames: {etf: 持仓 DataFrame}
+        
+        Returns:
+            SUMMARY_COLUMNS 长表（按基金顺序、基金内原顺序排列，不含货币基金 N/A），
+            缺少 market_value / shares 列时记为 0
+        """
+        data = {name: [] for name in SUMMARY_COLUMNS}
+        for etf, df in frames.items():
+            n_rows = len(df)
+            if n_rows == 0:
+                continue
+            
+            data['etf'].extend([etf] * n_rows)
+            for name in ('ticker', 'company', 'weight'):
+                data[name].extend(df[name].tolist())
+            for name in ('market_value', 'shares'):
+                data[name].extend(df[name].tolist() if name in df.columns else [0] * n_rows)
+        
+        combined = pd.DataFrame(data, columns=SUMMARY_COLUMNS)
+        combined['weight'] = combined['weight'].astype('float64')
+        
+        # 排除货币基金（ticker 为 N/A）
+        mask = combined['ticker'].notna() & (combined['ticker'] != 'N/A')
+        return combined[mask].reset_index(drop=True)
+    
+    @staticmethod
+    def _aggregate_stocks(current: pd.DataFrame) -> Tuple[np.ndarray, pd.DataFrame]:
+        """
+        按股票汇总长表
+        
+        Args:
+            current: 当日长表
+        
+        Returns:
+            (codes, stocks)：codes[i] 为长表第 i 行所属股票的行号；
+            stocks 以 ticker 为索引（按首次出现顺序），包含 company（首次出现的名称）、
+            num_funds（持仓行数）、total_weight（权重合计）
+        """
+        codes, tickers = pd.factorize(current['ticker'].to_numpy(dtype=object))
+        _, first_rows = np.unique(codes, return_index=True)
+        
+        stocks = pd.DataFrame(
+            {
+                'company': current['company'].to_numpy(dtype=object)[first_rows],
+                'num_funds': np.bincount(codes, minlength=len(tickers)),
+                'total_weight': np.bincount(
+                    codes, weights=current['weight'].to_numpy(), minlength=len(tickers)
+                ),
+            },
+            index=pd.Index(tickers, name='ticker')
+        )
+        return codes, stocks
+    
+    def _analyze_overlapping(
+        self,
+        current: pd.DataFrame,
+        codes: np.ndarray,
+        stocks: pd.DataFrame
+    ) -> List[dict]:
         """分析跨基金重叠股票"""
-        overlapping = []
-        
-        for ticker, holdings in all_stocks.items():
-            if len(holdings) >= 2:  # 出现在 2+ 基金中
-                total_weight = sum(h['weight'] for h in holdings)
-                
-                overlapping.append({
-                    'ticker': ticker,
-                    'company': holdings[0]['company'],
-                    'num_funds': len(holdings),
-                    'total_weight': total_weight,
-                    'holdings': sorted(holdings, key=lambda x: x['weight'], reverse=True)
-                })
-        
-        # 排序：优先按基金数量，其次按总权重
-        overlapping.sort(key=lambda x: (x['num_funds'], x['total_weight']), reverse=True)
-        
-        return overlapping
+        num_funds = stocks['num_funds'].to_numpy()
+        total_weight = stocks['total_weight'].to_numpy()
+        
+        # 出现在 2+ 基金中；优先按基金数量，其次按总权重排序（稳定排序）
+        overlapping = np.flatnonzero(num_funds >= 2)
+        overlapping = overlapping[np.lexsort((-total_weight[overlapping], -num_funds[overlapping]))]
+        if len(overlapping) == 0:
+            return []
+        
+        # 每只股票的各基金持仓按权重降序
+        rows = np.flatnonzero(num_funds[codes] >= 2)
+        rows = rows[np.argsort(-current['weight'].to_numpy()[rows], kind='stable')]
+        
+        holdings_by_code = {code: [] for code in overlapping.tolist()}
+        records = self._records(current, rows, ['etf', 'weight', 'company', 'market_value', 'shares'])
+        for code, record in zip(codes[rows].tolist(), records):
+            holdings_by_code[code].append(record)
+        
+        companies = stocks['company'].to_numpy()
+        tickers = stocks.index.to_numpy(dtype=object)
+        return [
+            {
+                'ticker': tickers[code],
+                'company': companies[code],
+                'num_funds': int(num_funds[code]),
+                'total_weight': float(total_weight[code]),
+                'holdings': holdings
+            }
+            for code, holdings in holdings_by_code.items()
+        ]
     
     def _analyze_exclusive(
         self, 
-        all_stocks: dict, 
-        current_holdings: dict
+        current: pd.DataFrame, 
+        codes: np.ndarray,
+        stocks: pd.DataFrame
     ) -> Dict[str, List[dict]]:
         """分析各基金独家持仓（仅在该基金中，且权重 > 3%）"""
-        exclusive = defaultdict(list)
-        
-        for ticker, holdings in all_stocks.items():
-            if len(holdings) == 1:  # 仅在一个基金中
-                h = holdings[0]
-                if h['weight'] >= 3.0:  # 权重 >= 3%
-                    exclusive[h['etf']].append({
-                        'ticker': ticker,
-                        'company': h['company'],
-                        'weight': h['weight'],
-                        'market_value': h['market_value']
-                    })
-        
-        # 每个基金按权重排序，最多保留 5 只
-        for etf in exclusive:
-            exclusive[etf] = sorted(
-                exclusive[etf], 
-                key=lambda x: x['weight'], 
-                reverse=True
-            )[:5]
-        
-        return dict(exclusive)
+        weight = current['weight'].to_numpy()
+        
+        rows = np.flatnonzero((stocks['num_funds'].to_numpy()[codes] == 1) & (weight >= 3.0))
+        etfs = current['etf'].to_numpy(dtype=object)
+        
+        # 基金按首只独家股票出现的顺序；每个基金按权重排序，最多保留 5 只
+        exclusive = {etf: [] for etf in pd.unique(etfs[rows])}
+        rows = rows[np.argsort(-weight[rows], kind='stable')]
+        records = self._records(current, rows, ['ticker', 'company', 'weight', 'market_value'])
+        for etf, record in zip(etfs[rows].tolist(), records):
+            if len(exclusive[etf]) < 5:
+                exclusive[etf].append(record)
+        
+        return exclusive
     
     def _calculate_statistics(
         self, 
-        all_stocks: dict, 
-        current_holdings: dict
+        stocks: pd.DataFrame, 
+        current_frames: Dict[str, pd.DataFrame]
     ) -> dict:
         """计算统计信息"""
-        total_stocks = len(all_stocks)
-        overlapping_count = len([t for t, h in all_stocks.items() if len(h) >= 2])
+        total_stocks = len(stocks)
+        overlapping_count = int((stocks['num_funds'] >= 2).sum())
         exclusive_count = total_stocks - overlapping_count
         
         return {
@@ -217,16 +313,16 @@ class SummaryAnalyzer:
             'overlapping_count': overlapping_count,
             'exclusive_count': exclusive_count,
             'holdings_by_etf': {
-                etf: len(holdings) 
-                for etf, holdings in current_holdings.items()
+                etf: len(df) 
+                for etf, df in current_frames.items()
             }
         }
     
     def _analyze_changes(
         self,
-        current_holdings: dict,
-        previous_holdings: dict,
-        all_stocks: dict
+        current: pd.DataFrame,
+        previous: pd.DataFrame,
+        stocks: pd.DataFrame
     ) -> List[dict]:
         """
         分析重点变化
@@ -235,104 +331,92 @@ class SummaryAnalyzer:
         1. 被多个基金同时增持/减持的股票
         2. 新增的跨基金股票
         3. 从独家变为跨基金的股票
+        
+        当日与前一日的权重各透视为 股票 × 基金 矩阵（行为当日持有的股票），
+        每只股票在各基金中的新增、移除、增减持一次比较得出。
         """
-        changes = []
+        tickers = stocks.index
+        etfs = pd.Index(pd.unique(np.concatenate([
+            current['etf'].to_numpy(dtype=object), previous['etf'].to_numpy(dtype=object)
+        ])))
         
-        # 构建前一日的股票分布
-        previous_stocks = defaultdict(list)
-        for etf, holdings in previous_holdings.items():
-            for holding in holdings:
-                ticker = holding.get('ticker', 'N/A')
-                if ticker != 'N/A':
-                    previous_stocks[ticker].append({
-                        'etf': etf,
-                        'weight': holding['weight']
-                    })
-        
-        # 1. 分析每只股票的变化
-        for ticker, current_data in all_stocks.items():
-            current_etfs = {h['etf']: h['weight'] for h in current_data}
-            previous_data = previous_stocks.get(ticker, [])
-            previous_etfs = {h['etf']: h['weight'] for h in previous_data}
-            
-            # 新增的基金持仓
-            new_etfs = set(current_etfs.keys()) - set(previous_etfs.keys())
-            
-            # 移除的基金持仓
-            removed_etfs = set(previous_etfs.keys()) - set(current_etfs.keys())
-            
-            # 同时增持/减持
-            increased_etfs = []
-            decreased_etfs = []
-            
-            for etf in set(current_etfs.keys()) & set(previous_etfs.keys()):
-                change = current_etfs[etf] - previous_etfs[etf]
-                if change > 0.5:  # 增持超过 0.5%
-                    increased_etfs.append((etf, change))
-                elif change < -0.5:  # 减持超过 0.5%
-                    decreased_etfs.append((etf, change))
-            
-            # 记录重要变化
-            company = current_data[0]['company']
+        def pivot(long: pd.DataFrame):
+            # 同一基金内重复的股票取最后一行；当日没有持有的股票不参与比较
+            long = long.drop_duplicates(['ticker', 'etf'], keep='last')
+            rows = tickers.get_indexer(long['ticker'])
+            cols = etfs.get_indexer(long['etf'])
+            known = rows >= 0
             
-            # 被多个基金同时增持
-            if len(increased_etfs) >= 2:
-                changes.append({
-                    'type': 'multi_increase',
-                    'ticker': ticker,
-                    'company': company,
-                    'etfs': increased_etfs,
-                    'description': f"{ticker} 被 {len(increased_etfs)} 只基金同时增持"
-                })
-            
-            # 被多个基金同时减持
-            if len(decreased_etfs) >= 2:
-                changes.append({
-                    'type': 'multi_decrease',
-                    'ticker': ticker,
-                    'company': company,
-                    'etfs': decreased_etfs,
-                    'description': f"{ticker} 被 {len(decreased_etfs)} 只基金同时减持"
-                })
-            
-            # 新增跨基金股票（前一日只在1个基金，今天在2+基金）
-            if len(previous_data) == 1 and len(current_data) >= 2:
-                changes.append({
-                    'type': 'new_overlap',
-                    'ticker': ticker,
-                    'company': company,
-                    'etfs': list(new_etfs),
-                    'description': f"{ticker} 从单基金变为跨基金持仓"
-                })
-            
-            # 完全新增到多个基金
-            if len(new_etfs) >= 2:
-                changes.append({
-                    'type': 'new_multi',
-                    'ticker': ticker,
-                    'company': company,
-                    'etfs': list(new_etfs),
-                    'description': f"{ticker} 被 {len(new_etfs)} 只基金同时新增"
-                })
-            
-            # 完全从多个基金移除
-            if len(removed_etfs) >= 2:
-                changes.append({
-                    'type': 'removed_multi',
-                    'ticker': ticker,
-                    'company': company,
-                    'etfs': list(removed_etfs),
-                    'description': f"{ticker} 被 {len(removed_etfs)} 只基金同时移除"
-                })
-        
-        # 按重要性排序
-        priority = {
-            'new_multi': 1,
-            'multi_increase': 2,
-            'new_overlap': 3,
-            'multi_decrease': 4,
-            'removed_multi': 5
+            weight = np.full((len(tickers), len(etfs)), np.nan)
+            held = np.zeros((len(tickers), len(etfs)), dtype=bool)
+            weight[rows[known], cols[known]] = long['weight'].to_numpy()[known]
+            held[rows[known], cols[known]] = True
+            return weight, held
+        
+        curr_weight, curr_held = pivot(current)
+        prev_weight, prev_held = pivot(previous)
+        
+        change = curr_weight - prev_weight
+        both = curr_held & prev_held
+        increased = both & (change > 0.5)  # 增持超过 0.5%
+        decreased = both & (change < -0.5)  # 减持超过 0.5%
+        new = curr_held & ~prev_held  # 新增的基金持仓
+        removed = prev_held & ~curr_held  # 移除的基金持仓
+        
+        # 持仓行数（与重叠统计一致，同一基金重复的行分别计数）
+        prev_codes = tickers.get_indexer(previous['ticker'])
+        prev_rows = np.bincount(prev_codes[prev_codes >= 0], minlength=len(tickers))
+        curr_rows = stocks['num_funds'].to_numpy()
+        
+        # 各类重点变化涉及的股票
+        flags = {
+            'multi_increase': increased.sum(axis=1) >= 2,  # 被多个基金同时增持
+            'multi_decrease': decreased.sum(axis=1) >= 2,  # 被多个基金同时减持
+            'new_overlap': (prev_rows == 1) & (curr_rows >= 2),  # 前一日只在1个基金，今天在2+基金
+            'new_multi': new.sum(axis=1) >= 2,  # 完全新增到多个基金
+            'removed_multi': removed.sum(axis=1) >= 2,  # 完全从多个基金移除
         }
-        changes.sort(key=lambda x: priority.get(x['type'], 99))
         
-        return changes[:10]  # 返回最重要的 10 条
+        # 逐条生成记录时使用 numpy 数组（比按位置读取 Index 快）
+        ticker_values = tickers.to_numpy(dtype=object)
+        etf_values = etfs.to_numpy(dtype=object)
+        companies = stocks['company'].to_numpy()
+        
+        def make_change(change_type: str, i: int) -> dict:
+            ticker = ticker_values[i]
+            if change_type in ('multi_increase', 'multi_decrease'):
+                mask = increased[i] if change_type == 'multi_increase' else decreased[i]
+                etf_list = [(etf_values[j], float(change[i, j])) for j in np.flatnonzero(mask)]
+                action = '增持' if change_type == 'multi_increase' else '减持'
+                description = f"{ticker} 被 {len(etf_list)} 只基金同时{action}"
+            elif change_type == 'removed_multi':
+                etf_list = etf_values[removed[i]].tolist()
+                description = f"{ticker} 被 {len(etf_list)} 只基金同时移除"
+            else:
+                etf_list = etf_values[new[i]].tolist()
+                if change_type == 'new_overlap':
+                    description = f"{ticker} 从单基金变为跨基金持仓"
+                else:
+                    description = f"{ticker} 被 {len(etf_list)} 只基金同时新增"
+            
+            return {
+                'type': change_type,
+                'ticker': ticker,
+                'company': companies[i],
+                'etfs': etf_list,
+                'description': description
+            }
+        
+        # 按重要性依次生成（同类按股票首次出现的顺序），只保留最重要的 10 条
+        changes = []
+        for change_type in sorted(flags, key=CHANGE_PRIORITY.get):
+            for i in np.flatnonzero(flags[change_type])[:10 - len(changes)].tolist():
+                changes.append(make_change(change_type, i))
+        
+        return changes
+    
+    @staticmethod
+    def _records(long: pd.DataFrame, rows: np.ndarray, columns: List[str]) -> List[dict]:
+        """取长表中指定行的若干列，转换为字典列表（值为 Python 原生类型）"""
+        values = [long[name].to_numpy(dtype=object)[rows].tolist() for name in columns]
+        return [dict(zip(columns, row)) for row in zip(*values)]
@@ -11,7 +11,7 @@ import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
 
@@ -34,12 +34,15 @@ class DataConfig:
     retention_days: int = 90          # 历史数据保留天数
     auto_download_history: bool = True  # 是否自动下载历史数据
     history_days: int = 90             # 下载历史数据的天数
+    fetch_concurrency: int = 5         # 并发下载的最大请求数
+    render_workers: int = 0            # 并行绘图的进程数（0 表示按 CPU 核数自动选择，1 表示主进程内顺序绘制）
 
 
 @dataclass
 class AnalysisConfig:
     """分析配置"""
     change_threshold: float
+    horizons: List[int] = field(default_factory=lambda: [1, 5, 20, 60])  # 多周期对比（交易日数）
 
 
 @dataclass
@@ -47,6 +50,7 @@ class NotificationConfig:
     """通知配置"""
     webhook_url: str
     enable_error_alert: bool
+    image_max_bytes: int = 2 * 1024 * 1024  # 图片字节预算（企业微信上限 2MB，base64 编码前），超出时压缩后发送
 
 
 @dataclass
@@ -54,6 +58,11 @@ class RetryConfig:
     """重试配置"""
     max_retries: int
     retry_delays: List[int]
+    jitter: float = 0.5                # 退避抖动比例（实际等待为基础延迟的 50%-100%）
+    max_delay: float = 30.0            # 单次等待上限（秒）
+    run_deadline: float = 600.0        # 数据下载的运行预算（秒），超过后不再发起 HTTP 请求，0 表示不限（推送不受限制）
+    breaker_threshold: Optional[int] = None  # 同一主机连续出现多少次临时性错误后熔断（应大于 max_retries），None 表示 max_retries 的两倍
+    breaker_cooldown: float = 300.0    # 熔断持续时间（秒）
 
 
 @dataclass
@@ -63,6 +72,35 @@ class LogConfig:
     level: str
 
 
+@dataclass
+class StorageConfig:
+    """存储配置"""
+    backend: str = "csv"               # 持仓存储后端（csv / parquet / feather / sqlite）
+    repository_cache_size: int = 512   # 持仓仓库 LRU 缓存条目数（每条为一只 ETF 一天）
+    result_cache: bool = True          # 是否缓存各阶段分析结果和图片（data/cache/results）
+    result_cache_max_age_days: int = 30  # 结果缓存条目保留天数（按最近一次使用计算，0 表示不限）
+    result_cache_max_mb: int = 500     # 结果缓存总大小上限（MB，超出时淘汰最久未使用的条目，0 表示不限）
+
+
+@dataclass
+class HttpConfig:
+    """HTTP 客户端配置"""
+    connect_timeout: float = 5.0       # 连接超时（秒）
+    read_timeout: float = 30.0         # 读取超时（秒）
+    pool_connections: int = 4          # 连接池缓存的主机数
+    pool_maxsize: int = 10             # 每个主机的最大连接数
+    response_cache: bool = True        # 是否缓存 API 响应（data/cache/http）
+    response_cache_ttl: int = 900      # 响应缓存有效期（秒），过期后发送条件请求
+
+
+@dataclass
+class SourceConfig:
+    """数据源配置"""
+    daily: str = "arkfunds"            # 每日持仓数据源（arkfunds / github / replay）
+    history: str = "github"            # 历史数据源（github / replay）
+    replay_dir: str = "./data/replay"  # 回放数据目录（replay 数据源使用）
+
+
 @dataclass
 class Config:
     """系统配置"""
@@ -72,6 +110,9 @@ class Config:
     notification: NotificationConfig
     retry: RetryConfig
     log: LogConfig
+    storage: StorageConfig = field(default_factory=StorageConfig)
+    http: HttpConfig = field(default_factory=HttpConfig)
+    source: SourceConfig = field(default_factory=SourceConfig)
 
 
 # ==================== 配置加载和验证 ====================
@@ -130,6 +171,10 @@ def load_config(config_path: str = 'config.yaml') -> Config:
     
     raw_config = replace_env_vars(raw_config)
     
+    # 忽略已移除的配置项（旧配置文件中的 storage.panel_cache，趋势图已改为从持仓仓库读取）
+    storage_section = dict(raw_config.get('storage') or {})
+    storage_section.pop('panel_cache', None)
+    
     # 5. 构造 Config 对象
     try:
         config = Config(
@@ -138,7 +183,10 @@ def load_config(config_path: str = 'config.yaml') -> Config:
             analysis=AnalysisConfig(**raw_config.get('analysis', {})),
             notification=NotificationConfig(**raw_config.get('notification', {})),
             retry=RetryConfig(**raw_config.get('retry', {})),
-            log=LogConfig(**raw_config.get('log', {}))
+            log=LogConfig(**raw_config.get('log', {})),
+            storage=StorageConfig(**storage_section),
+            http=HttpConfig(**(raw_config.get('http') or {})),
+            source=SourceConfig(**(raw_config.get('source') or {}))
         )
     except TypeError as e:
         raise ValueError(f"配置文件格式错误: {e}")
@@ -172,23 +220,33 @@ def validate_config(config: Config) -> None:
             f"必须以 https://qyapi.weixin.qq.com 开头"
         )
     
-    # 2. 验证 change_threshold
+    if config.notification.image_max_bytes <= 0:
+        raise ValueError(f"image_max_bytes 必须为正数: {config.notification.image_max_bytes}")
+    
+    # 2. 验证分析配置
     if not (0.1 <= config.analysis.change_threshold <= 100):
         raise ValueError(
             f"change_threshold 必须在 0.1-100 范围，当前值: {config.analysis.change_threshold}"
         )
     
+    if not config.analysis.horizons or any(
+        not isinstance(days, int) or days < 1 for days in config.analysis.horizons
+    ):
+        raise ValueError(f"horizons 必须是正整数列表（交易日数）: {config.analysis.horizons}")
+    
     # 3. 验证 ETF 列表
     if not config.data.etfs:
         raise ValueError("ETF 列表不能为空")
     
-    valid_etfs = {'ARKK', 'ARKW', 'ARKG', 'ARKQ', 'ARKF'}
-    for etf in config.data.etfs:
-        if etf not in valid_etfs:
-            raise ValueError(
-                f"无效的 ETF 代码: {etf}\n"
-                f"支持的 ETF: {', '.join(sorted(valid_etfs))}"
-            )
+    # 回放数据源不限制 ETF 代码（可回放任意规模的数据）
+    if config.source.daily != 'replay':
+        valid_etfs = {'ARKK', 'ARKW', 'ARKG', 'ARKQ', 'ARKF'}
+        for etf in config.data.etfs:
+            if etf not in valid_etfs:
+                raise ValueError(
+                    f"无效的 ETF 代码: {etf}\n"
+                    f"支持的 ETF: {', '.join(sorted(valid_etfs))}"
+                )
     
     # 4. 验证目录路径
     if not config.data.data_dir:
@@ -197,6 +255,12 @@ def validate_config(config: Config) -> None:
     if not config.data.log_dir:
         raise ValueError("log_dir 不能为空")
     
+    if config.data.fetch_concurrency < 1:
+        raise ValueError(f"fetch_concurrency 必须至少为 1: {config.data.fetch_concurrency}")
+    
+    if config.data.render_workers < 0:
+        raise ValueError(f"render_workers 不能为负数: {config.data.render_workers}")
+    
     # 5. 验证重试配置
     if config.retry.max_retries < 0:
         raise ValueError(f"max_retries 不能为负数: {config.retry.max_retries}")
@@ -207,7 +271,69 @@ def validate_config(config: Config) -> None:
             f"必须等于 max_retries ({config.retry.max_retries})"
         )
     
-    # 6. 验证日志级别
+    if not (0 <= config.retry.jitter <= 1):
+        raise ValueError(f"jitter 必须在 0-1 范围: {config.retry.jitter}")
+    
+    if config.retry.run_deadline < 0:
+        raise ValueError(f"run_deadline 不能为负数: {config.retry.run_deadline}")
+    
+    threshold = config.retry.breaker_threshold
+    if threshold is not None:
+        if threshold < 1:
+            raise ValueError(f"breaker_threshold 必须至少为 1: {threshold}")
+
+        if threshold <= config.retry.max_retries:
+            logging.getLogger(__name__).warning(
+                f"⚠️ breaker_threshold ({threshold}) 不大于 max_retries ({config.retry.max_retries})，"
+                f"单只 ETF 重试耗尽就会熔断整个主机"
+            )
+    
+    # 6. 验证存储后端
+    valid_backends = {'csv', 'parquet', 'feather', 'sqlite'}
+    if config.storage.backend not in valid_backends:
+        raise ValueError(
+            f"无效的存储后端: {config.storage.backend}\n"
+            f"支持的后端: {', '.join(sorted(valid_backends))}"
+        )
+    
+    if config.storage.result_cache_max_age_days < 0 or config.storage.result_cache_max_mb < 0:
+        raise ValueError(
+            f"结果缓存淘汰配置不能为负数: result_cache_max_age_days={config.storage.result_cache_max_age_days}, "
+            f"result_cache_max_mb={config.storage.result_cache_max_mb}"
+        )
+    
+    # 7. 验证 HTTP 配置
+    if config.http.connect_timeout <= 0 or config.http.read_timeout <= 0:
+        raise ValueError(
+            f"HTTP 超时必须为正数: connect_timeout={config.http.connect_timeout}, "
+            f"read_timeout={config.http.read_timeout}"
+        )
+    
+    if config.http.pool_connections < 1 or config.http.pool_maxsize < 1:
+        raise ValueError(
+            f"HTTP 连接池大小必须至少为 1: pool_connections={config.http.pool_connections}, "
+            f"pool_maxsize={config.http.pool_maxsize}"
+        )
+    
+    if config.http.response_cache_ttl < 0:
+        raise ValueError(f"response_cache_ttl 不能为负数: {config.http.response_cache_ttl}")
+    
+    # 8. 验证数据源
+    valid_daily_sources = {'arkfunds', 'github', 'replay'}
+    if config.source.daily not in valid_daily_sources:
+        raise ValueError(
+            f"无效的每日持仓数据源: {config.source.daily}\n"
+            f"支持的数据源: {', '.join(sorted(valid_daily_sources))}"
+        )
+    
+    valid_history_sources = {'github', 'replay'}
+    if config.source.history not in valid_history_sources:
+        raise ValueError(
+            f"无效的历史数据源: {config.source.history}\n"
+            f"支持的数据源: {', '.join(sorted(valid_history_sources))}"
+        )
+    
+    # 9. 验证日志级别
     valid_levels = {'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'}
     if config.log.level not in valid_levels:
         raise ValueError(
@@ -4,9 +4,11 @@
 测试 src/analyzer.py 中的 Analyzer 类
 """
 
+import pickle
 import pytest
 import pandas as pd
-from src.analyzer import Analyzer, ChangeAnalysis
+from src.analyzer import Analyzer, ChangeAnalysis, HoldingsDiff
+from src.history import HoldingsHistory
 
 
 # ==================== Fixtures ====================
@@ -322,5 +324,133 @@ class TestEdgeCases:
         assert len(result.increased) == 0
 
 
+
+# ==================== 测试列式对比结果 ====================
+
+class TestHoldingsDiff:
+    """测试向量化对比结果（compare_holdings(current, previous, prev_date, curr_date)）"""
+    
+    def compare(self, analyzer, previous_holdings, current_holdings) -> HoldingsDiff:
+        return analyzer.compare_holdings(
+            current_holdings, previous_holdings, '2025-01-14', '2025-01-15'
+        )
+    
+    def test_classification(self, analyzer, previous_holdings, current_holdings):
+        """测试新增、移除、增持、减持和未变化的分类"""
+        result = self.compare(analyzer, previous_holdings, current_holdings)
+        
+        assert [h.ticker for h in result['added']] == ['PATH']
+        assert [h.ticker for h in result['removed']] == ['SHOP']
+        assert [h.ticker for h in result['increased']] == ['TSLA', 'ROKU']
+        assert [h.ticker for h in result['decreased']] == ['COIN', 'SQ']
+        assert result['unchanged'] == 0
+        assert result['prev_date'] == '2025-01-14'
+    
+    def test_holding_values(self, analyzer, previous_holdings, current_holdings):
+        """测试列表视图中的数值与原实现一致"""
+        result = self.compare(analyzer, previous_holdings, current_holdings)
+        
+        added = result['added'][0]
+        assert (added.prev_shares, added.curr_shares, added.curr_weight) == (0.0, 500000, 0.98)
+        assert added.change_type == 'added'
+        
+        removed = result['removed'][0]
+        assert (removed.prev_weight, removed.curr_weight, removed.weight_change) == (1.26, 0.0, 0.0)
+        
+        tsla = result['increased'][0]
+        assert tsla.company == 'Tesla Inc'
+        assert tsla.weight_change == pytest.approx(1.30)
+    
+    def test_significant_threshold(self, previous_holdings, current_holdings):
+        """测试显著变化按权重变化阈值筛选"""
+        result = self.compare(Analyzer(threshold=1.0), previous_holdings, current_holdings)
+        
+        assert [h.ticker for h in result['significant_increased']] == ['TSLA']
+        assert result['significant_decreased'] == []
+    
+    def test_counts_without_views(self, analyzer, previous_holdings, current_holdings):
+        """测试 count() 不生成列表视图"""
+        result = self.compare(analyzer, previous_holdings, current_holdings)
+        
+        assert result.count('increased') == 2
+        assert result.count('significant_increased') == 0
+        assert analyzer.get_summary_stats(result)['total_removed'] == 1
+        assert result._views == {}
+    
+    def test_columnar_changes(self, analyzer, previous_holdings, current_holdings):
+        """测试列式结果每个 ticker 一行"""
+        result = self.compare(analyzer, previous_holdings, current_holdings)
+        
+        assert len(result.changes) == 6
+        assert result.changes['ticker'].is_unique
+        assert len(result.rows('decreased')) == 2
+        assert set(dict(result)) == set(HoldingsDiff.KEYS)
+    
+    def test_duplicate_ticker_keeps_last(self, analyzer, previous_holdings):
+        """测试同一 ticker 出现多次时使用最后一行"""
+        current = pd.concat([previous_holdings, previous_holdings.iloc[[0]].assign(weight=20.0)])
+        
+        result = self.compare(analyzer, previous_holdings, current)
+        
+        assert [h.ticker for h in result['significant_increased']] == ['TSLA']
+        assert result['unchanged'] == 4
+
+    def test_compact_records(self, analyzer, previous_holdings, current_holdings):
+        """测试变化记录使用 __slots__，属性访问、to_dict 和 pickle 保持不变"""
+        result = self.compare(analyzer, previous_holdings, current_holdings)
+        tsla = result['increased'][0]
+
+        assert not hasattr(tsla, '__dict__')
+        assert list(tsla.to_dict()) == [
+            'ticker', 'company', 'prev_shares', 'curr_shares',
+            'prev_weight', 'curr_weight', 'change_type', 'weight_change'
+        ]
+        assert pickle.loads(pickle.dumps(tsla)).to_dict() == tsla.to_dict()
+
+
+# ==================== 测试多周期对比 ====================
+
+class TestCompareHorizons:
+    """测试在对齐的持仓历史上计算多个周期"""
+    
+    @pytest.fixture
+    def history(self, previous_holdings, current_holdings):
+        """四天历史：第一天与前一日相同，最后一天为当前持仓"""
+        older = previous_holdings.assign(weight=previous_holdings['weight'] - 1.0)
+        return HoldingsHistory.from_frames('ARKK', {
+            '2025-01-10': older,
+            '2025-01-13': previous_holdings,
+            '2025-01-14': previous_holdings,
+            '2025-01-15': current_holdings,
+        })
+    
+    def test_one_day_matches_compare_holdings(self, analyzer, history, previous_holdings, current_holdings):
+        """测试 1 个交易日的结果与 compare_holdings 一致"""
+        expected = analyzer.compare_holdings(current_holdings, previous_holdings, '2025-01-14', '2025-01-15')
+        
+        result = analyzer.compare_horizons(history, [1])['1d']
+        
+        assert result['prev_date'] == '2025-01-14'
+        for key in HoldingsDiff.LIST_VIEWS:
+            assert [h.to_dict() for h in result[key]] == [h.to_dict() for h in expected[key]]
+        assert result['unchanged'] == expected['unchanged']
+    
+    def test_horizons_use_earlier_rows(self, analyzer, history):
+        """测试各周期与 N 个交易日之前对比，历史不足的周期被跳过"""
+        results = analyzer.compare_horizons(history, [1, 3, 20])
+        
+        assert list(results) == ['1d', '3d']
+        assert results['3d']['prev_date'] == '2025-01-10'
+        
+        # 3 个交易日前 TSLA 权重为 9.50%
+        tsla = next(h for h in results['3d']['increased'] if h.ticker == 'TSLA')
+        assert tsla.weight_change == pytest.approx(2.30)
+    
+    def test_insufficient_history(self, analyzer, current_holdings):
+        """测试只有一天数据时不对比"""
+        history = HoldingsHistory.from_frames('ARKK', {'2025-01-15': current_holdings})
+        
+        assert analyzer.compare_horizons(history, [1, 5]) == {}
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,139 @@
+"""
+测试 HTTP 录制/回放模块
+
+测试 src/cassette.py 中的 Cassette 及录制/回放适配器
+"""
+
+import gzip
+import json
+import threading
+import pytest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.cassette import Cassette, HttpExchange, redact_url
+from src.http_client import create_http_session
+from src.utils import HttpConfig
+
+
+# ==================== Fixtures ====================
+
+class Handler(BaseHTTPRequestHandler):
+    """本地测试服务器：GET 返回计数 JSON，POST 返回企业微信格式响应"""
+
+    counter = 0
+
+    def do_GET(self):
+        Handler.counter += 1
+        self._reply({'date': '2025-01-15', 'count': Handler.counter})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self._reply({'errcode': 0, 'errmsg': 'ok'})
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """本地 HTTP 服务器"""
+    Handler.counter = 0
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def record_run(server, path) -> Cassette:
+    """录制一次包含下载和推送的运行"""
+    cassette = Cassette(str(path), mode='record')
+    session = create_http_session(HttpConfig(), cassette=cassette)
+
+    session.get(f"{server}/holdings?symbol=ARKK")
+    session.get(f"{server}/holdings?symbol=ARKK")
+    session.post(f"{server}/webhook/send?key=secret-key", json={'msgtype': 'text'})
+
+    cassette.save()
+    return cassette
+
+
+# ==================== 测试录制和回放 ====================
+
+class TestCassette:
+    """测试录制和回放"""
+
+    def test_replay_without_network(self, server, tmp_path):
+        """测试回放返回录制的响应，不访问网络"""
+        path = tmp_path / "run.cassette.gz"
+        record_run(server, path)
+
+        cassette = Cassette(str(path), mode='replay', latency=0)
+        session = create_http_session(HttpConfig(), cassette=cassette)
+
+        first = session.get(f"{server}/holdings?symbol=ARKK")
+        second = session.get(f"{server}/holdings?symbol=ARKK")
+        webhook = session.post(f"{server}/webhook/send?key=secret-key", json={'msgtype': 'text'})
+
+        assert first.json()['count'] == 1
+        assert second.json()['count'] == 2
+        assert webhook.json()['errcode'] == 0
+        assert Handler.counter == 2  # 回放时服务器没有收到新请求
+
+    def test_exhausted_repeats_last(self, server, tmp_path):
+        """测试同一请求的录制用完后重复返回最后一次"""
+        path = tmp_path / "run.cassette.gz"
+        record_run(server, path)
+
+        cassette = Cassette(str(path), mode='replay', latency=0)
+        session = create_http_session(HttpConfig(), cassette=cassette)
+
+        counts = [session.get(f"{server}/holdings?symbol=ARKK").json()['count'] for _ in range(3)]
+
+        assert counts == [1, 2, 2]
+
+    def test_unrecorded_request(self, server, tmp_path):
+        """测试磁带中没有的请求抛出连接错误"""
+        path = tmp_path / "run.cassette.gz"
+        record_run(server, path)
+
+        session = create_http_session(HttpConfig(), cassette=Cassette(str(path), mode='replay'))
+
+        with pytest.raises(requests.ConnectionError):
+            session.get(f"{server}/holdings?symbol=ARKW")
+
+    def test_webhook_key_redacted(self, server, tmp_path):
+        """测试磁带中不保存 Webhook 密钥"""
+        path = tmp_path / "run.cassette.gz"
+        record_run(server, path)
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            content = f.read()
+
+        assert 'secret-key' not in content
+        assert redact_url('https://x/send?key=abc&debug=1') == 'https://x/send?key=***&debug=1'
+
+    def test_latency(self, tmp_path):
+        """测试回放延迟：默认使用录制耗时，可指定固定延迟"""
+        exchange = HttpExchange('GET', 'https://x/', 200, 'OK', {}, b'{}', elapsed=1.5)
+        path = tmp_path / "empty.cassette.gz"
+        Cassette(str(path), mode='record').save()
+
+        assert Cassette(str(path), mode='replay').delay_for(exchange) == 1.5
+        assert Cassette(str(path), mode='replay', latency=0.05).delay_for(exchange) == 0.05
+
+    def test_binary_body_roundtrip(self):
+        """测试非 UTF-8 响应体的序列化"""
+        exchange = HttpExchange('GET', 'https://x/', 200, 'OK', {}, b'\x89PNG\xff', elapsed=0.1)
+
+        assert HttpExchange.from_json(exchange.to_json()).body == b'\x89PNG\xff'
@@ -11,7 +11,7 @@ import tempfile
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 from src.fetcher import DataFetcher
-from src.utils import load_config, Config, DataConfig, RetryConfig
+from src.utils import load_config, Config, DataConfig, RetryConfig, StorageConfig, HttpConfig, SourceConfig
 
 
 # ==================== Fixtures ====================
@@ -22,9 +22,10 @@ def mock_config():
     config = MagicMock(spec=Config)
     config.data = MagicMock(spec=DataConfig)
     config.data.data_dir = "./test_data"
-    config.retry = MagicMock(spec=RetryConfig)
-    config.retry.max_retries = 3
-    config.retry.retry_delays = [1, 2, 4]
+    config.retry = RetryConfig(max_retries=3, retry_delays=[1, 2, 4])
+    config.storage = StorageConfig()
+    config.http = HttpConfig()
+    config.source = SourceConfig()
     return config
 
 
@@ -214,6 +215,32 @@ class TestDataPersistence:
         with pytest.raises(FileNotFoundError):
             fetcher.load_from_csv('ARKK', '2025-01-15')
 
+    
+    def test_cleanup_stores_agree(self, mock_config, sample_df, tmp_path):
+        """测试清理后 CSV、清单和存储后端保留相同的日期（截止日当天删除）"""
+        from datetime import datetime, timedelta
+        from src.manifest import HoldingsManifest
+        
+        mock_config.data.data_dir = str(tmp_path)
+        mock_config.storage = StorageConfig(backend="sqlite")
+        fetcher = DataFetcher(mock_config)
+        
+        cutoff = datetime.now() - timedelta(days=30)
+        dates = [(cutoff + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in (-1, 0, 1)]
+        for date in dates:
+            fetcher.save_to_csv(sample_df.assign(date=date), 'ARKK', date)
+        
+        # 清单之外的过期文件同样删除
+        untracked = (cutoff - timedelta(days=5)).strftime('%Y-%m-%d')
+        sample_df.assign(date=untracked).to_csv(tmp_path / "holdings" / "ARKK" / f"{untracked}.csv", index=False)
+        
+        stats = fetcher.cleanup_old_data(retention_days=30)
+        
+        assert stats['ARKK']['deleted_files'] == [untracked] + dates[:2]
+        csv_dates = sorted(p.stem for p in (tmp_path / "holdings" / "ARKK").glob("*.csv"))
+        assert csv_dates == dates[2:]
+        assert HoldingsManifest(str(tmp_path), 'ARKK').dates() == dates[2:]
+        assert fetcher.store.list_dates('ARKK') == dates[2:]
 
 # ==================== 测试 CSV 转换和清洗 ====================
 
@@ -283,6 +310,190 @@ class TestCSVTransformation:
         assert len(df) == 3
 
 
+# ==================== 测试 JSON 转换 ====================
+
+class TestJSONTransformation:
+    """测试 ARKFunds.io JSON 转换"""
+    
+    def test_typed_columns(self, fetcher):
+        """测试数值列为 float64，ticker/company 为 category"""
+        json_data = {
+            'date': '2025-01-15',
+            'holdings': [
+                {'company': 'Tesla Inc', 'ticker': 'TSLA', 'cusip': '88160R101',
+                 'shares': 1200000, 'market_value': 300000000.0, 'weight': 11.8},
+                {'company': 'Coinbase Global Inc', 'ticker': 'COIN', 'cusip': '19260Q107',
+                 'shares': 450000, 'market_value': 90000000.0, 'weight': 3.5},
+            ]
+        }
+        
+        df = fetcher.client.transform_json(json_data, 'ARKK', '2025-01-15')
+        
+        assert df.columns.tolist() == [
+            'date', 'etf_symbol', 'company', 'ticker',
+            'cusip', 'shares', 'market_value', 'weight'
+        ]
+        for col in ['shares', 'market_value', 'weight']:
+            assert df[col].dtype == 'float64'
+        assert isinstance(df['ticker'].dtype, pd.CategoricalDtype)
+        assert isinstance(df['company'].dtype, pd.CategoricalDtype)
+        assert df['ticker'].tolist() == ['TSLA', 'COIN']
+        assert (df['etf_symbol'] == 'ARKK').all()
+    
+    def test_null_ticker_and_invalid_shares(self, fetcher):
+        """测试 ticker 为空填充 N/A，shares 无法解析的行被删除"""
+        json_data = {
+            'date': '2025-01-15',
+            'holdings': [
+                {'company': 'Money Market', 'ticker': None,
+                 'shares': '1000', 'market_value': 1000.0, 'weight': 0.1},
+                {'company': 'Bad Row', 'ticker': 'BAD',
+                 'shares': 'n/a', 'market_value': None, 'weight': None},
+                {'company': 'Tesla Inc', 'ticker': 'TSLA',
+                 'shares': 1200000, 'market_value': 300000000.0, 'weight': 11.8},
+            ]
+        }
+        
+        df = fetcher.client.transform_json(json_data, 'ARKK', '2025-01-15')
+        
+        assert df['ticker'].tolist() == ['N/A', 'TSLA']
+        assert df['shares'].tolist() == [1000.0, 1200000.0]
+        assert df['cusip'].isna().all()
+    
+    def test_missing_required_field(self, fetcher):
+        """测试缺少必需字段时报错"""
+        json_data = {'holdings': [{'company': 'Tesla Inc', 'ticker': 'TSLA'}]}
+        
+        with pytest.raises(ValueError, match="缺少必需字段"):
+            fetcher.client.transform_json(json_data, 'ARKK', '2025-01-15')
+
+
+# ==================== 测试对比日数据 ====================
+
+class TestComparisonHoldings:
+    """测试从本地历史加载对比日数据"""
+    
+    def test_uses_latest_local_date_before_target(self, fetcher, sample_df, tmp_path):
+        """测试选择早于目标日期的最近一个本地交易日（跨周末）"""
+        fetcher.config.data.data_dir = str(tmp_path)
+        for date in ['2025-01-09', '2025-01-10', '2025-01-13']:
+            fetcher.save_to_csv(sample_df.assign(date=date), 'ARKK', date)
+        
+        prev_date, df = fetcher.load_comparison_holdings('ARKK', '2025-01-13')
+        
+        assert prev_date == '2025-01-10'
+        assert len(df) == len(sample_df)
+    
+    def test_no_local_history(self, fetcher, tmp_path):
+        """测试本地没有历史数据时返回 None"""
+        fetcher.config.data.data_dir = str(tmp_path)
+        
+        assert fetcher.load_comparison_holdings('ARKK', '2025-01-13') == (None, None)
+
+
+# ==================== 测试并发获取 ====================
+
+class TestConcurrentFetch:
+    """测试多只 ETF 并发下载"""
+    
+    def test_fetch_many_runs_concurrently(self, fetcher, sample_df):
+        """测试所有请求同时发出，总耗时接近单个请求"""
+        import time
+        
+        def slow_fetch(etf_symbol, date):
+            time.sleep(0.2)
+            return sample_df.assign(etf_symbol=etf_symbol, date=date)
+        
+        with patch.object(fetcher, 'fetch_holdings', side_effect=slow_fetch):
+            start = time.time()
+            results = list(fetcher.fetch_many(
+                ['ARKK', 'ARKW', 'ARKG'], ['2025-01-15', '2025-01-14'], max_workers=6
+            ))
+            elapsed = time.time() - start
+        
+        assert elapsed < 0.5
+        assert sorted(etf for etf, _, _ in results) == ['ARKG', 'ARKK', 'ARKW']
+        for etf, frames, error in results:
+            assert error is None
+            assert set(frames) == {'2025-01-15', '2025-01-14'}
+            assert (frames['2025-01-15']['etf_symbol'] == etf).all()
+    
+    def test_fetch_many_reports_errors(self, fetcher, sample_df):
+        """测试单只 ETF 失败不影响其他 ETF"""
+        def flaky_fetch(etf_symbol, date):
+            if etf_symbol == 'ARKW':
+                raise ValueError("API 返回数据格式错误")
+            return sample_df
+        
+        with patch.object(fetcher, 'fetch_holdings', side_effect=flaky_fetch):
+            results = {etf: (frames, error) for etf, frames, error in
+                       fetcher.fetch_many(['ARKK', 'ARKW'], ['2025-01-15'], max_workers=2)}
+        
+        assert results['ARKK'][1] is None
+        assert isinstance(results['ARKW'][1], ValueError)
+
+
+# ==================== 测试历史数据回填 ====================
+
+class TestHistoricalBackfill:
+    """测试 GitHub 历史数据回填"""
+    
+    @patch('src.fetcher.requests.get')
+    def test_backfill_splits_by_date(self, mock_get, fetcher, sample_csv_content, tmp_path):
+        """测试按日期拆分保存，并同步清单"""
+        fetcher.config.data.data_dir = str(tmp_path)
+        
+        mock_response = Mock()
+        mock_response.text = sample_csv_content
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+        
+        assert fetcher.download_historical_data('ARKK', days=90) == 2
+        
+        df_14 = pd.read_csv(tmp_path / "holdings" / "ARKK" / "2025-01-14.csv")
+        df_15 = pd.read_csv(tmp_path / "holdings" / "ARKK" / "2025-01-15.csv")
+        assert df_14['ticker'].tolist() == ['TSLA', 'COIN']
+        assert df_15['ticker'].tolist() == ['TSLA', 'COIN', 'SQ']
+        assert list(df_15.columns) == [
+            'date', 'etf_symbol', 'company', 'ticker',
+            'cusip', 'shares', 'market_value', 'weight'
+        ]
+        
+        from src.manifest import HoldingsManifest
+        assert HoldingsManifest(str(tmp_path), 'ARKK').dates() == ['2025-01-14', '2025-01-15']
+        
+        # 再次回填不覆盖已有文件
+        assert fetcher.download_historical_data('ARKK', days=90) == 0
+    
+    @patch('src.fetcher.requests.get')
+    def test_backfill_respects_days(self, mock_get, fetcher, sample_csv_content, tmp_path):
+        """测试只保存最近 N 天"""
+        fetcher.config.data.data_dir = str(tmp_path)
+        
+        mock_response = Mock()
+        mock_response.text = sample_csv_content
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+        
+        assert fetcher.download_historical_data('ARKK', days=0) == 1
+        assert not (tmp_path / "holdings" / "ARKK" / "2025-01-14.csv").exists()
+
+    @patch('src.fetcher.requests.get')
+    def test_backfill_drops_bad_dates(self, mock_get, fetcher, sample_csv_content, tmp_path):
+        """测试无法解析的日期行被丢弃"""
+        fetcher.config.data.data_dir = str(tmp_path)
+
+        mock_response = Mock()
+        mock_response.text = sample_csv_content + "not-a-date,ARKK,Tesla Inc,TSLA,88160R101,1,1.00,1.00\n"
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+
+        assert fetcher.download_historical_data('ARKK', days=90) == 2
+        assert sorted(p.name for p in (tmp_path / "holdings" / "ARKK").glob("*.csv")) == [
+            '2025-01-14.csv', '2025-01-15.csv'
+        ]
+
+
 # ==================== 集成测试 ====================
 
 class TestDataFetcherIntegration:
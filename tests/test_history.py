@@ -0,0 +1,135 @@
+"""
+测试持仓历史模块
+
+测试 src/history.py 中的 HoldingsHistory 类
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.history import HoldingsHistory
+from src.repository import HoldingsRepository
+
+
+# ==================== Fixtures ====================
+
+def make_day(date: str, holdings: dict) -> pd.DataFrame:
+    """构造一天的持仓 {ticker: (shares, weight)}"""
+    return pd.DataFrame({
+        'date': date,
+        'etf_symbol': 'ARKK',
+        'company': [f"{ticker} Inc" for ticker in holdings],
+        'ticker': list(holdings),
+        'cusip': '',
+        'shares': [shares for shares, _ in holdings.values()],
+        'market_value': [shares * 10.0 for shares, _ in holdings.values()],
+        'weight': [weight for _, weight in holdings.values()]
+    })
+
+
+@pytest.fixture
+def frames():
+    """三天的持仓：COIN 第二天清仓，PATH 第三天新增"""
+    return {
+        '2025-01-13': make_day('2025-01-13', {'TSLA': (100, 10.0), 'COIN': (50, 5.0)}),
+        '2025-01-14': make_day('2025-01-14', {'TSLA': (120, 12.0)}),
+        '2025-01-15': make_day('2025-01-15', {'TSLA': (130, 11.0), 'PATH': (80, 4.0)}),
+    }
+
+
+# ==================== 测试对齐 ====================
+
+class TestFromFrames:
+    """测试多天持仓对齐"""
+
+    def test_aligned_panel(self, frames):
+        """测试日期 × 股票对齐，未持有为 NaN"""
+        history = HoldingsHistory.from_frames('ARKK', frames)
+
+        assert history.dates == ['2025-01-13', '2025-01-14', '2025-01-15']
+        assert history.tickers.tolist() == ['TSLA', 'COIN', 'PATH']
+        assert history.held.tolist() == [
+            [True, True, False],
+            [True, False, False],
+            [True, False, True],
+        ]
+        assert np.isnan(history.values['shares'][1, 1])
+        assert history.values['weight'][2, 0] == 11.0
+
+    def test_duplicate_ticker_keeps_first(self, frames):
+        """测试同一天同一 ticker 多行时保留第一行（如多条 N/A 现金行）"""
+        cash = pd.DataFrame({
+            'date': '2025-01-15', 'etf_symbol': 'ARKK',
+            'company': ['CASH', 'GOLDMAN FS TRSY OBLIG INST 468'], 'ticker': ['N/A', 'N/A'],
+            'cusip': '', 'shares': [5.0, 7.0], 'market_value': [5.0, 7.0], 'weight': [0.1, 0.2]
+        })
+        frames['2025-01-15'] = pd.concat([frames['2025-01-15'], cash], ignore_index=True)
+
+        history = HoldingsHistory.from_frames('ARKK', frames)
+
+        cash_col = history.tickers.tolist().index('N/A')
+        assert history.values['shares'][2, cash_col] == 5.0
+        assert history.values['weight'][2, cash_col] == 0.1
+        assert history.companies[cash_col] == 'CASH'
+
+    def test_empty(self):
+        """测试没有数据"""
+        history = HoldingsHistory.from_frames('ARKK', {})
+
+        assert len(history) == 0
+        assert history.series('shares', ['TSLA']).shape == (0, 1)
+
+
+# ==================== 测试切片 ====================
+
+class TestSlices:
+    """测试图表使用的切片"""
+
+    def test_series(self, frames):
+        """测试时间序列：未持有记为 0，未知股票整列为 0"""
+        history = HoldingsHistory.from_frames('ARKK', frames)
+
+        series = history.series('shares', ['COIN', 'MSFT'], ['2025-01-13', '2025-01-14'])
+
+        assert series.tolist() == [[50, 0], [0, 0]]
+
+    def test_totals(self, frames):
+        """测试每日合计"""
+        history = HoldingsHistory.from_frames('ARKK', frames)
+
+        assert history.totals('market_value').tolist() == [1500.0, 1200.0, 2100.0]
+        assert history.covers(['2025-01-14'])
+        assert not history.covers(['2025-01-16'])
+
+
+# ==================== 测试读取 ====================
+
+class TestLoad:
+    """测试经由持仓仓库读取"""
+
+    def test_load_window(self, frames, tmp_path):
+        """测试只读取截至结束日期的最近 N 天"""
+        etf_dir = tmp_path / "holdings" / "ARKK"
+        etf_dir.mkdir(parents=True)
+        for date, df in frames.items():
+            df.to_csv(etf_dir / f"{date}.csv", index=False)
+
+        repository = HoldingsRepository(str(tmp_path))
+        history = HoldingsHistory.load(repository, 'ARKK', '2025-01-14', days=5)
+
+        assert history.dates == ['2025-01-13', '2025-01-14']
+        assert history.tickers.tolist() == ['TSLA', 'COIN']
+
+    def test_for_dates(self, frames, tmp_path):
+        """测试按给定日期一次批量读取，缺失的日期被跳过"""
+        etf_dir = tmp_path / "holdings" / "ARKK"
+        etf_dir.mkdir(parents=True)
+        for date, df in frames.items():
+            df.to_csv(etf_dir / f"{date}.csv", index=False)
+
+        repository = HoldingsRepository(str(tmp_path))
+        history = HoldingsHistory.for_dates(repository, 'ARKK', ['2025-01-13', '2025-01-15', '2025-01-16'])
+
+        assert history.dates == ['2025-01-13', '2025-01-15']
+        assert history.series('shares', ['PATH']).tolist() == [[0], [80]]
@@ -0,0 +1,120 @@
+"""
+测试 HTTP 响应缓存模块
+
+测试 src/http_cache.py 中的 ResponseCache 类及其在 DataFetcher 中的使用
+"""
+
+import json
+import pytest
+from unittest.mock import Mock, MagicMock, patch
+
+from src.fetcher import DataFetcher
+from src.http_cache import ResponseCache
+from src.utils import Config, DataConfig, RetryConfig, StorageConfig, HttpConfig, SourceConfig
+
+
+# ==================== Fixtures ====================
+
+API_PAYLOAD = {
+    'symbol': 'ARKK',
+    'date': '2025-01-15',
+    'holdings': [
+        {'company': 'Tesla Inc', 'ticker': 'TSLA', 'cusip': '88160R101',
+         'shares': 1200000, 'market_value': 300000000.0, 'weight': 11.8},
+        {'company': 'Coinbase Global Inc', 'ticker': 'COIN', 'cusip': '19260Q107',
+         'shares': 450000, 'market_value': 90000000.0, 'weight': 3.5},
+    ]
+}
+
+
+def make_response(payload=None, status_code=200, headers=None):
+    """构造模拟响应"""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.raise_for_status = Mock()
+    if payload is not None:
+        response.content = json.dumps(payload).encode('utf-8')
+        response.json.return_value = payload
+    return response
+
+
+@pytest.fixture
+def session():
+    """模拟 HTTP Session"""
+    return Mock()
+
+
+@pytest.fixture
+def fetcher(tmp_path, session):
+    """创建启用响应缓存的 DataFetcher"""
+    config = MagicMock(spec=Config)
+    config.data = MagicMock(spec=DataConfig)
+    config.data.data_dir = str(tmp_path)
+    config.retry = RetryConfig(max_retries=1, retry_delays=[0])
+    config.storage = StorageConfig()
+    config.http = HttpConfig()
+    config.source = SourceConfig()
+    return DataFetcher(config, session=session, response_cache=ResponseCache(str(tmp_path), ttl_seconds=900))
+
+
+# ==================== 测试缓存流程 ====================
+
+class TestResponseCache:
+    """测试响应缓存"""
+
+    def test_fresh_cache_skips_network(self, fetcher, session):
+        """测试有效期内不发请求"""
+        session.get.return_value = make_response(API_PAYLOAD, headers={'ETag': '"v1"'})
+
+        first = fetcher.fetch_holdings('ARKK', '2025-01-15')
+        second = fetcher.fetch_holdings('ARKK', '2025-01-15')
+
+        assert session.get.call_count == 1
+        assert second['ticker'].tolist() == first['ticker'].tolist()
+
+    def test_expired_cache_sends_conditional_request(self, fetcher, session):
+        """测试过期后发送条件请求，304 时复用转换结果"""
+        session.get.return_value = make_response(
+            API_PAYLOAD, headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 15 Jan 2025 20:00:00 GMT'}
+        )
+        fetcher.fetch_holdings('ARKK', '2025-01-15')
+
+        fetcher.response_cache.ttl_seconds = 0
+        session.get.return_value = make_response(status_code=304)
+
+        with patch.object(fetcher.client, 'transform_json', wraps=fetcher.client.transform_json) as mock_transform:
+            df = fetcher.fetch_holdings('ARKK', '2025-01-15')
+            mock_transform.assert_not_called()
+
+        headers = session.get.call_args[1]['headers']
+        assert headers['If-None-Match'] == '"v1"'
+        assert headers['If-Modified-Since'] == 'Wed, 15 Jan 2025 20:00:00 GMT'
+        assert len(df) == 2
+
+    def test_unchanged_payload_skips_transform(self, fetcher, session):
+        """测试服务器不支持条件请求但内容未变时跳过转换"""
+        session.get.return_value = make_response(API_PAYLOAD)
+        fetcher.fetch_holdings('ARKK', '2025-01-15')
+
+        fetcher.response_cache.ttl_seconds = 0
+        session.get.return_value = make_response(API_PAYLOAD)
+
+        with patch.object(fetcher.client, 'transform_json', wraps=fetcher.client.transform_json) as mock_transform:
+            fetcher.fetch_holdings('ARKK', '2025-01-15')
+            mock_transform.assert_not_called()
+
+    def test_changed_payload_retransformed(self, fetcher, session):
+        """测试内容变化后重新转换"""
+        session.get.return_value = make_response(API_PAYLOAD)
+        fetcher.fetch_holdings('ARKK', '2025-01-15')
+
+        fetcher.response_cache.ttl_seconds = 0
+        changed = dict(API_PAYLOAD, date='2025-01-16', holdings=API_PAYLOAD['holdings'][:1])
+        session.get.return_value = make_response(changed)
+
+        df = fetcher.fetch_holdings('ARKK', '2025-01-16')
+
+        assert df['ticker'].tolist() == ['TSLA']
+        assert df['date'].iloc[0] == '2025-01-16'
+        assert fetcher.response_cache.get(session.get.call_args[0][0]).data_date == '2025-01-16'
@@ -0,0 +1,29 @@
+"""
+测试 HTTP 客户端模块
+
+测试 src/http_client.py 中的 Session 创建
+"""
+
+from src.http_client import create_http_session, get_timeout
+from src.utils import HttpConfig
+
+
+class TestHttpSession:
+    """测试连接池 Session"""
+
+    def test_pool_adapter_mounted(self):
+        """测试 http/https 均挂载指定大小的连接池"""
+        config = HttpConfig(pool_connections=2, pool_maxsize=6)
+        session = create_http_session(config)
+
+        for prefix in ('http://', 'https://'):
+            adapter = session.get_adapter(prefix + 'arkfunds.io')
+            assert adapter._pool_connections == 2
+            assert adapter._pool_maxsize == 6
+            assert adapter.max_retries.total == 0
+
+        session.close()
+
+    def test_timeout_tuple(self):
+        """测试超时为 (连接, 读取)"""
+        assert get_timeout(HttpConfig(connect_timeout=3, read_timeout=20)) == (3, 20)
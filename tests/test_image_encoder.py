@@ -0,0 +1,101 @@
+"""
+测试图片上传编码模块
+
+测试 src/image_encoder.py 中的 encode_for_upload
+"""
+
+import io
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.image_encoder import ImageTooLargeError, encode_for_upload
+
+
+# ==================== Fixtures ====================
+
+def save_png(path, array: np.ndarray) -> None:
+    """保存 RGB 数组为 PNG"""
+    Image.fromarray(array.astype(np.uint8), 'RGB').save(path, 'PNG')
+
+
+@pytest.fixture
+def chart(tmp_path):
+    """类似图表的图片：白底、少量颜色的色块和细线"""
+    array = np.full((600, 400, 3), 255)
+    array[50:250, 40:360] = [46, 134, 171]
+    array[300:500, 40:360] = [162, 59, 114]
+    array[::20, :] = [200, 200, 200]
+    path = tmp_path / "2025-01-15_comprehensive.png"
+    save_png(path, array)
+    return path
+
+
+@pytest.fixture
+def noise(tmp_path):
+    """随机噪声（无法无损压缩）"""
+    array = np.random.default_rng(0).integers(0, 256, (400, 400, 3))
+    path = tmp_path / "noise.png"
+    save_png(path, array)
+    return path
+
+
+# ==================== 测试编码 ====================
+
+class TestEncode:
+    """测试按字节预算选择编码方式"""
+
+    def test_original_within_budget(self, chart):
+        """测试原图在预算内时直接使用原图，不做量化"""
+        encoded = encode_for_upload(str(chart), max_bytes=10 * 1024 * 1024)
+
+        assert encoded.settings == {'strategy': 'original'}
+        assert encoded.path == str(chart)
+        assert encoded.size == chart.stat().st_size
+
+    def test_palette_when_over_budget(self, chart):
+        """测试原图超限时先尝试调色板 PNG"""
+        encoded = encode_for_upload(str(chart), max_bytes=chart.stat().st_size - 1)
+
+        assert encoded.settings == {'strategy': 'png-palette', 'colors': 256}
+        assert encoded.path.endswith('.upload.png')
+
+    def test_jpeg_fallback(self, noise):
+        """测试 PNG 超限时改用 JPEG，并在预算内"""
+        budget = noise.stat().st_size // 4
+        encoded = encode_for_upload(str(noise), max_bytes=budget)
+
+        assert encoded.format == 'JPEG'
+        assert encoded.path.endswith('noise.upload.jpg')
+        assert encoded.size <= budget
+        assert Image.open(io.BytesIO(encoded.read())).format == 'JPEG'
+
+    def test_too_large(self, noise):
+        """测试所有编码方式都超限时抛出异常"""
+        with pytest.raises(ImageTooLargeError):
+            encode_for_upload(str(noise), max_bytes=100)
+
+
+# ==================== 测试复用 ====================
+
+class TestReuse:
+    """测试编码记录的复用"""
+
+    def test_reuse_until_source_changes(self, noise, tmp_path):
+        """测试原图不变时复用记录，原图变化时重新编码"""
+        budget = noise.stat().st_size // 4
+        first = encode_for_upload(str(noise), max_bytes=budget)
+
+        sidecar = tmp_path / "noise.upload.json"
+        record = json.loads(sidecar.read_text(encoding='utf-8'))
+        assert record['md5'] == first.md5
+        assert record['settings'] == first.settings
+
+        assert encode_for_upload(str(noise), max_bytes=budget) == first
+
+        save_png(noise, np.full((400, 400, 3), 255))
+        second = encode_for_upload(str(noise), max_bytes=budget)
+        assert second.source_md5 != first.source_md5
+        assert second.format == 'PNG'
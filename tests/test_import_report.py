@@ -0,0 +1,54 @@
+"""
+测试导入耗时报告模块
+
+测试 src/import_report.py 中的 parse_importtime 和 measure_imports
+"""
+
+import pytest
+
+from main import MODE_IMPORTS
+from src.import_report import ImportReport, measure_imports, parse_importtime
+
+
+# ==================== 测试解析 ====================
+
+class TestParse:
+    """测试 -X importtime 输出解析"""
+
+    def test_nested_modules(self):
+        """测试区分顶层导入和嵌套导入"""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _json\n"
+            "import time:       300 |        420 | json\n"
+            "import time:      1000 |       1000 |     numpy.core\n"
+            "import time:      2000 |       3000 |   numpy\n"
+            "import time:       500 |       3500 | pandas\n"
+        )
+
+        report = parse_importtime(output, ImportReport(modules=['json', 'pandas']))
+
+        assert report.top_level == {'json': 0.42, 'pandas': 3.5}
+        assert report.total_ms == pytest.approx(3.92)
+        assert report.top(1) == [('pandas', 3.5)]
+        assert 'numpy.core' in report
+
+
+# ==================== 测试测量 ====================
+
+class TestMeasure:
+    """测试在子进程中测量"""
+
+    def test_probe_modes_skip_heavy_imports(self):
+        """测试健康检查和定时探测模式不导入 pandas / matplotlib"""
+        for mode in ['test-webhook', 'check-missed']:
+            report = measure_imports(['main'] + MODE_IMPORTS[mode])
+
+            assert 'main' in report
+            assert 'pandas' not in report
+            assert 'matplotlib' not in report
+
+    def test_import_error(self):
+        """测试模块不存在时抛出异常"""
+        with pytest.raises(RuntimeError):
+            measure_imports(['no_such_module_xyz'])
@@ -17,7 +17,7 @@ from src.analyzer import Analyzer, ChangeAnalysis
 from src.reporter import ReportGenerator
 from src.notifier import WeChatNotifier
 from src.scheduler import Scheduler
-from src.utils import Config, ScheduleConfig, DataConfig, AnalysisConfig, NotificationConfig, RetryConfig, LogConfig
+from src.utils import Config, ScheduleConfig, DataConfig, AnalysisConfig, NotificationConfig, RetryConfig, LogConfig, StorageConfig, HttpConfig, SourceConfig
 
 
 # ==================== Fixtures ====================
@@ -43,14 +43,16 @@ def mock_config(tmp_path):
     config.notification.webhook_url = "https://test.webhook.com"
     config.notification.enable_error_alert = True
     
-    config.retry = MagicMock(spec=RetryConfig)
-    config.retry.max_retries = 3
-    config.retry.retry_delays = [1, 2, 4]
+    config.retry = RetryConfig(max_retries=3, retry_delays=[1, 2, 4])
     
     config.log = MagicMock(spec=LogConfig)
     config.log.retention_days = 30
     config.log.level = "INFO"
     
+    config.storage = StorageConfig()
+    config.http = HttpConfig()
+    config.source = SourceConfig()
+    
     return config
 
 
@@ -0,0 +1,121 @@
+"""
+测试持仓数据清单模块
+
+测试 src/manifest.py 中的 HoldingsManifest 类
+"""
+
+import json
+import pandas as pd
+import pytest
+
+from src.manifest import HoldingsManifest
+
+
+# ==================== Fixtures ====================
+
+def write_csv(data_dir, etf_symbol: str, date: str, market_value: float = 100.0) -> pd.DataFrame:
+    """写入一天的持仓 CSV"""
+    etf_dir = data_dir / "holdings" / etf_symbol
+    etf_dir.mkdir(parents=True, exist_ok=True)
+    df = pd.DataFrame({
+        'date': [date, date],
+        'ticker': ['TSLA', 'COIN'],
+        'shares': [1000.0, 500.0],
+        'market_value': [market_value, market_value],
+        'weight': [50.0, 50.0]
+    })
+    df.to_csv(etf_dir / f"{date}.csv", index=False)
+    return df
+
+
+# ==================== 测试记录与查询 ====================
+
+class TestManifestRecord:
+    """测试清单登记"""
+
+    def test_record_and_reload(self, tmp_path):
+        """测试登记后重新打开仍然存在"""
+        df = write_csv(tmp_path, 'ARKK', '2025-01-15', market_value=250.0)
+
+        manifest = HoldingsManifest(str(tmp_path), 'ARKK')
+        manifest.remove(['2025-01-15'])
+        entry = manifest.record('2025-01-15', df)
+
+        assert entry.rows == 2
+        assert entry.total_market_value == 500.0
+        assert entry.size == (tmp_path / "holdings" / "ARKK" / "2025-01-15.csv").stat().st_size
+
+        reopened = HoldingsManifest(str(tmp_path), 'ARKK')
+        assert reopened.get('2025-01-15') == entry
+
+    def test_auto_rebuild_when_missing(self, tmp_path):
+        """测试清单不存在时根据现有文件重建"""
+        write_csv(tmp_path, 'ARKK', '2025-01-15')
+        write_csv(tmp_path, 'ARKK', '2025-01-14')
+
+        manifest = HoldingsManifest(str(tmp_path), 'ARKK')
+
+        assert manifest.dates() == ['2025-01-14', '2025-01-15']
+        assert manifest.latest_date() == '2025-01-15'
+        assert manifest.latest_date(before='2025-01-15') == '2025-01-14'
+        assert manifest.latest_date(before='2025-01-14') is None
+        assert (tmp_path / "holdings" / "ARKK" / "manifest.json").exists()
+
+    def test_empty_etf(self, tmp_path):
+        """测试没有任何数据时为空清单且不创建文件"""
+        manifest = HoldingsManifest(str(tmp_path), 'ARKK')
+
+        assert manifest.dates() == []
+        assert manifest.latest_date() is None
+        assert not (tmp_path / "holdings" / "ARKK").exists()
+
+    def test_missing_weekdays(self, tmp_path):
+        """测试查找缺失工作日（跳过周末）"""
+        write_csv(tmp_path, 'ARKK', '2025-01-10')  # 周五
+        write_csv(tmp_path, 'ARKK', '2025-01-14')  # 周二
+
+        manifest = HoldingsManifest(str(tmp_path), 'ARKK')
+
+        assert manifest.missing_weekdays('2025-01-10', '2025-01-14') == ['2025-01-13']
+
+
+class TestManifestMaintenance:
+    """测试清单维护"""
+
+    def test_remove(self, tmp_path):
+        """测试移除日期"""
+        write_csv(tmp_path, 'ARKK', '2025-01-14')
+        write_csv(tmp_path, 'ARKK', '2025-01-15')
+        manifest = HoldingsManifest(str(tmp_path), 'ARKK')
+
+        manifest.remove(['2025-01-14', '2025-01-01'])
+
+        assert HoldingsManifest(str(tmp_path), 'ARKK').dates() == ['2025-01-15']
+
+    def test_verify_and_rebuild(self, tmp_path):
+        """测试检测清单漂移并重建"""
+        write_csv(tmp_path, 'ARKK', '2025-01-14')
+        manifest = HoldingsManifest(str(tmp_path), 'ARKK')
+
+        # 清单之外新增文件、删除已登记文件
+        write_csv(tmp_path, 'ARKK', '2025-01-15')
+        (tmp_path / "holdings" / "ARKK" / "2025-01-14.csv").unlink()
+
+        drift = manifest.verify()
+        assert drift['missing_files'] == ['2025-01-14']
+        assert drift['untracked_files'] == ['2025-01-15']
+
+        assert manifest.rebuild() == 1
+        assert manifest.dates() == ['2025-01-15']
+        assert not any(manifest.verify().values())
+
+    def test_corrupted_manifest_rebuilt(self, tmp_path):
+        """测试清单文件损坏时自动重建"""
+        write_csv(tmp_path, 'ARKK', '2025-01-15')
+        manifest_file = tmp_path / "holdings" / "ARKK" / "manifest.json"
+        manifest_file.write_text("{not json", encoding='utf-8')
+
+        manifest = HoldingsManifest(str(tmp_path), 'ARKK')
+
+        assert manifest.dates() == ['2025-01-15']
+        assert json.loads(manifest_file.read_text(encoding='utf-8'))['etf_symbol'] == 'ARKK'
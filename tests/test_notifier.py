@@ -261,5 +261,25 @@ class TestMessageFormat:
         assert json_data['msgtype'] in ['text', 'markdown']
 
 
+
+# ==================== 测试共享 Session ====================
+
+class TestSharedSession:
+    """测试注入共享 HTTP Session"""
+    
+    def test_injected_session_used(self, webhook_url):
+        """测试注入 Session 后通过 Session 发送（复用连接）"""
+        session = Mock()
+        session.post.return_value.json.return_value = {'errcode': 0, 'errmsg': 'ok'}
+        notifier = WeChatNotifier(webhook_url, max_retries=1, session=session, timeout=(5, 30))
+        
+        with patch('src.notifier.requests.post') as mock_post:
+            assert notifier.send_text("hello") is True
+            mock_post.assert_not_called()
+        
+        session.post.assert_called_once()
+        assert session.post.call_args[1]['timeout'] == (5, 30)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,123 @@
+"""
+测试绘图服务模块
+
+测试 src/render_service.py 中的 RenderService 类
+"""
+
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+
+from src.render_service import RenderService
+from src.summary_analyzer import SummaryAnalyzer
+from src.utils import Config, DataConfig, NotificationConfig
+
+
+# ==================== Fixtures ====================
+
+@pytest.fixture
+def image_gen():
+    """按参数返回图片路径的假图片生成器"""
+    image_gen = MagicMock()
+    image_gen.generate_comprehensive_report_image.side_effect = (
+        lambda etf_symbol, date: f"/images/{etf_symbol}/{date}_comprehensive.png"
+    )
+    return image_gen
+
+
+def make_summary(date: str) -> dict:
+    """构造两只基金的汇总分析结果"""
+    holdings = {
+        etf: pd.DataFrame({
+            'date': date,
+            'etf_symbol': etf,
+            'company': ['Tesla', 'Coinbase'],
+            'ticker': ['TSLA', 'COIN'],
+            'shares': [100.0, 50.0],
+            'market_value': [1000.0, 500.0],
+            'weight': [10.0, 5.0]
+        })
+        for etf in ['ARKK', 'ARKW']
+    }
+    return SummaryAnalyzer().analyze_all_etfs(holdings)
+
+
+# ==================== 测试顺序绘制 ====================
+
+class TestSerial:
+    """测试主进程内顺序绘制"""
+
+    def test_submit_and_result(self, image_gen):
+        """测试提交任务、读取结果，回调只执行一次"""
+        renderer = RenderService('./data', image_gen=image_gen)
+        on_done = MagicMock()
+
+        renderer.submit('ARKK', 'generate_comprehensive_report_image', on_done=on_done,
+                        etf_symbol='ARKK', date='2025-01-15')
+
+        assert 'ARKK' in renderer
+        assert renderer.result('ARKK') == '/images/ARKK/2025-01-15_comprehensive.png'
+        assert renderer.result('ARKK') == '/images/ARKK/2025-01-15_comprehensive.png'
+        on_done.assert_called_once_with('/images/ARKK/2025-01-15_comprehensive.png')
+
+        with pytest.raises(ValueError):
+            renderer.submit('ARKK', 'generate_comprehensive_report_image')
+
+    def test_failure_and_ready(self, image_gen):
+        """测试失败任务在收集时返回异常，缓存命中的图片直接登记"""
+        image_gen.generate_summary_report_image.side_effect = RuntimeError("boom")
+        renderer = RenderService('./data', image_gen=image_gen)
+
+        renderer.ready('ARKK', '/cache/ARKK.png')
+        renderer.submit('SUMMARY', 'generate_summary_report_image', summary_result={}, date='2025-01-15')
+        collected = {name: (path, error) for name, path, error in renderer.as_completed()}
+
+        assert renderer.result('ARKK') == '/cache/ARKK.png'
+        assert collected['SUMMARY'][0] is None
+        assert str(collected['SUMMARY'][1]) == "boom"
+
+    def test_ready_encodes_upload(self, image_gen, tmp_path):
+        """测试缓存命中的图片同样预先编码上传用图片"""
+        from PIL import Image
+
+        path = tmp_path / "ARKK.png"
+        Image.new('RGB', (10, 10), 'white').save(path)
+        renderer = RenderService('./data', image_gen=image_gen, upload_limit=2 * 1024 * 1024)
+
+        renderer.ready('ARKK', str(path))
+
+        assert (tmp_path / "ARKK.upload.json").exists()
+
+    def test_from_config(self, tmp_path):
+        """测试进程数配置（0 为自动，不超过任务数）"""
+        config = MagicMock(spec=Config)
+        config.data = DataConfig(etfs=["ARKK"], data_dir=str(tmp_path), log_dir=str(tmp_path), render_workers=1)
+        config.notification = NotificationConfig(webhook_url="", enable_error_alert=False)
+
+        assert not RenderService.from_config(config).parallel
+        assert RenderService.from_config(config).upload_limit == 2 * 1024 * 1024
+
+        config.data.render_workers = 0
+        assert RenderService.from_config(config).max_workers <= 2
+
+
+# ==================== 测试进程池 ====================
+
+class TestProcessPool:
+    """测试进程池并行绘制"""
+
+    def test_parallel_render(self, tmp_path):
+        """测试任务在工作进程中绘制并按完成顺序返回路径"""
+        with RenderService(str(tmp_path), max_workers=2) as renderer:
+            for date in ['2025-01-14', '2025-01-15']:
+                renderer.submit(date, 'generate_summary_report_image',
+                                summary_result=make_summary(date), date=date)
+
+            paths = {name: path for name, path, error in renderer.as_completed()}
+
+        assert paths == {
+            date: str(tmp_path / "images" / "SUMMARY" / f"{date}_summary.png")
+            for date in ['2025-01-14', '2025-01-15']
+        }
+        assert all((tmp_path / "images" / "SUMMARY" / f"{date}_summary.png").exists()
+                   for date in paths)
@@ -300,5 +300,36 @@ class TestFormatting:
         assert '300000000' in markdown or '$300M' in markdown
 
 
+# ==================== 测试字典形式的分析结果 ====================
+
+class TestDictResult:
+    """测试普通字典形式的分析结果（非 HoldingsDiff）"""
+    
+    def test_generate_markdown_from_dict(self, reporter):
+        """测试概览从字典的列表长度统计数量"""
+        from src.analyzer import ChangedHolding
+        
+        added = ChangedHolding('PATH', 'UiPath Inc', 0.0, 500000.0, 0.0, 0.98, 'added', 0.98)
+        increased = ChangedHolding('TSLA', 'Tesla Inc', 1000000.0, 1200000.0, 10.5, 11.8, 'increased', 1.3)
+        analysis = {
+            'prev_date': '2025-01-14',
+            'curr_date': '2025-01-15',
+            'added': [added],
+            'removed': [],
+            'increased': [increased],
+            'decreased': [],
+            'significant_increased': [increased],
+            'significant_decreased': [],
+            'unchanged': 3
+        }
+        
+        markdown = reporter.generate_markdown(analysis, 'ARKK')
+        
+        assert '**新增持仓**: 1 只' in markdown
+        assert '**增持**: 1 只（显著增持 1 只）' in markdown
+        assert '**未变化**: 3 只' in markdown
+        assert 'PATH' in markdown
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,130 @@
+"""
+测试持仓数据仓库模块
+
+测试 src/repository.py 中的 HoldingsRepository 类
+"""
+
+import os
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from src.repository import HoldingsRepository
+
+
+# ==================== Fixtures ====================
+
+def write_csv(data_dir, etf_symbol: str, date: str, shares: float = 1000000) -> str:
+    """写入一天的持仓 CSV"""
+    etf_dir = data_dir / "holdings" / etf_symbol
+    etf_dir.mkdir(parents=True, exist_ok=True)
+    path = etf_dir / f"{date}.csv"
+    pd.DataFrame({
+        'date': [date],
+        'etf_symbol': [etf_symbol],
+        'company': ['Tesla Inc'],
+        'ticker': ['TSLA'],
+        'cusip': ['88160R101'],
+        'shares': [shares],
+        'market_value': [250000000.0],
+        'weight': [10.5]
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    """创建仓库实例"""
+    return HoldingsRepository(str(tmp_path), max_entries=2)
+
+
+# ==================== 测试缓存 ====================
+
+class TestRepositoryCache:
+    """测试 LRU 缓存行为"""
+
+    def test_each_day_parsed_once(self, repository, tmp_path):
+        """测试同一天只解析一次"""
+        write_csv(tmp_path, 'ARKK', '2025-01-15')
+
+        with patch('src.repository.pd.read_csv', wraps=pd.read_csv) as mock_read:
+            repository.get('ARKK', '2025-01-15')
+            repository.get('ARKK', '2025-01-15')
+            repository.get_many('ARKK', ['2025-01-15'], columns=['ticker', 'shares'])
+
+        assert mock_read.call_count == 1
+        assert repository.stats()['hits'] == 2
+        assert repository.stats()['misses'] == 1
+
+    def test_partial_columns_cached(self, repository, tmp_path):
+        """测试按列读取只解析所需列，完整读取时重新解析"""
+        write_csv(tmp_path, 'ARKK', '2025-01-15')
+
+        with patch('src.repository.pd.read_csv', wraps=pd.read_csv) as mock_read:
+            shares = repository.get_many('ARKK', ['2025-01-15'], columns=['ticker', 'shares'])
+            repository.get_many('ARKK', ['2025-01-15'], columns=['shares'])
+            full = repository.get('ARKK', '2025-01-15')
+            repository.get_many('ARKK', ['2025-01-15'], columns=['ticker', 'shares'])
+
+        assert shares['2025-01-15'].columns.tolist() == ['ticker', 'shares']
+        assert len(full.columns) == 8
+        assert mock_read.call_count == 2
+        assert repository.stats()['hits'] == 2
+
+    def test_file_change_invalidates(self, repository, tmp_path):
+        """测试文件修改（mtime/size 变化）后重新解析"""
+        path = write_csv(tmp_path, 'ARKK', '2025-01-15', shares=1)
+        assert repository.get('ARKK', '2025-01-15')['shares'].iloc[0] == 1
+
+        write_csv(tmp_path, 'ARKK', '2025-01-15', shares=22222)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert repository.get('ARKK', '2025-01-15')['shares'].iloc[0] == 22222
+        assert repository.stats()['size'] == 1
+
+    def test_lru_eviction(self, repository, tmp_path):
+        """测试超过上限时淘汰最久未使用的条目"""
+        for date in ['2025-01-13', '2025-01-14', '2025-01-15']:
+            write_csv(tmp_path, 'ARKK', date)
+            repository.get('ARKK', date)
+
+        assert repository.stats()['size'] == 2
+
+        repository.get('ARKK', '2025-01-13')
+        assert repository.stats()['misses'] == 4
+
+    def test_explicit_invalidate(self, repository, tmp_path):
+        """测试显式失效"""
+        write_csv(tmp_path, 'ARKK', '2025-01-15')
+        repository.get('ARKK', '2025-01-15')
+
+        assert repository.invalidate('ARKK', '2025-01-15') == 1
+        assert repository.stats()['size'] == 0
+
+    def test_returned_frame_is_isolated(self, repository, tmp_path):
+        """测试调用方新增列不影响缓存"""
+        write_csv(tmp_path, 'ARKK', '2025-01-15')
+
+        df = repository.get('ARKK', '2025-01-15')
+        df['extra'] = 1
+
+        assert 'extra' not in repository.get('ARKK', '2025-01-15').columns
+
+
+class TestRepositoryRead:
+    """测试读取行为"""
+
+    def test_get_missing_date(self, repository):
+        """测试读取不存在的日期"""
+        with pytest.raises(FileNotFoundError):
+            repository.get('ARKK', '2025-01-15')
+
+    def test_get_many_skips_missing(self, repository, tmp_path):
+        """测试批量读取跳过不存在的日期并保持顺序"""
+        write_csv(tmp_path, 'ARKK', '2025-01-13')
+        write_csv(tmp_path, 'ARKK', '2025-01-15')
+
+        history = repository.get_many('ARKK', ['2025-01-13', '2025-01-14', '2025-01-15'])
+
+        assert list(history.keys()) == ['2025-01-13', '2025-01-15']
@@ -0,0 +1,146 @@
+"""
+测试分析结果缓存模块
+
+测试 src/result_cache.py 中的 fingerprint 和 ResultCache
+"""
+
+import os
+import time
+
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+
+from src.analyzer import Analyzer
+from src.result_cache import ResultCache, fingerprint
+from src.utils import Config, DataConfig, StorageConfig
+
+
+# ==================== Fixtures ====================
+
+def make_holdings(shares: dict) -> pd.DataFrame:
+    """构造持仓 {ticker: shares}"""
+    return pd.DataFrame({
+        'company': [f"{ticker} Inc" for ticker in shares],
+        'ticker': list(shares),
+        'shares': list(shares.values()),
+        'market_value': [s * 10.0 for s in shares.values()],
+        'weight': [10.0] * len(shares)
+    })
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path))
+
+
+# ==================== 测试哈希键 ====================
+
+class TestFingerprint:
+    """测试输入内容哈希"""
+
+    def test_same_content_same_key(self):
+        """测试内容相同的 DataFrame 得到相同的键（与索引无关）"""
+        df = make_holdings({'TSLA': 100, 'COIN': 50})
+        copy = df.copy()
+        copy.index = [10, 11]
+
+        assert fingerprint(df, 5.0) == fingerprint(copy, 5.0)
+
+    def test_any_change_changes_key(self):
+        """测试持仓、列名或其他参数变化时键不同"""
+        df = make_holdings({'TSLA': 100, 'COIN': 50})
+        base = fingerprint(df, 5.0)
+
+        assert fingerprint(make_holdings({'TSLA': 101, 'COIN': 50}), 5.0) != base
+        assert fingerprint(df.rename(columns={'weight': 'pct'}), 5.0) != base
+        assert fingerprint(df, 3.0) != base
+        assert fingerprint({'a': 1, 'b': 2}) == fingerprint({'b': 2, 'a': 1})
+
+
+# ==================== 测试缓存读写 ====================
+
+class TestResultCache:
+    """测试结果缓存"""
+
+    def test_object_roundtrip(self, cache):
+        """测试对象缓存（包括持仓对比结果）"""
+        result = Analyzer(threshold=5.0).compare_holdings(
+            make_holdings({'TSLA': 120, 'PATH': 80}),
+            make_holdings({'TSLA': 100, 'COIN': 50}),
+            '2025-01-14', '2025-01-15'
+        )
+
+        assert cache.get('analysis', 'k1') is None
+        cache.put('analysis', 'k1', result)
+        cached = cache.get('analysis', 'k1')
+
+        assert [h.ticker for h in cached['added']] == ['PATH']
+        assert cached.count('removed') == 1
+        assert cache.stats() == {'hits': 1, 'misses': 1}
+
+    def test_corrupted_entry_is_miss(self, cache):
+        """测试缓存文件损坏时视为未命中"""
+        cache.put('summary', 'k1', {'a': 1})
+        (cache.root / 'summary' / 'k1.pkl').write_bytes(b'not a pickle')
+
+        assert cache.get('summary', 'k1') is None
+
+    def test_file_roundtrip(self, cache, tmp_path):
+        """测试图片缓存复制到目标路径"""
+        image = tmp_path / "render" / "ARKK.png"
+        image.parent.mkdir()
+        image.write_bytes(b'\x89PNG data')
+        target = tmp_path / "images" / "ARKK" / "2025-01-15_comprehensive.png"
+
+        assert not cache.get_file('comprehensive', 'k1', str(target))
+        cache.put_file('comprehensive', 'k1', str(image))
+
+        assert cache.get_file('comprehensive', 'k1', str(target))
+        assert target.read_bytes() == b'\x89PNG data'
+
+    def test_from_config(self, tmp_path):
+        """测试配置关闭时不创建缓存"""
+        config = MagicMock(spec=Config)
+        config.data = DataConfig(etfs=["ARKK"], data_dir=str(tmp_path), log_dir=str(tmp_path))
+        config.storage = StorageConfig(result_cache=False)
+
+        assert ResultCache.from_config(config) is None
+
+        config.storage = StorageConfig()
+        assert ResultCache.from_config(config).root == tmp_path / "cache" / "results"
+
+
+# ==================== 测试淘汰 ====================
+
+class TestEvict:
+    """测试按使用时间和总大小淘汰"""
+
+    def age(self, cache, stage, key, days):
+        """把条目的修改时间调到 days 天前"""
+        path = cache.root / stage / f"{key}.pkl"
+        past = time.time() - days * 86400
+        os.utime(path, (past, past))
+
+    def test_evict_by_age(self, cache):
+        """测试删除超过保留天数的条目，命中会刷新使用时间"""
+        for key in ['old', 'used', 'new']:
+            cache.put('analysis', key, key)
+        self.age(cache, 'analysis', 'old', 40)
+        self.age(cache, 'analysis', 'used', 40)
+        assert cache.get('analysis', 'used') == 'used'
+
+        assert cache.evict(max_age_days=30) == 1
+        assert cache.get('analysis', 'old') is None
+        assert cache.get('analysis', 'new') == 'new'
+
+    def test_evict_by_size(self, cache):
+        """测试总大小超限时从最久未使用的条目开始删除"""
+        for days, key in enumerate(['c', 'b', 'a']):
+            cache.put('markdown', key, 'x' * 1000)
+            self.age(cache, 'markdown', key, days + 1)
+
+        assert cache.evict(max_bytes=2500) == 1
+        assert cache.get('markdown', 'a') is None
+        assert cache.get('markdown', 'b') is not None
+        assert cache.evict() == 0
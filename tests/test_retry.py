@@ -0,0 +1,236 @@
+"""
+测试重试策略模块
+
+测试 src/retry.py 中的退避、运行预算和熔断
+"""
+
+import pytest
+import requests
+from unittest.mock import MagicMock
+
+from src.retry import RetryPolicy, CircuitOpenError, DeadlineExceeded, is_transient
+from src.notifier import WeChatNotifier
+
+
+# ==================== Fixtures ====================
+
+class FakeClock:
+    """可手动推进的时钟，sleep 只推进时间不真正等待"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_policy(clock, **kwargs) -> RetryPolicy:
+    """创建使用假时钟的策略"""
+    return RetryPolicy(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+URL = "https://arkfunds.io/api/v1/etf/holdings?symbol=ARKK"
+
+
+def http_error(status: int) -> requests.HTTPError:
+    """构造带状态码的 HTTP 错误"""
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} Error", response=response)
+
+
+# ==================== 测试退避 ====================
+
+class TestBackoff:
+    """测试退避时间"""
+
+    def test_jitter_bounds(self, clock):
+        """测试抖动后的等待在 [基础 × (1 - jitter), 基础] 之间"""
+        policy = make_policy(clock, retry_delays=[1, 2, 4], jitter=0.5)
+
+        for attempt, base in [(1, 1), (2, 2), (3, 4)]:
+            delays = [policy.backoff(attempt) for _ in range(200)]
+            assert min(delays) >= base * 0.5
+            assert max(delays) <= base
+
+    def test_beyond_list_doubles_and_caps(self, clock):
+        """测试超出延迟列表时翻倍，并受 max_delay 限制"""
+        policy = make_policy(clock, retry_delays=[1, 2], jitter=0, max_delay=5)
+
+        assert policy.backoff(3) == 4
+        assert policy.backoff(4) == 5
+
+
+# ==================== 测试运行预算 ====================
+
+class TestDeadline:
+    """测试运行预算"""
+
+    def test_clamp_timeout(self, clock):
+        """测试请求超时被裁剪到剩余预算"""
+        policy = make_policy(clock, run_deadline=20)
+        clock.now += 15
+
+        assert policy.clamp_timeout((5, 30)) == (5, 5)
+        assert policy.clamp_timeout(3) == 3
+
+    def test_no_deadline(self, clock):
+        """测试未设置预算时不裁剪"""
+        policy = make_policy(clock, run_deadline=0)
+
+        assert policy.remaining() is None
+        assert policy.clamp_timeout((5, 30)) == (5, 30)
+
+    def test_wait_exceeding_budget(self, clock):
+        """测试剩余预算不足以等待时直接失败"""
+        policy = make_policy(clock, retry_delays=[10], jitter=0, run_deadline=5)
+
+        with pytest.raises(DeadlineExceeded):
+            policy.wait(1)
+        assert clock.sleeps == []
+
+    def test_exhausted_budget(self, clock):
+        """测试预算用完后不再发送请求"""
+        policy = make_policy(clock, run_deadline=5)
+        clock.now += 5
+
+        with pytest.raises(DeadlineExceeded):
+            policy.before_attempt(URL)
+
+    def test_without_deadline(self, clock):
+        """测试推送用的副本不受预算限制，但共享熔断状态"""
+        policy = make_policy(clock, run_deadline=5, breaker_threshold=1)
+        push_policy = policy.without_deadline()
+        clock.now += 5
+
+        push_policy.before_attempt(URL)
+        assert push_policy.clamp_timeout((5, 30)) == (5, 30)
+
+        push_policy.record_failure(URL)
+        assert policy.open_circuits() == ['arkfunds.io']
+
+
+# ==================== 测试熔断 ====================
+
+class TestCircuitBreaker:
+    """测试按主机熔断"""
+
+    def test_opens_after_threshold(self, clock):
+        """测试连续失败达到阈值后熔断，其他主机不受影响"""
+        policy = make_policy(clock, breaker_threshold=2, breaker_cooldown=60)
+
+        policy.record_failure(URL)
+        policy.before_attempt(URL)
+        policy.record_failure(URL)
+
+        with pytest.raises(CircuitOpenError):
+            policy.before_attempt(URL)
+        policy.before_attempt("https://qyapi.weixin.qq.com/cgi-bin/webhook/send")
+        assert policy.open_circuits() == ['arkfunds.io']
+
+    def test_cooldown_and_reset(self, clock):
+        """测试冷却后放行试探请求，成功后恢复"""
+        policy = make_policy(clock, breaker_threshold=1, breaker_cooldown=60)
+        policy.record_failure(URL)
+
+        clock.now += 61
+        policy.before_attempt(URL)
+        policy.record_success(URL)
+
+        assert policy.open_circuits() == []
+        policy.record_failure(URL)
+        assert policy.open_circuits() == ['arkfunds.io']
+
+    def test_half_open_single_probe(self, clock):
+        """测试冷却后只放行一个试探请求，试探失败后重新熔断"""
+        policy = make_policy(clock, breaker_threshold=1, breaker_cooldown=60)
+        policy.record_failure(URL)
+
+        clock.now += 61
+        policy.before_attempt(URL)
+        with pytest.raises(CircuitOpenError, match="试探"):
+            policy.before_attempt(URL)
+
+        policy.record_failure(URL)
+        clock.now += 30
+        with pytest.raises(CircuitOpenError, match="已熔断"):
+            policy.before_attempt(URL)
+
+        clock.now += 31
+        policy.before_attempt(URL)
+        policy.record_failure(URL, http_error(404))
+        policy.before_attempt(URL)
+        assert policy.open_circuits() == []
+
+    def test_default_threshold(self, clock):
+        """测试熔断阈值默认为 max_retries 的两倍"""
+        assert make_policy(clock, max_retries=3).breaker_threshold == 6
+        assert make_policy(clock, max_retries=8).breaker_threshold == 16
+        assert make_policy(clock, max_retries=8, breaker_threshold=4).breaker_threshold == 4
+
+    def test_only_transient_errors_count(self, clock):
+        """测试只有连接错误、超时、5xx 和 429 计入熔断"""
+        policy = make_policy(clock, breaker_threshold=1)
+
+        for error in [ValueError("bad json"), http_error(404), http_error(403)]:
+            policy.record_failure(URL, error)
+        assert policy.open_circuits() == []
+
+        policy.record_failure(URL, http_error(503))
+        assert policy.open_circuits() == ['arkfunds.io']
+
+    def test_transient_errors(self):
+        """测试临时性错误的判断"""
+        assert is_transient(requests.ConnectionError("refused"))
+        assert is_transient(requests.Timeout("timeout"))
+        assert is_transient(http_error(429))
+        assert is_transient(http_error(500))
+        assert not is_transient(http_error(404))
+        assert not is_transient(ValueError("bad json"))
+
+    def test_exceptions_are_request_errors(self):
+        """测试熔断和预算异常可以被原有的 RequestException 处理捕获"""
+        assert issubclass(CircuitOpenError, requests.RequestException)
+        assert issubclass(DeadlineExceeded, requests.RequestException)
+
+
+# ==================== 测试与通知器集成 ====================
+
+class TestNotifierPolicy:
+    """测试通知器使用共享策略"""
+
+    def test_open_circuit_skips_send(self, clock):
+        """测试 Webhook 主机熔断时不发送请求"""
+        policy = make_policy(clock, breaker_threshold=1)
+        session = MagicMock()
+        session.post.side_effect = requests.ConnectionError("refused")
+
+        notifier = WeChatNotifier(
+            "https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key=test",
+            session=session,
+            retry_policy=policy
+        )
+
+        assert notifier.send_markdown("# test") is False
+        assert notifier.send_markdown("# test") is False
+        assert session.post.call_count == 1
+
+    def test_logs_policy_retries(self, clock, caplog):
+        """测试启动日志显示策略的最大重试次数"""
+        with caplog.at_level('INFO', logger='src.notifier'):
+            WeChatNotifier(
+                "https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key=test",
+                retry_policy=make_policy(clock, max_retries=5)
+            )
+
+        assert "最大重试次数: 5" in caplog.text
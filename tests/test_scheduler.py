@@ -37,9 +37,7 @@ def mock_config():
     config.notification.webhook_url = "https://test.webhook.com"
     config.notification.enable_error_alert = True
     
-    config.retry = MagicMock(spec=RetryConfig)
-    config.retry.max_retries = 3
-    config.retry.retry_delays = [1, 2, 4]
+    config.retry = RetryConfig(max_retries=3, retry_delays=[1, 2, 4])
     
     config.log = MagicMock(spec=LogConfig)
     config.log.retention_days = 30
@@ -0,0 +1,152 @@
+"""
+测试持仓数据源模块
+
+测试 src/sources.py 中的数据源实现及其在 DataFetcher 中的使用
+"""
+
+import json
+import pytest
+import pandas as pd
+from unittest.mock import MagicMock
+
+from src.fetcher import DataFetcher
+from src.holdings_client import HoldingsClient
+from src.sources import ARKFundsSource, GitHubHistorySource, ReplaySource, create_daily_source, create_history_source
+from src.utils import Config, DataConfig, RetryConfig, StorageConfig, HttpConfig, SourceConfig
+
+
+# ==================== Fixtures ====================
+
+def make_payload(date: str, shares: float = 1200000) -> dict:
+    """构造 ARKFunds.io API 响应"""
+    return {
+        'symbol': 'ARKK',
+        'date': date,
+        'holdings': [
+            {'company': 'Tesla Inc', 'ticker': 'TSLA', 'cusip': '88160R101',
+             'shares': shares, 'market_value': 300000000.0, 'weight': 11.8},
+            {'company': 'Coinbase Global Inc', 'ticker': 'COIN', 'cusip': '19260Q107',
+             'shares': 450000, 'market_value': 90000000.0, 'weight': 3.5},
+        ]
+    }
+
+
+def record(replay_dir, etf_symbol: str, date: str, payload: dict) -> None:
+    """写入一个回放响应"""
+    etf_dir = replay_dir / etf_symbol
+    etf_dir.mkdir(parents=True, exist_ok=True)
+    (etf_dir / f"{date}.json").write_text(json.dumps(payload), encoding='utf-8')
+
+
+@pytest.fixture
+def replay_dir(tmp_path):
+    """回放数据目录"""
+    return tmp_path / "replay"
+
+
+@pytest.fixture
+def fetcher(tmp_path, replay_dir):
+    """创建使用回放数据源的 DataFetcher"""
+    config = MagicMock(spec=Config)
+    config.data = MagicMock(spec=DataConfig)
+    config.data.data_dir = str(tmp_path / "data")
+    config.retry = RetryConfig(max_retries=1, retry_delays=[0])
+    config.storage = StorageConfig()
+    config.http = HttpConfig()
+    config.source = SourceConfig(daily='replay', history='replay', replay_dir=str(replay_dir))
+    return DataFetcher(config)
+
+
+# ==================== 测试回放数据源 ====================
+
+class TestReplaySource:
+    """测试本地回放数据源"""
+
+    def test_replays_recorded_payload(self, fetcher, replay_dir):
+        """测试读取录制的响应，转换结果与 API 相同"""
+        record(replay_dir, 'ARKK', '2025-01-15', make_payload('2025-01-15'))
+
+        df = fetcher.fetch_holdings('ARKK', '2025-01-15')
+
+        assert isinstance(fetcher.source, ReplaySource)
+        assert df['ticker'].tolist() == ['TSLA', 'COIN']
+        assert df['date'].iloc[0] == '2025-01-15'
+
+    def test_uses_latest_earlier_recording(self, fetcher, replay_dir):
+        """测试请求日期没有录制时使用之前最近一次的录制"""
+        record(replay_dir, 'ARKK', '2025-01-10', make_payload('2025-01-10', shares=1))
+        record(replay_dir, 'ARKK', '2025-01-14', make_payload('2025-01-14', shares=2))
+        record(replay_dir, 'ARKK', '2025-01-16', make_payload('2025-01-16', shares=3))
+
+        df = fetcher.fetch_holdings('ARKK', '2025-01-15')
+
+        assert df['date'].iloc[0] == '2025-01-14'
+        assert df['shares'].iloc[0] == 2
+
+    def test_any_etf_symbol(self, fetcher, replay_dir):
+        """测试回放不限制 ETF 代码"""
+        record(replay_dir, 'LOAD0001', '2025-01-15', make_payload('2025-01-15'))
+
+        df = fetcher.fetch_holdings('LOAD0001', '2025-01-15')
+
+        assert (df['etf_symbol'] == 'LOAD0001').all()
+
+    def test_missing_recording(self, fetcher):
+        """测试没有录制时报错"""
+        with pytest.raises(FileNotFoundError):
+            fetcher.fetch_holdings('ARKK', '2025-01-15')
+
+    def test_history_backfill(self, fetcher, replay_dir):
+        """测试从回放目录回填历史数据"""
+        replay_dir.mkdir(parents=True)
+        (replay_dir / "ARKK.csv").write_text(
+            "date,fund,company,ticker,cusip,shares,market value($),weight(%)\n"
+            "2025-01-14,ARKK,Tesla Inc,TSLA,88160R101,1000000,250000000.00,10.50\n"
+            "2025-01-15,ARKK,Tesla Inc,TSLA,88160R101,1200000,300000000.00,11.80\n",
+            encoding='utf-8'
+        )
+
+        assert fetcher.download_historical_data('ARKK', days=30) == 2
+        assert fetcher.load_from_csv('ARKK', '2025-01-14')['shares'].iloc[0] == 1000000
+
+
+# ==================== 测试数据源选择 ====================
+
+class TestSourceSelection:
+    """测试按配置创建数据源"""
+
+    def test_create_by_name(self, fetcher):
+        """测试按名称创建"""
+        assert isinstance(create_daily_source('arkfunds', fetcher.client, './replay'), ARKFundsSource)
+        assert isinstance(create_daily_source('github', fetcher.client, './replay'), GitHubHistorySource)
+        assert isinstance(create_daily_source('replay', fetcher.client, './replay'), ReplaySource)
+        assert isinstance(create_history_source('github', fetcher.client, './replay'), GitHubHistorySource)
+        assert isinstance(create_history_source('replay', fetcher.client, './replay'), ReplaySource)
+
+    def test_unknown_source(self, fetcher):
+        """测试未知数据源"""
+        with pytest.raises(ValueError):
+            create_daily_source('ftp', fetcher.client, './replay')
+        with pytest.raises(ValueError):
+            create_history_source('ftp', fetcher.client, './replay')
+
+    def test_arkfunds_has_no_history(self, fetcher):
+        """测试 ARKFunds.io 只实现每日接口"""
+        assert not hasattr(ARKFundsSource, 'fetch_history')
+        with pytest.raises(ValueError):
+            create_history_source('arkfunds', fetcher.client, './replay')
+
+    def test_sources_use_injected_client(self):
+        """测试数据源只依赖注入的下载客户端，不需要 DataFetcher"""
+        client = MagicMock(spec=HoldingsClient)
+        client.fetch_json.return_value = 'ARKK frame'
+
+        assert ARKFundsSource(client).fetch_latest('ARKK', '2025-01-15') == 'ARKK frame'
+        client.fetch_json.assert_called_once_with(
+            ARKFundsSource.URL_TEMPLATE.format(etf_symbol='ARKK'), 'ARKK', '2025-01-15'
+        )
+
+        GitHubHistorySource(client).fetch_history('ARKK')
+        client.download_csv.assert_called_once_with(
+            GitHubHistorySource.URL_TEMPLATE.format(etf_symbol='ARKK')
+        )
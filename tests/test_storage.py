@@ -0,0 +1,234 @@
+"""
+测试持仓存储模块
+
+测试 src/storage.py 中的 ColumnarHoldingsStore / SQLiteHoldingsStore 类
+"""
+
+import sqlite3
+import pytest
+import pandas as pd
+
+from src.storage import (
+    ColumnarHoldingsStore, HoldingsStore, SQLiteHoldingsStore, create_holdings_store, read_holdings_csv
+)
+
+
+# ==================== Fixtures ====================
+
+def make_holdings(date: str, shares_tsla: float = 1000000, etf_symbol: str = 'ARKK') -> pd.DataFrame:
+    """构造一天的持仓数据"""
+    return pd.DataFrame({
+        'date': [date, date],
+        'etf_symbol': [etf_symbol, etf_symbol],
+        'company': ['Tesla Inc', 'Coinbase Global Inc'],
+        'ticker': ['TSLA', 'COIN'],
+        'cusip': ['88160R101', '19260Q107'],
+        'shares': [shares_tsla, 500000],
+        'market_value': [250000000.0, 100000000.0],
+        'weight': [10.5, 4.2]
+    })
+
+
+@pytest.fixture(params=['parquet', 'feather', 'sqlite'])
+def store(request, tmp_path):
+    """创建存储实例（两种列式格式 + SQLite）"""
+    if request.param == 'sqlite':
+        return SQLiteHoldingsStore(str(tmp_path))
+
+    pytest.importorskip("pyarrow")
+    return ColumnarHoldingsStore(str(tmp_path), fmt=request.param)
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    """创建 SQLite 存储实例"""
+    return SQLiteHoldingsStore(str(tmp_path))
+
+
+# ==================== 测试读写 ====================
+
+class TestColumnarStore:
+    """测试列式存储读写"""
+
+    def test_write_and_read_date_range(self, store):
+        """测试按日期范围读取"""
+        for i, date in enumerate(['2025-01-13', '2025-01-14', '2025-01-15']):
+            store.write(make_holdings(date, 1000000 + i), 'ARKK', date)
+
+        df = store.read('ARKK', start_date='2025-01-14', end_date='2025-01-15')
+
+        assert sorted(df['date'].unique()) == ['2025-01-14', '2025-01-15']
+        assert len(df) == 4
+        assert df['shares'].dtype == 'float64'
+        assert isinstance(df['ticker'].dtype, pd.CategoricalDtype)
+
+    def test_read_selected_columns(self, store):
+        """测试只读取指定列"""
+        store.write(make_holdings('2025-01-15'), 'ARKK', '2025-01-15')
+
+        df = store.read('ARKK', columns=['ticker', 'shares'])
+
+        assert list(df.columns) == ['ticker', 'shares']
+
+    def test_write_does_not_overwrite(self, store):
+        """测试同一日期不覆盖（不可变历史）"""
+        assert store.write(make_holdings('2025-01-15', 1), 'ARKK', '2025-01-15') is True
+        assert store.write(make_holdings('2025-01-15', 2), 'ARKK', '2025-01-15') is False
+
+        df = store.read('ARKK')
+        assert df.loc[df['ticker'] == 'TSLA', 'shares'].tolist() == [1.0]
+
+    def test_delete_before(self, store):
+        """测试删除过期数据"""
+        for date in ['2025-01-13', '2025-01-14', '2025-01-15']:
+            store.write(make_holdings(date), 'ARKK', date)
+
+        deleted = store.delete_before('ARKK', '2025-01-14')
+
+        assert deleted == ['2025-01-13']
+        assert store.list_dates('ARKK') == ['2025-01-14', '2025-01-15']
+
+    def test_read_missing_partition(self, store):
+        """测试读取不存在的分区"""
+        df = store.read('ARKW')
+        assert df.empty
+
+    def test_write_keeps_existing_days(self, tmp_path):
+        """测试列式存储每天一个文件，写入新日期不重写已有文件"""
+        pytest.importorskip("pyarrow")
+        store = ColumnarHoldingsStore(str(tmp_path), fmt='parquet')
+
+        store.write(make_holdings('2025-01-14'), 'ARKK', '2025-01-14')
+        first = store.get_path('ARKK', '2025-01-14')
+        mtime = first.stat().st_mtime_ns
+
+        store.write(make_holdings('2025-01-15'), 'ARKK', '2025-01-15')
+
+        assert first.stat().st_mtime_ns == mtime
+        assert sorted(p.name for p in store.get_path('ARKK').iterdir()) == [
+            '2025-01-14.parquet', '2025-01-15.parquet'
+        ]
+
+
+class TestMigration:
+    """测试 CSV 迁移"""
+
+    def test_migrate_from_csv(self, store, tmp_path):
+        """测试迁移现有 CSV 目录树"""
+        etf_dir = tmp_path / "holdings" / "ARKK"
+        etf_dir.mkdir(parents=True)
+        for date in ['2025-01-14', '2025-01-15']:
+            make_holdings(date).to_csv(etf_dir / f"{date}.csv", index=False)
+
+        stats = store.migrate_from_csv(str(tmp_path / "holdings"))
+
+        assert stats == {'ARKK': 2}
+        assert store.list_dates('ARKK') == ['2025-01-14', '2025-01-15']
+
+        # 重复迁移不会重复写入
+        assert store.migrate_from_csv(str(tmp_path / "holdings")) == {'ARKK': 0}
+
+
+class TestAbstractStore:
+    """测试存储基类"""
+
+    def test_incomplete_subclass_rejected(self):
+        """测试未实现全部抽象方法的子类不能实例化"""
+        class PartialStore(HoldingsStore):
+            def list_dates(self, etf_symbol):
+                return []
+
+        with pytest.raises(TypeError):
+            HoldingsStore()
+        with pytest.raises(TypeError):
+            PartialStore()
+
+
+class TestSQLiteQueries:
+    """测试 SQLite 索引查询"""
+
+    def test_ticker_history_across_funds(self, sqlite_store):
+        """测试跨基金查询某只股票的持仓历史"""
+        for etf, base in [('ARKK', 1000), ('ARKW', 2000)]:
+            for i, date in enumerate(['2025-01-13', '2025-01-14', '2025-01-15']):
+                sqlite_store.write(make_holdings(date, base + i, etf), etf, date)
+
+        df = sqlite_store.ticker_history('TSLA', start_date='2025-01-14')
+
+        assert df['date'].tolist() == ['2025-01-14', '2025-01-14', '2025-01-15', '2025-01-15']
+        assert df['etf_symbol'].tolist() == ['ARKK', 'ARKW', 'ARKK', 'ARKW']
+        assert df['shares'].tolist() == [1001.0, 2001.0, 1002.0, 2002.0]
+
+        only_arkw = sqlite_store.ticker_history('TSLA', etf_symbols=['ARKW'], columns=['date', 'shares'])
+        assert only_arkw['shares'].tolist() == [2000.0, 2001.0, 2002.0]
+
+    def test_read_day(self, sqlite_store):
+        """测试读取某只基金某一天的全部持仓"""
+        sqlite_store.write(make_holdings('2025-01-15'), 'ARKK', '2025-01-15')
+        sqlite_store.write(make_holdings('2025-01-15', etf_symbol='ARKG'), 'ARKG', '2025-01-15')
+
+        df = sqlite_store.read_day('ARKG', '2025-01-15')
+
+        assert len(df) == 2
+        assert set(df['etf_symbol']) == {'ARKG'}
+
+    def test_schema_indexes_and_wal(self, sqlite_store):
+        """测试索引与 WAL 模式"""
+        with sqlite3.connect(sqlite_store.db_path) as conn:
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list('holdings')")}
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+        assert {'idx_holdings_etf_date', 'idx_holdings_ticker_date'} <= indexes
+        assert journal_mode == 'wal'
+
+    def test_unknown_column_rejected(self, sqlite_store):
+        """测试拒绝未知列名"""
+        with pytest.raises(ValueError):
+            sqlite_store.read('ARKK', columns=['ticker; DROP TABLE holdings'])
+
+
+class TestReadHoldingsCSV:
+    """测试统一的持仓 CSV 读取"""
+
+    def test_explicit_dtypes(self, tmp_path):
+        """测试数值列为 float64，cusip 保持字符串，N/A 不被当作缺失值"""
+        path = tmp_path / "2025-01-15.csv"
+        df = make_holdings('2025-01-15')
+        df.loc[1, 'ticker'] = 'N/A'
+        df['cusip'] = ['00123456', '19260Q107']
+        df.to_csv(path, index=False)
+
+        loaded = read_holdings_csv(path)
+
+        assert loaded.columns.tolist() == df.columns.tolist()
+        assert loaded['shares'].dtype == 'float64'
+        assert pd.api.types.is_string_dtype(loaded['ticker'])
+        assert loaded['ticker'].tolist() == ['TSLA', 'N/A']
+        assert loaded['cusip'].tolist() == ['00123456', '19260Q107']
+
+    def test_column_pruning(self, tmp_path):
+        """测试只读取指定列并按指定顺序返回"""
+        path = tmp_path / "2025-01-15.csv"
+        make_holdings('2025-01-15').to_csv(path, index=False)
+
+        loaded = read_holdings_csv(path, ['shares', 'ticker'])
+
+        assert loaded.columns.tolist() == ['shares', 'ticker']
+
+    def test_unknown_column(self, tmp_path):
+        """测试未知列名报错"""
+        path = tmp_path / "2025-01-15.csv"
+        make_holdings('2025-01-15').to_csv(path, index=False)
+
+        with pytest.raises(ValueError):
+            read_holdings_csv(path, ['price'])
+
+
+def test_create_holdings_store_csv_backend(tmp_path):
+    """测试 csv 后端不创建列式存储"""
+    assert create_holdings_store(str(tmp_path), 'csv') is None
+
+
+def test_create_holdings_store_sqlite_backend(tmp_path):
+    """测试 sqlite 后端不依赖 pyarrow"""
+    assert isinstance(create_holdings_store(str(tmp_path), 'sqlite'), SQLiteHoldingsStore)
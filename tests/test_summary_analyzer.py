@@ -0,0 +1,117 @@
+"""
+测试汇总分析模块
+
+测试 src/summary_analyzer.py 中的 SummaryAnalyzer 类
+"""
+
+import pandas as pd
+import pytest
+
+from src.summary_analyzer import SummaryAnalyzer
+
+
+# ==================== Fixtures ====================
+
+def make_fund(etf: str, weights: dict, date: str = '2025-01-15') -> pd.DataFrame:
+    """构造一只基金的持仓 {ticker: weight}"""
+    return pd.DataFrame({
+        'date': date,
+        'etf_symbol': etf,
+        'company': [f"{ticker} Inc" for ticker in weights],
+        'ticker': list(weights),
+        'shares': [100.0] * len(weights),
+        'market_value': [1000.0] * len(weights),
+        'weight': list(weights.values())
+    })
+
+
+@pytest.fixture
+def current():
+    """当日持仓：TSLA 在三只基金，COIN 在两只基金，其余为独家"""
+    return {
+        'ARKK': make_fund('ARKK', {'TSLA': 10.0, 'COIN': 6.0, 'ROKU': 5.0, 'N/A': 1.0}),
+        'ARKW': make_fund('ARKW', {'TSLA': 8.0, 'COIN': 7.0, 'PATH': 2.0}),
+        'ARKQ': make_fund('ARKQ', {'TSLA': 12.0, 'KTOS': 4.0}),
+    }
+
+
+@pytest.fixture
+def previous():
+    """前一日持仓：TSLA 在三只基金都低 1% 以上，COIN 只在 ARKK"""
+    return {
+        'ARKK': make_fund('ARKK', {'TSLA': 8.0, 'COIN': 6.0, 'ROKU': 5.0}, '2025-01-14'),
+        'ARKW': make_fund('ARKW', {'TSLA': 6.5, 'PATH': 2.0, 'SHOP': 3.0}, '2025-01-14'),
+        'ARKQ': make_fund('ARKQ', {'TSLA': 11.0, 'KTOS': 4.0, 'SHOP': 1.0}, '2025-01-14'),
+    }
+
+
+# ==================== 测试汇总 ====================
+
+class TestSummary:
+    """测试重叠、独家持仓和统计"""
+
+    def test_overlapping(self, current):
+        """测试跨基金重叠按基金数、总权重排序，各基金按权重降序"""
+        result = SummaryAnalyzer().analyze_all_etfs(current)
+
+        overlapping = result['overlapping_stocks']
+        assert [s['ticker'] for s in overlapping] == ['TSLA', 'COIN']
+        assert overlapping[0]['num_funds'] == 3
+        assert overlapping[0]['total_weight'] == pytest.approx(30.0)
+        assert [h['etf'] for h in overlapping[0]['holdings']] == ['ARKQ', 'ARKK', 'ARKW']
+
+    def test_exclusive_and_statistics(self, current):
+        """测试独家持仓（权重 >= 3%）和统计，货币基金 N/A 不计入股票"""
+        result = SummaryAnalyzer().analyze_all_etfs(current)
+
+        assert result['exclusive_stocks'] == {
+            'ARKK': [{'ticker': 'ROKU', 'company': 'ROKU Inc', 'weight': 5.0, 'market_value': 1000.0}],
+            'ARKQ': [{'ticker': 'KTOS', 'company': 'KTOS Inc', 'weight': 4.0, 'market_value': 1000.0}],
+        }
+        assert result['statistics'] == {
+            'total_stocks': 5,
+            'overlapping_count': 2,
+            'exclusive_count': 3,
+            'holdings_by_etf': {'ARKK': 4, 'ARKW': 3, 'ARKQ': 2}
+        }
+        assert result['date'] == '2025-01-15'
+        assert result['etf_summaries']['ARKK']['top_holdings'][0]['ticker'] == 'TSLA'
+
+    def test_records_input(self, current, previous):
+        """测试字典列表输入与 DataFrame 输入结果一致"""
+        analyzer = SummaryAnalyzer()
+        from_frames = analyzer.analyze_all_etfs(current, previous)
+        from_records = analyzer.analyze_all_etfs(
+            {etf: df.to_dict('records') for etf, df in current.items()},
+            {etf: df.to_dict('records') for etf, df in previous.items()}
+        )
+
+        assert from_records == from_frames
+
+    def test_unknown_fund(self):
+        """测试不在 ETF_INFO_MAP 中的基金"""
+        result = SummaryAnalyzer().analyze_all_etfs({'ARKX': make_fund('ARKX', {'RKLB': 5.0})})
+
+        assert result['etf_summaries']['ARKX']['info'].name_cn == 'ARKX'
+
+
+# ==================== 测试重点变化 ====================
+
+class TestChanges:
+    """测试与前一日对比的重点变化"""
+
+    def test_top_changes(self, current, previous):
+        """测试多基金增持和新增跨基金持仓，按重要性排序"""
+        result = SummaryAnalyzer().analyze_all_etfs(current, previous)
+
+        changes = [(c['type'], c['ticker']) for c in result['top_changes']]
+        assert changes == [('multi_increase', 'TSLA'), ('new_overlap', 'COIN')]
+
+        tsla = result['top_changes'][0]
+        assert tsla['etfs'] == [('ARKK', pytest.approx(2.0)), ('ARKW', pytest.approx(1.5)),
+                                ('ARKQ', pytest.approx(1.0))]
+        assert result['top_changes'][1]['etfs'] == ['ARKW']
+
+    def test_no_previous(self, current):
+        """测试没有前一日数据时不分析变化"""
+        assert SummaryAnalyzer().analyze_all_etfs(current, {})['top_changes'] == []
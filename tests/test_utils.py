@@ -113,6 +113,46 @@ log:
         # 验证环境变量被正确替换
         assert config.notification.webhook_url == "https://webhook.test.com"
     
+    def test_load_config_ignores_removed_panel_cache(self, tmp_path):
+        """测试旧配置文件中已移除的 storage.panel_cache 被忽略"""
+        config_content = """
+schedule:
+  enabled: true
+  cron_time: "11:00"
+  timezone: "Asia/Shanghai"
+
+data:
+  etfs: ["ARKK"]
+  data_dir: "./data"
+  log_dir: "./logs"
+
+analysis:
+  change_threshold: 5.0
+
+notification:
+  webhook_url: "https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key=test"
+  enable_error_alert: true
+
+retry:
+  max_retries: 3
+  retry_delays: [1, 2, 4]
+
+log:
+  retention_days: 30
+  level: "INFO"
+
+storage:
+  backend: "csv"
+  panel_cache: true
+"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(config_content)
+        
+        config = load_config(str(config_file))
+        
+        assert config.storage.backend == "csv"
+        assert not hasattr(config.storage, 'panel_cache')
+    
     def test_load_config_missing_env_var(self, tmp_path, monkeypatch):
         """测试缺失环境变量"""
         # 确保环境变量不存在
@@ -300,6 +340,44 @@ log:
         # 验证应该抛出 ValueError
         with pytest.raises(ValueError, match="etfs"):
             validate_config(config)
+    
+    def test_validate_config_low_breaker_threshold(self, tmp_path, caplog):
+        """测试熔断阈值不大于 max_retries 时只警告"""
+        config_content = """
+schedule:
+  enabled: true
+  cron_time: "11:00"
+  timezone: "Asia/Shanghai"
+
+data:
+  etfs: ["ARKK"]
+  data_dir: "./data"
+  log_dir: "./logs"
+
+analysis:
+  change_threshold: 5.0
+
+notification:
+  webhook_url: "https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key=test"
+  enable_error_alert: true
+
+retry:
+  max_retries: 8
+  retry_delays: [1, 2, 4, 8, 16, 30, 30, 30]
+  breaker_threshold: 6
+
+log:
+  retention_days: 30
+  level: "INFO"
+"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(config_content)
+        
+        config = load_config(str(config_file))
+        
+        # 不抛出异常，只记录警告
+        validate_config(config)
+        assert "breaker_threshold" in caplog.text
 
 
 # ==================== 测试日志管理 ====================